@@ -38,9 +38,28 @@ def create_app(config_class=Config):
     db.init_app(app)
     login_manager.init_app(app)
     
+    # Authenticated requests use a cached user identity
+    from app.core.user_cache import user_cache
+    user_cache.ttl = app.config.get('USER_CACHE_SECONDS', 30)
+    
     # Setup logging
     setup_logging(app)
     
+    # Create missing tables and indexes
+    setup_database(app)
+    
+    # Per-request SQL statistics (query counts, N+1 detection)
+    from app.core.sql_stats import init_sql_instrumentation
+    init_sql_instrumentation(app)
+    
+    # Read replica routing with read-your-writes window
+    from app.core.db_routing import init_db_routing
+    init_db_routing(app)
+    
+    # Audit trail (batched background writer)
+    from app.core.audit import audit_log
+    audit_log.init_app(app)
+    
     # Register template filters
     register_template_filters(app)
     
@@ -50,6 +69,9 @@ def create_app(config_class=Config):
     # Register error handlers
     register_error_handlers(app)
     
+    # Periodic maintenance (stuck jobs, cache pruning, stats)
+    setup_scheduler(app)
+    
     # Log application startup
     logger.info("Flask application created and configured")
     return app
@@ -69,6 +91,9 @@ def setup_logging(app):
             # Fallback to local logs directory
             log_dir = os.path.join(os.path.dirname(__file__), 'logs')
             os.makedirs(log_dir, exist_ok=True)
+    
+    # Used by the log viewer
+    app.config['LOG_DIR'] = log_dir
 
     # Formatter for all logs
     formatter = logging.Formatter(
@@ -149,6 +174,88 @@ def setup_logging(app):
             print(f"Failed to setup app logger: {e}")
 
 
+def setup_database(app):
+    """Create missing tables and indexes (existing tables are left unchanged)"""
+    import models  # noqa: F401 - register all models with the metadata
+    
+    with app.app_context():
+        try:
+            db.create_all(bind_key=None)  # never DDL on the replica
+            
+            # create_all() skips indexes added to tables that already exist
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=db.engine, checkfirst=True)
+            
+            add_missing_columns()
+            sync_id_sequences()
+            
+            logger.info("Database tables and indexes verified")
+        except Exception as e:
+            logger.error(f"Failed to set up database tables: {e}")
+
+
+def setup_scheduler(app):
+    """Register maintenance tasks; the scheduler thread starts with the first request of each process"""
+    from app.core.scheduler import scheduler
+    from app.analysis import maintenance as analysis_maintenance
+    from app.history import maintenance as history_maintenance
+    
+    scheduler.tick = app.config.get('MAINTENANCE_TICK_SECONDS', 30)
+    scheduler.lease_seconds = app.config.get('MAINTENANCE_LEASE_SECONDS', 1800)
+    analysis_maintenance.register_maintenance_tasks(scheduler, app.config)
+    history_maintenance.register_maintenance_tasks(scheduler, app.config)
+    
+    if app.config.get('MAINTENANCE_ENABLED', True):
+        scheduler.init_app(app)
+
+
+def add_missing_columns(columns=(('ngs.users', 'auth_version', 'INTEGER NOT NULL DEFAULT 0'),
+                                 ('ngs.scan_tasks', 'sample_count', 'INTEGER NOT NULL DEFAULT 0'))):
+    """
+    Add columns introduced after their table was created (create_all() skips existing tables)
+    
+    Args:
+        columns: Tuples of (schema-qualified table, column, column definition)
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    
+    from sqlalchemy import text
+    
+    with db.engine.begin() as conn:
+        for table, column, definition in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {definition}"))
+
+
+def sync_id_sequences(tables=('ngs.users',)):
+    """
+    Make sure id columns are backed by a sequence that is ahead of existing ids
+    (user ids used to be assigned by the application as max(id)+1)
+    
+    Args:
+        tables: Schema-qualified table names
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    
+    from sqlalchemy import text
+    
+    with db.engine.begin() as conn:
+        for table in tables:
+            sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table}).scalar()
+            if sequence is None:
+                sequence = f"{table}_id_seq"
+                conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence} OWNED BY {table}.id"))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')"))
+                logger.info(f"Created id sequence {sequence}")
+            
+            conn.execute(text(
+                f"SELECT setval(:sequence, GREATEST((SELECT COALESCE(MAX(id), 0) FROM {table}), "
+                f"(SELECT last_value FROM {sequence})))"
+            ), {'sequence': sequence})
+
+
 def register_template_filters(app):
     """Register custom template filters"""
     
@@ -208,14 +315,16 @@ def register_blueprints(app):
     from app.history import history_bp
     from app.users import users_bp
     from app.logs import logs_bp
+    from app.metrics import metrics_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(analysis_bp)
     app.register_blueprint(history_bp)
     app.register_blueprint(users_bp)
     app.register_blueprint(logs_bp)
+    app.register_blueprint(metrics_bp)
     
-    logger.info('Blueprints registered: auth, analysis, history, users, logs')
+    logger.info('Blueprints registered: auth, analysis, history, users, logs, metrics')
 
 
 def register_error_handlers(app):
@@ -0,0 +1,236 @@
+# analysis/catalog.py
+"""
+Sample catalog for cross-run sample search
+Keeps parsed sample keys of scanned run folders in the database. The
+catalog is rebuilt by the refresh_catalog maintenance task (one worker
+holds its lease) and updated by every interactive scan; searches only
+read it.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import or_
+
+from extensions import db
+from models import SampleCatalogEntry
+from app.core.utils import escape_like, ANALYSIS_BASE_PATHS
+from .utils import extract_samples_with_details, parse_fastq_filename
+from .run_metadata import get_run_metadata
+
+logger = logging.getLogger('analysis')
+
+_refresh_lock = threading.Lock()
+
+# Catalog writes of interactive scans run here, one at a time
+_update_executor = None
+_update_pid = None
+_update_lock = threading.Lock()
+
+
+def get_analysis_type(path):
+    """
+    Determine analysis type from a path
+
+    Args:
+        path: Validated path
+
+    Returns:
+        Analysis type or None
+    """
+    for atype, apath in ANALYSIS_BASE_PATHS.items():
+        if path == apath or path.startswith(apath.rstrip('/') + '/'):
+            return atype
+    return None
+
+
+def _catalog_entries(fastq_files):
+    """
+    Group FASTQ files into catalog rows
+    A sample key can occur in several runs (same probennummer, NTC/PTC), so
+    rows are per sample key and directory
+
+    Args:
+        fastq_files: FASTQ file paths
+
+    Returns:
+        List of sample dictionaries with 'files' lists
+    """
+    entries = {}
+    for file_path in fastq_files:
+        parsed = parse_fastq_filename(file_path)
+        if not parsed:
+            continue
+        key, sample, _ = parsed
+        entry = entries.setdefault((key, sample["file_path"]), dict(sample, files=[]))
+        entry["files"].append(file_path)
+    return list(entries.values())
+
+
+def update_catalog(root_path, fastq_files, recursive=False):
+    """
+    Replace catalog entries below a scanned folder with fresh scan results
+
+    Args:
+        root_path: Validated folder that was scanned
+        fastq_files: FASTQ file paths found by the scan
+        recursive: Whether the scan included subfolders
+    """
+    root_path = root_path.rstrip('/') or '/'
+    entries = _catalog_entries(fastq_files)
+
+    stale = SampleCatalogEntry.query.filter(SampleCatalogEntry.folder_path == root_path)
+    if recursive:
+        prefix = escape_like(root_path.rstrip('/') + '/')
+        stale = SampleCatalogEntry.query.filter(or_(
+            SampleCatalogEntry.folder_path == root_path,
+            SampleCatalogEntry.folder_path.like(f"{prefix}%", escape='\\')
+        ))
+    stale.delete(synchronize_session=False)
+
+    now = datetime.now(timezone.utc)
+    analysis_type = get_analysis_type(root_path)
+    db.session.add_all([
+        SampleCatalogEntry(
+            sample_key=entry["probennummer"].lower(),
+            probennummer=entry["probennummer"],
+            source=entry.get("source"),
+            run_date=entry.get("run_date"),
+            analysis_type=analysis_type,
+            folder_path=entry["file_path"],
+            files=sorted(entry["files"]),
+            scanned_at=now
+        )
+        for entry in entries
+    ])
+    db.session.commit()
+
+    logger.info(f"Catalog updated for {root_path}: {len(entries)} samples")
+    return len(entries)
+
+
+def _get_update_executor():
+    """Executor for catalog writes (recreated after a fork, threads do not survive it)"""
+    global _update_executor, _update_pid
+    with _update_lock:
+        if _update_executor is None or _update_pid != os.getpid():
+            _update_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog-update')
+            _update_pid = os.getpid()
+        return _update_executor
+
+
+def update_catalog_async(app, root_path, samples, recursive=False):
+    """
+    Update the catalog from scan results in a background thread,
+    so scans do not wait for the catalog write
+
+    Args:
+        app: Flask application (for the app context)
+        root_path: Validated folder that was scanned
+        samples: Sample dictionaries with 'files' lists
+        recursive: Whether the scan included subfolders
+
+    Returns:
+        Future of the update
+    """
+    # Callers modify the sample dictionaries afterwards
+    fastq_files = [path for sample in samples for path in sample.get("files", [])]
+
+    def worker():
+        with app.app_context():
+            try:
+                update_catalog(root_path, fastq_files, recursive=recursive)
+            except Exception as e:
+                logger.error(f"Error updating sample catalog for {root_path}: {e}")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    return _get_update_executor().submit(worker)
+
+
+def refresh_catalog():
+    """
+    Rescan all analysis base paths and rebuild the catalog
+    Requires an application context
+
+    Returns:
+        Number of cataloged samples
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        logger.info("Catalog refresh already running")
+        return 0
+
+    try:
+        config = current_app.config
+        started = time.monotonic()
+        total = 0
+        for base_path in ANALYSIS_BASE_PATHS.values():
+            samples = extract_samples_with_details(base_path, recursive=True, with_files=True)
+            fastq_files = [path for sample in samples for path in sample["files"]]
+            total += update_catalog(base_path, fastq_files, recursive=True)
+
+            # Run metadata is ingested alongside the catalog (only changed run files are parsed);
+            # interactive scans ingest it through AnalysisService.add_run_metadata
+            get_run_metadata(
+                {os.path.dirname(path) for path in fastq_files},
+                max_levels=config.get('RUN_METADATA_SEARCH_LEVELS', 4),
+                max_age=config.get('CATALOG_REFRESH_SECONDS', 3600)
+            )
+
+        logger.info(f"Catalog refresh finished: {total} samples in {time.monotonic() - started:.1f}s")
+        return total
+    except Exception as e:
+        logger.error(f"Error refreshing sample catalog: {e}")
+        db.session.rollback()
+        return 0
+    finally:
+        _refresh_lock.release()
+
+
+def search_catalog(query, exact=False, analysis_type=None, limit=100):
+    """
+    Look up samples by probennummer across all cataloged runs
+
+    Args:
+        query: Probennummer or prefix (case-insensitive)
+        exact: Exact match instead of prefix match
+        analysis_type: Restrict to one analysis type
+        limit: Maximum number of results
+
+    Returns:
+        List of result dictionaries
+    """
+    key = query.strip().lower()
+
+    q = SampleCatalogEntry.query
+    if exact:
+        q = q.filter(SampleCatalogEntry.sample_key == key)
+    else:
+        q = q.filter(SampleCatalogEntry.sample_key.like(f"{escape_like(key)}%", escape='\\'))
+
+    if analysis_type:
+        q = q.filter(SampleCatalogEntry.analysis_type == analysis_type)
+
+    entries = q.order_by(
+        SampleCatalogEntry.sample_key,
+        SampleCatalogEntry.folder_path
+    ).limit(limit).all()
+
+    return [
+        {
+            "probennummer": entry.probennummer,
+            "source": entry.source,
+            "run_date": entry.run_date,
+            "analysis_type": entry.analysis_type,
+            "folder_path": entry.folder_path,
+            "files": entry.files or [],
+            "scanned_at": entry.scanned_at.strftime('%d.%m.%Y %H:%M') if entry.scanned_at else None
+        }
+        for entry in entries
+    ]
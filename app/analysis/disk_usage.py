@@ -0,0 +1,195 @@
+# analysis/disk_usage.py
+"""
+Disk usage of run folders
+Parallel scandir-based sizing, cached per directory and only rescanned
+when the directory mtime changes
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.core.utils import cleanup_old_cache
+from app.core.metrics import metrics
+
+logger = logging.getLogger('analysis')
+
+
+class DiskUsageCache:
+    """
+    Directory sizes with incremental recomputation
+
+    Every directory keeps its own file sizes together with its mtime. A
+    recomputation stats each directory but only lists those whose mtime
+    changed (files added, removed or renamed). Files rewritten in place
+    do not change the directory mtime and are picked up once the
+    directory itself changes.
+    """
+
+    def __init__(self, max_workers=4):
+        self._dirs = {}  # path -> (mtime_ns, own_bytes, own_files, subdirs, last used monotonic time)
+        self._totals = {}  # path -> ((size_bytes, file_count), timestamp)
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._max_workers = max_workers
+        self._executor = None
+        self._queue = None
+
+    def _get_executors(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='disk-usage'
+                )
+                # Background requests run one after another; each sizes its subtrees in parallel
+                self._queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix='disk-usage-queue')
+            return self._executor, self._queue
+
+    def _scan_directory(self, path):
+        """Own sizes and subdirectories of one directory (cached by mtime)"""
+        try:
+            mtime_ns = os.stat(path, follow_symlinks=False).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"Cannot stat {path}: {e}")
+            return 0, 0, []
+
+        with self._lock:
+            cached = self._dirs.get(path)
+            if cached and cached[0] == mtime_ns:
+                self._dirs[path] = cached[:4] + (time.monotonic(),)
+                return cached[1], cached[2], cached[3]
+
+        own_bytes = 0
+        own_files = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            own_bytes += entry.stat(follow_symlinks=False).st_size
+                            own_files += 1
+                    except OSError:
+                        continue
+        except (OSError, PermissionError) as e:
+            logger.warning(f"Error scanning {path}: {e}")
+
+        with self._lock:
+            self._dirs[path] = (mtime_ns, own_bytes, own_files, subdirs, time.monotonic())
+        return own_bytes, own_files, subdirs
+
+    def _size_tree(self, path):
+        """Total size and file count of a directory tree (single thread)"""
+        total_bytes = 0
+        total_files = 0
+        stack = [path]
+        while stack:
+            own_bytes, own_files, subdirs = self._scan_directory(stack.pop())
+            total_bytes += own_bytes
+            total_files += own_files
+            stack.extend(subdirs)
+        return total_bytes, total_files
+
+    def compute(self, path):
+        """
+        Size a directory tree, sizing its subfolders in parallel
+
+        Args:
+            path: Directory to size
+
+        Returns:
+            Tuple of (size_bytes, file_count)
+        """
+        started = time.monotonic()
+        executor, _ = self._get_executors()
+
+        own_bytes, own_files, subdirs = self._scan_directory(path)
+        total_bytes, total_files = own_bytes, own_files
+
+        now = datetime.now()
+        for subdir, result in zip(subdirs, executor.map(self._size_tree, subdirs)):
+            total_bytes += result[0]
+            total_files += result[1]
+            with self._lock:
+                self._totals[subdir] = (result, now)
+
+        with self._lock:
+            self._totals[path] = ((total_bytes, total_files), now)
+
+        metrics.observe('disk_usage_seconds', time.monotonic() - started)
+        return total_bytes, total_files
+
+    def get(self, path, max_age):
+        """
+        Get cached totals if they are younger than max_age seconds
+
+        Returns:
+            Tuple of (size_bytes, file_count, computed_at) or None
+        """
+        with self._lock:
+            entry = self._totals.get(path)
+        if entry is None:
+            return None
+
+        (size_bytes, file_count), timestamp = entry
+        if (datetime.now() - timestamp).total_seconds() > max_age:
+            return None
+        return size_bytes, file_count, timestamp
+
+    def request(self, paths, max_age):
+        """
+        Get cached totals and size missing or outdated paths in the background
+
+        Args:
+            paths: Directories to size
+            max_age: Maximum age of cached totals in seconds
+
+        Returns:
+            Dict of path -> (size_bytes, file_count, computed_at) or None if pending
+        """
+        results = {path: self.get(path, max_age) for path in paths}
+
+        with self._lock:
+            missing = [p for p, result in results.items() if result is None and p not in self._inflight]
+            self._inflight.update(missing)
+
+        if missing:
+            _, queue = self._get_executors()
+            queue.submit(self._request_worker, missing)
+
+        return results
+
+    def _request_worker(self, paths):
+        for path in paths:
+            try:
+                self.compute(path)
+            except Exception as e:
+                logger.error(f"Error computing disk usage of {path}: {e}")
+            finally:
+                with self._lock:
+                    self._inflight.discard(path)
+        logger.debug(f"Sized {len(paths)} folder(s) in the background")
+
+    def prune(self, max_age):
+        """
+        Remove totals older than max_age seconds and per-directory sizes
+        not used for max_age seconds (e.g. of deleted or no longer sized folders)
+
+        Returns:
+            Number of removed entries
+        """
+        limit = time.monotonic() - max_age
+        with self._lock:
+            before = len(self._totals) + len(self._dirs)
+            cleanup_old_cache(self._totals, max_age_seconds=max_age)
+            self._dirs = {path: entry for path, entry in self._dirs.items() if entry[4] >= limit}
+            return before - len(self._totals) - len(self._dirs)
+
+
+disk_usage = DiskUsageCache()
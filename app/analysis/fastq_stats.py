@@ -0,0 +1,177 @@
+# analysis/fastq_stats.py
+"""
+Streaming FASTQ read statistics
+Read count, total bases, length distribution and mean quality per file.
+Files are processed in the background on the shared process pool; requests
+return the results available so far and mark the others as pending.
+"""
+
+import zlib
+import logging
+import collections
+
+from .utils import BackgroundFileResults
+
+logger = logging.getLogger('analysis')
+
+READ_SIZE = 4 * 1024 * 1024  # 4MB
+GZIP_WBITS = zlib.MAX_WBITS | 16
+PHRED_OFFSET = 33
+
+
+
+def _iter_chunks(file_path):
+    """Yield decompressed chunks of a (gzipped) FASTQ file"""
+    with open(file_path, 'rb') as f:
+        if not file_path.endswith('.gz'):
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        member_open = False
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+
+            # Files may consist of several concatenated gzip members
+            while data:
+                yield decompressor.decompress(data)
+                member_open = True
+                if not decompressor.eof:
+                    break
+                member_open = False
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+
+        if member_open:
+            raise zlib.error("unexpected end of file")
+
+
+def compute_fastq_stats(file_path, max_reads=0):
+    """
+    Compute read statistics of a FASTQ file in one streaming pass
+    Runs in a worker process
+
+    Args:
+        file_path: Path to .fastq or .fastq.gz file
+        max_reads: Stop after this many reads (0 = whole file)
+
+    Returns:
+        Dict with read_count, total_bases, mean_quality, length_histogram
+        and sampled flag, or a dict with 'error'
+    """
+    read_count = 0
+    total_bases = 0
+    quality_sum = 0
+    lengths = collections.Counter()
+    remainder = b''
+    phase = 0  # line index within the current 4-line record
+    sampled = False
+
+    try:
+        for chunk in _iter_chunks(file_path):
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+
+            # Whole-chunk slicing instead of per-record parsing
+            sequences = lines[(1 - phase) % 4::4]
+            qualities = lines[(3 - phase) % 4::4]
+            phase = (phase + len(lines)) % 4
+
+            if max_reads and read_count + len(sequences) >= max_reads:
+                keep = max_reads - read_count
+                sequences = sequences[:keep]
+                qualities = qualities[:keep]
+                sampled = True
+
+            read_count += len(sequences)
+            lengths.update(map(len, sequences))
+            joined = b''.join(qualities)
+            total_bases += sum(map(len, sequences))
+            quality_sum += sum(joined) - PHRED_OFFSET * len(joined)
+
+            if sampled:
+                break
+
+        # Final record without trailing newline
+        if not sampled and remainder and phase == 3:
+            quality_sum += sum(remainder) - PHRED_OFFSET * len(remainder)
+
+    except zlib.error as e:
+        return {"error": f"Beschädigte gzip-Datei: {e}"}
+    except OSError as e:
+        return {"error": f"Datei nicht lesbar: {e}"}
+
+    return {
+        "read_count": read_count,
+        "total_bases": total_bases,
+        "mean_quality": round(quality_sum / total_bases, 2) if total_bases else None,
+        "length_histogram": dict(sorted(lengths.items())),
+        "sampled": sampled
+    }
+
+
+# (path, size, mtime, max_reads) -> stats
+_stats_results = BackgroundFileResults(compute_fastq_stats)
+
+
+def get_files_stats(file_paths, max_reads=0, max_workers=None):
+    """
+    Get statistics for FASTQ files and start computing uncached ones
+
+    Args:
+        file_paths: List of FASTQ file paths
+        max_reads: Reads per file to evaluate (0 = whole file)
+        max_workers: Size of the process pool
+
+    Returns:
+        Dict of path -> stats, None while the stats are being computed
+    """
+    return _stats_results.request(file_paths, max_reads, max_workers=max_workers)
+
+
+def merge_stats(stats_list):
+    """
+    Combine statistics of several files (e.g. lanes and mates of a sample)
+
+    Args:
+        stats_list: List of per-file stats dictionaries
+
+    Returns:
+        Combined stats dictionary
+    """
+    read_count = 0
+    total_bases = 0
+    quality_sum = 0.0
+    lengths = collections.Counter()
+    errors = []
+    sampled = False
+
+    for stats in stats_list:
+        if "error" in stats:
+            errors.append(stats["error"])
+            continue
+
+        read_count += stats["read_count"]
+        total_bases += stats["total_bases"]
+        if stats["mean_quality"] is not None:
+            quality_sum += stats["mean_quality"] * stats["total_bases"]
+        lengths.update({int(length): count for length, count in stats["length_histogram"].items()})
+        sampled = sampled or stats["sampled"]
+
+    merged = {
+        "files": len(stats_list),
+        "read_count": read_count,
+        "total_bases": total_bases,
+        "mean_length": round(total_bases / read_count, 1) if read_count else None,
+        "mean_quality": round(quality_sum / total_bases, 2) if total_bases else None,
+        "length_histogram": dict(sorted(lengths.items())),
+        "sampled": sampled
+    }
+    if errors:
+        merged["errors"] = errors
+    return merged
@@ -0,0 +1,185 @@
+# analysis/folder_cache.py
+"""
+Folder listing cache for the folder browser
+Background prefetch of likely next levels into the listing cache
+"""
+
+import os
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.core.utils import cleanup_old_cache
+
+logger = logging.getLogger('analysis')
+
+
+def scan_folder(path):
+    """
+    List subfolders of a directory (uncached)
+
+    Args:
+        path: Directory to list
+
+    Returns:
+        List of folder dictionaries sorted case-insensitive
+    """
+    folders = []
+    try:
+        if os.path.exists(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        folders.append({"name": entry.name, "path": entry.path})
+
+            # Sort case-insensitive
+            folders.sort(key=lambda x: x["name"].lower())
+    except (OSError, PermissionError) as e:
+        logger.error(f"Error listing folders in {path}: {e}")
+
+    return folders
+
+
+class FolderListingCache:
+    """Thread-safe listing cache with background subtree prefetch"""
+
+    def __init__(self, max_workers=4):
+        self._entries = {}  # path -> (folders, timestamp)
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._max_workers = max_workers
+        self._executor = None
+        self._prefetch_executor = None
+
+    def _get_executor(self):
+        """Executor for synchronous listings (list_many)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='folder-list'
+                )
+            return self._executor
+
+    def _get_prefetch_executor(self):
+        """Single-thread executor for prefetches, so they never delay requests waiting in list_many"""
+        with self._lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix='folder-prefetch'
+                )
+            return self._prefetch_executor
+
+    def get(self, path, max_age):
+        """
+        Get cached listing if it is younger than max_age seconds
+
+        Returns:
+            List of folder dictionaries or None
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+
+        folders, timestamp = entry
+        if (datetime.now() - timestamp).total_seconds() > max_age:
+            return None
+        return folders
+
+    def list(self, path, max_age):
+        """
+        Get listing from cache or scan the folder synchronously
+
+        Args:
+            path: Directory to list
+            max_age: Maximum age of cached entries in seconds
+
+        Returns:
+            List of folder dictionaries
+        """
+        folders = self.get(path, max_age)
+        if folders is None:
+            folders = scan_folder(path)
+            with self._lock:
+                self._entries[path] = (folders, datetime.now())
+        return folders
+
+    def list_many(self, paths, max_age):
+        """
+        List several folders, scanning uncached ones in parallel
+
+        Returns:
+            Dict of path -> list of folder dictionaries
+        """
+        results = {}
+        missing = []
+        for path in paths:
+            folders = self.get(path, max_age)
+            if folders is None:
+                missing.append(path)
+            else:
+                results[path] = folders
+
+        if len(missing) == 1:
+            results[missing[0]] = self.list(missing[0], max_age)
+        elif missing:
+            executor = self._get_executor()
+            for path, folders in zip(missing, executor.map(lambda p: self.list(p, max_age), missing)):
+                results[path] = folders
+
+        return results
+
+    def prefetch(self, paths, depth, budget, max_age):
+        """
+        Prefetch subtrees below paths into the cache in the background
+
+        Args:
+            paths: Start directories (their listings are fetched first)
+            depth: Number of levels below the start directories
+            budget: Maximum number of directories listed per prefetch
+            max_age: Maximum age of cached entries in seconds
+        """
+        if depth < 0 or budget <= 0:
+            return
+
+        with self._lock:
+            roots = [p for p in paths if p not in self._inflight]
+            self._inflight.update(roots)
+
+        if roots:
+            self._get_prefetch_executor().submit(self._prefetch_worker, roots, depth, budget, max_age)
+
+    def _prefetch_worker(self, roots, depth, budget, max_age):
+        listed = 0
+        queue = deque((root, 0) for root in roots)
+        try:
+            while queue and listed < budget:
+                path, level = queue.popleft()
+                folders = self.get(path, max_age)
+                if folders is None:
+                    folders = self.list(path, max_age)
+                    listed += 1
+
+                if level < depth:
+                    queue.extend((folder["path"], level + 1) for folder in folders)
+
+            logger.debug(f"Prefetched {listed} folder listings below {len(roots)} folder(s)")
+        except Exception as e:
+            logger.error(f"Error during folder prefetch: {e}")
+        finally:
+            with self._lock:
+                self._inflight.difference_update(roots)
+
+    def prune(self, max_age):
+        """Remove cache entries older than max_age seconds and return their number"""
+        with self._lock:
+            before = len(self._entries)
+            cleanup_old_cache(self._entries, max_age_seconds=max_age)
+            return before - len(self._entries)
+
+
+folder_cache = FolderListingCache()
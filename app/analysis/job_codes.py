@@ -0,0 +1,125 @@
+# analysis/job_codes.py
+"""
+Job code allocation
+Atomic per-(job type, day) counters instead of counting today's jobs
+"""
+
+import re
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update, func, cast, Integer
+
+from extensions import db
+from models import AnalysisJob, JobCodeSequence
+from app.core.utils import escape_like, generate_job_code
+
+logger = logging.getLogger('analysis')
+
+
+def _insert_statement():
+    """Dialect-specific INSERT supporting ON CONFLICT"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    raise NotImplementedError(f"Job code allocation is not supported on {dialect}")
+
+
+def _highest_existing_number(job_type, day):
+    """Highest number of existing codes of that type and day (seed for a new counter)"""
+    prefix = generate_job_code(job_type, 0, day).rsplit('_', 1)[0] + '_'
+    number = cast(func.substr(AnalysisJob.job_code, len(prefix) + 1), Integer)
+    # Deleted jobs leave gaps, so counting would hand out codes that still exist
+    return select(func.coalesce(func.max(number), 0)).where(
+        AnalysisJob.job_code.like(f"{escape_like(prefix)}%", escape='\\'),
+        AnalysisJob.job_code.regexp_match(f"^{re.escape(prefix)}[0-9]+$")
+    ).scalar_subquery()
+
+
+def reserve_job_numbers(job_type, count=1, day=None):
+    """
+    Reserve consecutive job numbers of a type and day
+
+    The counter row stays locked until the caller's transaction ends, so
+    concurrent submissions get distinct numbers. Rolling back releases the
+    reservation.
+
+    Args:
+        job_type: Type of analysis
+        count: Number of job numbers to reserve
+        day: Date of the job codes (defaults to today)
+
+    Returns:
+        First reserved number (the range is first .. first + count - 1)
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    day = day or datetime.now().date()
+    now = datetime.now(timezone.utc)
+
+    # Fast path: the counter for this day already exists (row lock, no scan)
+    last_value = db.session.execute(
+        update(JobCodeSequence).where(
+            JobCodeSequence.job_type == job_type,
+            JobCodeSequence.day == day
+        ).values(
+            last_value=JobCodeSequence.last_value + count,
+            updated_at=now
+        ).returning(JobCodeSequence.last_value)
+    ).scalar_one_or_none()
+
+    if last_value is None:
+        # First job of the day: seed from existing codes (e.g. created before the counter existed)
+        insert = _insert_statement()
+        stmt = insert(JobCodeSequence).values(
+            job_type=job_type,
+            day=day,
+            last_value=_highest_existing_number(job_type, day) + count,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobCodeSequence.job_type, JobCodeSequence.day],
+            set_={
+                'last_value': JobCodeSequence.last_value + count,
+                'updated_at': now
+            }
+        ).returning(JobCodeSequence.last_value)
+        last_value = db.session.execute(stmt).scalar_one()
+
+    return last_value - count + 1
+
+
+def reserve_job_codes(job_type, count=1, day=None):
+    """
+    Reserve job codes for several jobs at once (e.g. bulk submissions)
+
+    Args:
+        job_type: Type of analysis
+        count: Number of codes
+        day: Date of the job codes (defaults to today)
+
+    Returns:
+        List of job codes
+    """
+    day = day or datetime.now().date()
+    first = reserve_job_numbers(job_type, count, day)
+    return [generate_job_code(job_type, number, day) for number in range(first, first + count)]
+
+
+def next_job_code(job_type, day=None):
+    """
+    Allocate the next job code of a type (caller commits)
+
+    Args:
+        job_type: Type of analysis
+        day: Date of the job code (defaults to today)
+
+    Returns:
+        Job code string
+    """
+    return reserve_job_codes(job_type, 1, day)[0]
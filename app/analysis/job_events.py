@@ -0,0 +1,65 @@
+# analysis/job_events.py
+"""
+Job status event log
+Transitions are queued on the session and inserted in one batch right
+before the session commits, so they are part of the caller's transaction
+and disappear with a rollback
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import JobEvent
+from app.core.utils import ANALYSIS_HOSTS
+
+logger = logging.getLogger('analysis')
+
+_PENDING_KEY = 'pending_job_events'
+
+
+def record_job_event(job, from_status, to_status, cause=None, user_id=None, detail=None, at=None):
+    """
+    Queue a status transition of a job (written when the session commits)
+
+    Args:
+        job: AnalysisJob instance (may not have an id yet)
+        from_status: Previous status (None for a new job)
+        to_status: New status
+        cause: Why the status changed (e.g. started, cancelled, stuck)
+        user_id: User who caused the transition
+        detail: Additional information (e.g. error message)
+        at: Time of the transition (defaults to now)
+    """
+    db.session.info.setdefault(_PENDING_KEY, []).append((job, {
+        'from_status': from_status,
+        'to_status': to_status,
+        'cause': cause,
+        'host': ANALYSIS_HOSTS.get(job.job_type),
+        'user_id': user_id,
+        'detail': detail[:2000] if detail else None,
+        'created_at': at or datetime.now(timezone.utc)
+    }))
+
+
+@event.listens_for(Session, 'before_commit')
+def _insert_pending_events(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    # New jobs get their id with the flush
+    session.flush()
+    session.execute(insert(JobEvent), [
+        {**values, 'job_id': job.id, 'job_code': job.job_code, 'job_type': job.job_type}
+        for job, values in pending
+    ])
+    logger.debug(f"Recorded {len(pending)} job events")
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_events(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,97 @@
+# analysis/maintenance.py
+"""
+Maintenance tasks of the analysis module
+Registered with the maintenance scheduler at application startup
+"""
+
+import logging
+
+from flask import current_app
+from sqlalchemy import func
+
+from extensions import db
+from models import AnalysisJob, MaintenanceTask
+from app.core.metrics import metrics
+from app.core.utils import JOB_STATUSES
+from .services import AnalysisService
+from .folder_cache import folder_cache
+from .disk_usage import disk_usage
+from .run_metadata import prune_run_folders
+from .catalog import refresh_catalog
+from .scan_tasks import prune_scan_tasks
+
+logger = logging.getLogger('analysis')
+
+
+def expire_stuck_jobs():
+    """Mark jobs running longer than JOB_TIMEOUT_HOURS as failed"""
+    return {'expired': AnalysisService.expire_stuck_jobs()}
+
+
+def prune_caches():
+    """Drop expired entries from the in-process folder, size and run folder caches"""
+    config = current_app.config
+    return {
+        'folder_listings': folder_cache.prune(config.get('BROWSE_CACHE_SECONDS', 300)),
+        'disk_usage': disk_usage.prune(config.get('DISK_USAGE_CACHE_SECONDS', 900)),
+        'run_folders': prune_run_folders(config.get('CATALOG_REFRESH_SECONDS', 3600))
+    }
+
+
+def _export_job_gauges(counts):
+    for status, by_type in counts.items():
+        metrics.set_gauge('analysis_jobs', sum(by_type.values()), status=status)
+        for job_type, count in by_type.items():
+            metrics.set_gauge('analysis_jobs', count, status=status, job_type=job_type)
+
+
+def refresh_job_stats():
+    """
+    Count jobs per status and type (shared task, one worker per interval)
+
+    The counts are recorded as the result of the task, from which every
+    worker exports them as metrics gauges (see export_job_stats).
+    """
+    counts = {status: {} for status in JOB_STATUSES}
+    rows = db.session.query(
+        AnalysisJob.status, AnalysisJob.job_type, func.count(AnalysisJob.id)
+    ).group_by(AnalysisJob.status, AnalysisJob.job_type).all()
+    for status, job_type, count in rows:
+        counts.setdefault(status, {})[job_type] = count
+
+    _export_job_gauges(counts)
+    return counts
+
+
+def export_job_stats():
+    """Export the job counts of the last refresh_job_stats run (of any worker) as metrics gauges"""
+    task = db.session.get(MaintenanceTask, 'refresh_job_stats')
+    counts = task.last_result if task is not None else None
+    if not counts:
+        return {'exported': 0}
+    _export_job_gauges(counts)
+    return {'exported': sum(len(by_type) for by_type in counts.values())}
+
+
+def register_maintenance_tasks(scheduler, config):
+    """
+    Register the analysis maintenance tasks
+
+    Args:
+        scheduler: MaintenanceScheduler
+        config: Application config
+    """
+    scheduler.register('expire_stuck_jobs', expire_stuck_jobs,
+                       config.get('MAINTENANCE_STUCK_JOBS_SECONDS', 300))
+    scheduler.register('refresh_catalog', lambda: {'samples': refresh_catalog()},
+                       config.get('MAINTENANCE_CATALOG_SECONDS', 3600))
+    scheduler.register('refresh_job_stats', refresh_job_stats,
+                       config.get('MAINTENANCE_JOB_STATS_SECONDS', 300))
+    scheduler.register('prune_scan_tasks',
+                       lambda: {'deleted': prune_scan_tasks(config.get('SCAN_TASK_TTL_SECONDS', 3600))},
+                       config.get('MAINTENANCE_CACHE_PRUNE_SECONDS', 600))
+    # In-process state: every worker prunes its own caches and exports its own gauges
+    scheduler.register('prune_caches', prune_caches,
+                       config.get('MAINTENANCE_CACHE_PRUNE_SECONDS', 600), shared=False)
+    scheduler.register('export_job_stats', export_job_stats,
+                       config.get('MAINTENANCE_JOB_STATS_SECONDS', 300), shared=False)
@@ -0,0 +1,211 @@
+# analysis/preflight.py
+"""
+Input preflight before job submission
+Checks R1/R2 pairing, lane completeness and the headers of FASTQ files
+within the request (only the first block of each file is read). Complete
+gzip decompression, which catches files truncated at the end, runs in the
+background on the shared process pool; its results are cached by
+(path, size, mtime) and reported by later preflight calls.
+"""
+
+import os
+import time
+import zlib
+import logging
+import collections
+
+from .utils import list_fastq_files, parse_fastq_filename, BackgroundFileResults
+
+logger = logging.getLogger('analysis')
+
+HEADER_READ_SIZE = 64 * 1024
+GZIP_READ_SIZE = 1024 * 1024  # 1MB
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+
+def check_fastq_header(file_path):
+    """
+    Check that a FASTQ file (plain or gzip) starts with a FASTQ record
+
+    Args:
+        file_path: Path to FASTQ file
+
+    Returns:
+        Dict with 'ok' and optional 'error'
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read(HEADER_READ_SIZE)
+    except OSError as e:
+        return {"ok": False, "error": f"Datei nicht lesbar: {e}"}
+
+    if not data:
+        return {"ok": False, "error": "Datei ist leer"}
+
+    if file_path.endswith('.gz'):
+        try:
+            data = zlib.decompressobj(GZIP_WBITS).decompress(data, HEADER_READ_SIZE)
+        except zlib.error as e:
+            return {"ok": False, "error": f"Beschädigte gzip-Datei: {e}"}
+        if not data:
+            return {"ok": False, "error": "Unerwartetes Dateiende (gzip-Datei abgeschnitten)"}
+
+    if not data.startswith(b'@'):
+        return {"ok": False, "error": "Kein FASTQ-Format (Datei beginnt nicht mit '@')"}
+    return {"ok": True}
+
+
+def check_gzip_integrity(file_path):
+    """
+    Decompress a gzip file completely to verify its integrity
+    Runs in a worker process
+
+    Args:
+        file_path: Path to .gz file
+
+    Returns:
+        Dict with 'ok' and optional 'error'
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            member_open = False
+
+            while True:
+                chunk = f.read(GZIP_READ_SIZE)
+                if not chunk:
+                    break
+
+                # Files may consist of several concatenated gzip members
+                while chunk:
+                    decompressor.decompress(chunk)
+                    member_open = True
+                    if not decompressor.eof:
+                        break
+                    member_open = False
+                    chunk = decompressor.unused_data
+                    decompressor = zlib.decompressobj(GZIP_WBITS)
+
+            if member_open:
+                return {"ok": False, "error": "Unerwartetes Dateiende (gzip-Datei abgeschnitten)"}
+            return {"ok": True}
+
+    except zlib.error as e:
+        return {"ok": False, "error": f"Beschädigte gzip-Datei: {e}"}
+    except OSError as e:
+        return {"ok": False, "error": f"Datei nicht lesbar: {e}"}
+
+
+# (path, size, mtime) -> integrity result
+_integrity_checks = BackgroundFileResults(check_gzip_integrity)
+
+
+def run_preflight(folder_path, selected_samples=None, recursive=False, integrity=True, max_workers=None):
+    """
+    Check pairing, lane completeness and headers of the FASTQ files of a run
+    and report the gzip integrity results known so far
+
+    Args:
+        folder_path: Validated run folder
+        selected_samples: Probennummern to check (None = all samples)
+        recursive: Whether to search recursively (as the samples were scanned)
+        integrity: Start background integrity checks of unchecked .gz files
+                   and include finished results
+        max_workers: Size of the process pool
+
+    Returns:
+        Dict with 'ok', per-sample results, a list of error messages and the
+        number of files whose integrity check is still running
+    """
+    started = time.monotonic()
+    selected = set(selected_samples) if selected_samples else None
+
+    # One entry per sample and directory; subfolders can hold other runs with the same samples
+    samples = collections.OrderedDict()
+    run_lanes = collections.defaultdict(set)  # directory -> lanes seen in that run
+
+    for file_path in list_fastq_files(folder_path, recursive=recursive):
+        parsed = parse_fastq_filename(file_path)
+        if not parsed:
+            continue
+
+        key, sample, read_info = parsed
+        if read_info["lane"] is not None:
+            run_lanes[sample["file_path"]].add(read_info["lane"])
+
+        if selected is not None and sample["probennummer"] not in selected:
+            continue
+
+        entry = samples.setdefault((key, sample["file_path"]), {
+            "probennummer": sample["probennummer"],
+            "platform": read_info["platform"],
+            "directory": sample["file_path"],
+            "files": [],
+            "reads": collections.defaultdict(set),
+            "errors": []
+        })
+        entry["files"].append(file_path)
+        if read_info["lane"] is not None:
+            entry["reads"][read_info["lane"]].add(read_info["read"])
+
+    errors = []
+
+    if selected is not None:
+        found = {entry["probennummer"] for entry in samples.values()}
+        for probennummer in sorted(selected - found):
+            errors.append(f"{probennummer}: keine FASTQ-Dateien gefunden")
+
+    integrity_results = {}
+    if integrity:
+        gzip_files = [path for entry in samples.values() for path in entry["files"] if path.endswith('.gz')]
+        integrity_results = _integrity_checks.request(gzip_files, max_workers=max_workers)
+    pending = sum(1 for result in integrity_results.values() if result is None)
+
+    for entry in samples.values():
+        # Pairing and lane completeness (Illumina only, IonTorrent is single-end)
+        if entry["platform"] == "illumina":
+            for lane in sorted(run_lanes[entry["directory"]]):
+                reads = entry["reads"].get(lane, set())
+                if not reads:
+                    entry["errors"].append(f"Lane L{lane:03d} fehlt")
+                elif reads != {1, 2}:
+                    missing = 2 if 1 in reads else 1
+                    entry["errors"].append(f"R{missing} fehlt für Lane L{lane:03d}")
+
+        for path in entry["files"]:
+            result = check_fastq_header(path)
+            if result["ok"]:
+                result = integrity_results.get(path) or result
+            if not result["ok"]:
+                entry["errors"].append(f"{os.path.basename(path)}: {result['error']}")
+
+        label = entry["probennummer"]
+        if entry["directory"] != folder_path:
+            label += f" ({os.path.relpath(entry['directory'], folder_path)})"
+        errors.extend(f"{label}: {error}" for error in entry["errors"])
+
+    checked = sum(len(entry["files"]) for entry in samples.values())
+    duration_ms = int((time.monotonic() - started) * 1000)
+    logger.info(
+        f"Preflight for {folder_path}: {len(samples)} samples, {checked} files, "
+        f"{len(errors)} errors ({pending} integrity checks running) in {duration_ms} ms"
+    )
+
+    return {
+        "ok": not errors,
+        "errors": errors,
+        "samples": [
+            {
+                "probennummer": entry["probennummer"],
+                "directory": entry["directory"],
+                "platform": entry["platform"],
+                "files": len(entry["files"]),
+                "lanes": sorted(entry["reads"]),
+                "errors": entry["errors"]
+            }
+            for entry in samples.values()
+        ],
+        "checked_files": checked,
+        "pending_files": pending,
+        "duration_ms": duration_ms
+    }
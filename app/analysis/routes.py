@@ -10,7 +10,11 @@ from flask_login import login_required, current_user
 from werkzeug.exceptions import BadRequest, NotFound, Forbidden
 
 from app.core.utils import validate_path, is_valid_report_file
+from app.core.db_routing import read_only
+from app.core.audit import audit_log
+from app.core.auth import require_admin
 from .services import AnalysisService
+from .scan_scheduler import ScanRejected
 
 logger = logging.getLogger('analysis')
 
@@ -20,9 +24,7 @@ analysis_bp = Blueprint('analysis', __name__)
 @analysis_bp.route('/analysis', methods=['GET'])
 @login_required
 def analysis():
-    """Main analysis page with optimized job handling"""
-    AnalysisService.cleanup_stuck_jobs()
-    
+    """Main analysis page (read-only; stuck jobs are expired by the maintenance scheduler)"""
     running_job = AnalysisService.get_running_job(current_user.id)
     
     if running_job:
@@ -39,8 +41,15 @@ def get_samples():
     """Get samples from folder with validation and optional recursive search"""
     folder_path = request.form.get('folder_path', '').strip()
     recursive = request.form.get('recursive', 'false').lower() == 'true'
+    with_stats = request.form.get('stats', 'false').lower() == 'true'
     
-    samples, error = AnalysisService.get_samples(folder_path, recursive)
+    try:
+        samples, error = AnalysisService.get_samples(folder_path, recursive, with_stats, current_user.id)
+    except ScanRejected as e:
+        logger.warning(f"Scan of {folder_path} rejected for user {current_user.username}: {e}")
+        response = jsonify({"error": str(e), "retry_after": e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, e.status_code
     
     if error:
         if samples is None:
@@ -48,9 +57,79 @@ def get_samples():
         else:
             return jsonify({"samples": [], "message": error}), 200
     
+    if with_stats:
+        # Statistics are computed in the background; clients ask again while some are pending
+        pending = sum(1 for sample in samples if sample.get("stats", {}).get("pending"))
+        return jsonify({"samples": samples, "stats_pending": pending})
     return jsonify({"samples": samples})
 
 
+@analysis_bp.route('/api/scan_tasks', methods=['POST'])
+@login_required
+def api_start_scan_task():
+    """Start a background sample scan; progress is polled via the task id"""
+    folder_path = request.form.get('folder_path', '').strip()
+    recursive = request.form.get('recursive', 'false').lower() == 'true'
+    
+    task, error = AnalysisService.start_scan_task(folder_path, recursive, current_user.id)
+    
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return jsonify(task), 202
+
+
+@analysis_bp.route('/api/scan_tasks/<task_id>')
+@login_required
+def api_scan_task(task_id):
+    """Progress and samples found since the given offset"""
+    offset = request.args.get('offset', 0, type=int)
+    
+    task = AnalysisService.get_scan_task(task_id, offset)
+    
+    if task is None:
+        return jsonify({"error": "Suchauftrag nicht gefunden"}), 404
+    
+    return jsonify(task)
+
+
+@analysis_bp.route('/api/samples/search')
+@login_required
+def api_search_samples():
+    """Find run folders containing a sample by probennummer (prefix or exact)"""
+    query = request.args.get('q', '').strip()
+    exact = request.args.get('exact', 'false').lower() == 'true'
+    analysis_type = request.args.get('analysis_type', '').strip() or None
+    limit = request.args.get('limit', 100, type=int)
+    
+    results, error = AnalysisService.search_samples(query, exact, analysis_type, limit)
+    
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return jsonify({"query": query, "results": results})
+
+
+@analysis_bp.route('/api/preflight', methods=['POST'])
+@login_required
+def api_preflight():
+    """
+    Check pairing and headers of the selected FASTQ files before submission
+    Also starts the gzip integrity checks; clients repeat the call while
+    pending_files is not 0
+    """
+    folder_path = request.form.get('folder_path', '').strip()
+    selected_samples = request.form.getlist('selected_samples') or None
+    recursive = request.form.get('recursive', 'false').lower() == 'true'
+    
+    result, error = AnalysisService.preflight(folder_path, selected_samples, recursive)
+    
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return jsonify(result)
+
+
 @analysis_bp.route('/start_analysis', methods=['POST'])
 @login_required
 def start_analysis():
@@ -61,6 +140,7 @@ def start_analysis():
         analysis_type = request.form.get('analysis_type', '').strip()
         run_name = request.form.get('run_name', '').strip()
         selected_samples = request.form.getlist('selected_samples')
+        recursive = request.form.get('recursive', 'false').lower() == 'true'
         
         # Validation
         if not all([folder_path, analysis_type, selected_samples]):
@@ -73,7 +153,8 @@ def start_analysis():
             folder_path,
             analysis_type,
             run_name,
-            selected_samples
+            selected_samples,
+            recursive
         )
         
         if error:
@@ -91,16 +172,39 @@ def start_analysis():
 def browse_folder():
     """Browse folders with caching and validation"""
     path = request.args.get("path", "").strip()
+    levels = request.args.get("levels", 1, type=int)
+    with_counts = request.args.get("counts", "false").lower() == "true"
+    with_sizes = request.args.get("sizes", "false").lower() == "true"
     
-    folders, current_path, error = AnalysisService.browse_folder(path)
+    folders, current_path, error = AnalysisService.browse_folder(path, levels, with_counts, with_sizes)
     
     if error:
         return jsonify({"error": error}), 400
     
-    return jsonify({
+    result = {
         "current": current_path,
         "folders": folders
-    })
+    }
+    if with_sizes:
+        result["sizes_pending"] = any(folder.get("size_pending") for folder in folders)
+    
+    return jsonify(result)
+
+
+@analysis_bp.route('/api/disk_usage')
+@login_required
+@require_admin
+def api_disk_usage():
+    """Largest run folders by disk usage (sizes are computed in the background)"""
+    analysis_type = request.args.get('analysis_type', '').strip() or None
+    limit = request.args.get('limit', 20, type=int)
+    
+    result, error = AnalysisService.get_largest_run_folders(analysis_type, limit)
+    
+    if error:
+        return jsonify({"error": error}), 400
+    
+    return jsonify(result)
 
 
 @analysis_bp.route('/force_reset', methods=['POST'])
@@ -109,6 +213,7 @@ def force_reset():
     """Force reset all running jobs for current user (emergency function)"""
     reset_count = AnalysisService.force_reset_user_jobs(current_user.id)
     logger.info(f"Force-reset {reset_count} jobs for user {current_user.username}")
+    audit_log.record('job.force_reset', 'user', current_user.id, detail={'reset_count': reset_count})
     return redirect(url_for('analysis.analysis'))
 
 
@@ -120,12 +225,14 @@ def cancel_analysis(job_id):
     
     if not success and error:
         logger.error(f"Failed to cancel job {job_id}: {error}")
+    audit_log.record('job.cancel', 'job', job_id, success=success, detail={'error': error} if error else None)
     
     return redirect(url_for('analysis.analysis'))
 
 
 @analysis_bp.route('/api/progress/<int:job_id>')
 @login_required
+@read_only
 def api_progress(job_id):
     """API endpoint for job progress with status updates"""
     result = AnalysisService.get_job_progress(job_id, current_user.id)
@@ -138,6 +245,7 @@ def api_progress(job_id):
 
 @analysis_bp.route('/api/log/<int:job_id>')
 @login_required
+@read_only
 def api_log(job_id):
     """API endpoint for job logs with error handling"""
     result = AnalysisService.get_job_log(job_id, current_user.id)
@@ -0,0 +1,434 @@
+# analysis/run_metadata.py
+"""
+Run metadata ingestion
+Parses Illumina SampleSheet.csv/RunInfo.xml and IonTorrent ion_params/explog
+once per run folder and keeps the result in the database
+"""
+
+import io
+import os
+import csv
+import json
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import RunMetadata
+from app.core.utils import cleanup_old_cache, ANALYSIS_BASE_PATHS
+from .utils import FASTQ_PATTERN
+
+logger = logging.getLogger('analysis')
+
+SAMPLE_SHEET = 'SampleSheet.csv'
+RUN_INFO = 'RunInfo.xml'
+ION_PARAMS = 'ion_params_00.json'
+EXPLOG_FILES = ('explog_final.txt', 'explog.txt')
+METADATA_FILES = (SAMPLE_SHEET, RUN_INFO, ION_PARAMS) + EXPLOG_FILES
+
+DATE_FORMATS = (
+    '%y%m%d',                   # RunInfo.xml (MiSeq, NextSeq)
+    '%Y%m%d',
+    '%m/%d/%Y %I:%M:%S %p',     # RunInfo.xml (NovaSeq)
+    '%m/%d/%Y %H:%M:%S',        # explog.txt
+    '%m/%d/%Y',
+    '%d.%m.%Y',
+    '%a %b %d %H:%M:%S %Y',
+)
+
+# FASTQ directory -> (run folder or None, timestamp)
+_run_folders = {}
+_run_folders_lock = threading.Lock()
+
+
+def normalize_date(value):
+    """
+    Convert the date formats used in run files to YYYY-MM-DD
+
+    Args:
+        value: Date string
+
+    Returns:
+        ISO date string or None if unparseable
+    """
+    if not value:
+        return None
+
+    value = str(value).strip()
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        pass
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _add_sample(samples, sample_id, details):
+    """Merge one sample sheet row into samples (lanes are accumulated)"""
+    entry = samples.setdefault(sample_id.lower(), {"sample_id": sample_id, "lanes": []})
+    lane = details.pop("lane", None)
+    if lane and lane not in entry["lanes"]:
+        entry["lanes"].append(lane)
+    entry.update({key: value for key, value in details.items() if value})
+
+
+def parse_sample_sheet(path):
+    """
+    Parse an Illumina sample sheet (v1 [Data] or v2 [BCLConvert_Data])
+
+    Args:
+        path: Path to SampleSheet.csv
+
+    Returns:
+        Dict with 'header' (key -> value) and 'samples' (lowercase id -> details)
+    """
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        rows = list(csv.reader(io.StringIO(f.read())))
+
+    sections = {}
+    current = None
+    for row in rows:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        first = row[0].strip()
+        if first.startswith('[') and first.endswith(']'):
+            current = sections.setdefault(first[1:-1].lower(), [])
+            continue
+        if current is not None:
+            current.append([cell.strip() for cell in row])
+
+    header = {row[0]: row[1] for row in sections.get('header', []) if len(row) > 1 and row[0]}
+
+    samples = {}
+    data = sections.get('data') or sections.get('bclconvert_data') or []
+    if data:
+        columns = [column.lower() for column in data[0]]
+        for row in data[1:]:
+            record = dict(zip(columns, row))
+            sample_id = record.get('sample_id')
+            if not sample_id:
+                continue
+            _add_sample(samples, sample_id, {
+                "sample_name": record.get('sample_name'),
+                "sample_project": record.get('sample_project'),
+                "index": record.get('index'),
+                "index2": record.get('index2'),
+                "lane": record.get('lane')
+            })
+
+    # v2 sheets keep the project in a separate section
+    cloud = sections.get('cloud_data') or []
+    if cloud:
+        columns = [column.lower() for column in cloud[0]]
+        for row in cloud[1:]:
+            record = dict(zip(columns, row))
+            if record.get('sample_id'):
+                _add_sample(samples, record['sample_id'], {"sample_project": record.get('projectname')})
+
+    # FASTQ files are named after Sample_Name if it is set
+    for entry in list(samples.values()):
+        name = entry.get("sample_name")
+        if name and name.lower() not in samples:
+            samples[name.lower()] = entry
+
+    return {"header": header, "samples": samples}
+
+
+def parse_run_info(path):
+    """
+    Parse an Illumina RunInfo.xml
+
+    Args:
+        path: Path to RunInfo.xml
+
+    Returns:
+        Dict with run_id, instrument, flowcell and run_date
+    """
+    run = ET.parse(path).getroot().find('Run')
+    if run is None:
+        return {}
+
+    return {
+        "run_id": run.get('Id'),
+        "instrument": run.findtext('Instrument'),
+        "flowcell": run.findtext('Flowcell'),
+        "run_date": normalize_date(run.findtext('Date'))
+    }
+
+
+def parse_explog(path):
+    """
+    Parse the key/value header of an IonTorrent explog
+
+    Args:
+        path: Path to explog.txt or explog_final.txt
+
+    Returns:
+        Dict of key -> value (first occurrence wins)
+    """
+    values = {}
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if sep and key.strip() and key.strip() not in values:
+                values[key.strip()] = value.strip()
+    return values
+
+
+def parse_ion_params(path):
+    """
+    Parse IonTorrent ion_params_00.json
+
+    Args:
+        path: Path to ion_params_00.json
+
+    Returns:
+        Dict with run fields and 'samples' (lowercase barcode -> details)
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        params = json.load(f)
+
+    exp = params.get('exp_json') or {}
+    if isinstance(exp, str):
+        exp = json.loads(exp)
+
+    settings = params.get('experimentAnalysisSettings') or {}
+    barcoded = settings.get('barcodedSamples') or {}
+    if isinstance(barcoded, str):
+        barcoded = json.loads(barcoded)
+
+    samples = {}
+    for sample_name, info in barcoded.items():
+        for barcode in (info or {}).get('barcodes', []):
+            samples[barcode.lower()] = {"sample_name": sample_name, "barcode": barcode}
+
+    return {
+        "run_id": exp.get('expName') or params.get('expName'),
+        "instrument": exp.get('pgmName') or params.get('pgmName'),
+        "flowcell": exp.get('chipBarcode') or exp.get('chipType'),
+        "run_date": normalize_date(exp.get('date')),
+        "experiment_name": exp.get('displayName') or params.get('resultsName'),
+        "samples": samples
+    }
+
+
+def source_signature(run_path):
+    """
+    Modification times of the metadata files present in a run folder
+
+    Args:
+        run_path: Run folder
+
+    Returns:
+        Dict of file name -> mtime_ns
+    """
+    signature = {}
+    for name in METADATA_FILES:
+        try:
+            signature[name] = os.stat(os.path.join(run_path, name)).st_mtime_ns
+        except OSError:
+            continue
+    return signature
+
+
+def read_run_metadata(run_path, signature):
+    """
+    Parse all metadata files of a run folder
+
+    Args:
+        run_path: Run folder
+        signature: Result of source_signature(run_path)
+
+    Returns:
+        Dict of RunMetadata column values
+    """
+    metadata = {"platform": None, "samples": {}}
+
+    def parse(name, parser):
+        try:
+            return parser(os.path.join(run_path, name))
+        except Exception as e:
+            logger.warning(f"Cannot parse {name} in {run_path}: {e}")
+            return None
+
+    if SAMPLE_SHEET in signature or RUN_INFO in signature:
+        metadata["platform"] = "illumina"
+
+        if RUN_INFO in signature:
+            metadata.update(parse(RUN_INFO, parse_run_info) or {})
+
+        sheet = parse(SAMPLE_SHEET, parse_sample_sheet) if SAMPLE_SHEET in signature else None
+        if sheet:
+            header = sheet["header"]
+            metadata["samples"] = sheet["samples"]
+            metadata["experiment_name"] = header.get('Experiment Name') or header.get('RunName')
+            metadata["run_date"] = metadata.get("run_date") or normalize_date(header.get('Date'))
+            metadata["instrument"] = metadata.get("instrument") or header.get('Instrument Type')
+    else:
+        metadata["platform"] = "iontorrent"
+
+        if ION_PARAMS in signature:
+            metadata.update(parse(ION_PARAMS, parse_ion_params) or {})
+
+        explog_name = next((name for name in EXPLOG_FILES if name in signature), None)
+        explog = parse(explog_name, parse_explog) if explog_name else None
+        if explog:
+            metadata["run_id"] = metadata.get("run_id") or explog.get('Experiment Name')
+            metadata["instrument"] = metadata.get("instrument") or explog.get('Device Name') or explog.get('PGM HW')
+            metadata["flowcell"] = metadata.get("flowcell") or explog.get('ChipBarcode') or explog.get('Chip Type')
+            metadata["run_date"] = metadata.get("run_date") or normalize_date(explog.get('Start Time'))
+
+    return metadata
+
+
+def find_run_folder(folder_path, max_levels=4, max_age=3600):
+    """
+    Find the run folder holding metadata files for a FASTQ directory
+    Searches the directory and its parents up to the analysis base path
+
+    Args:
+        folder_path: Directory containing FASTQ files
+        max_levels: Number of parent directories to search
+        max_age: Maximum age of cached lookups in seconds
+
+    Returns:
+        Run folder path or None
+    """
+    with _run_folders_lock:
+        cached = _run_folders.get(folder_path)
+    if cached and (datetime.now() - cached[1]).total_seconds() <= max_age:
+        return cached[0]
+
+    base_paths = {path.rstrip('/') for path in ANALYSIS_BASE_PATHS.values()}
+    run_path = None
+    current = folder_path.rstrip('/')
+    for _ in range(max_levels + 1):
+        if not current or current in base_paths:
+            break
+        if any(os.path.isfile(os.path.join(current, name)) for name in METADATA_FILES):
+            run_path = current
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+
+    with _run_folders_lock:
+        _run_folders[folder_path] = (run_path, datetime.now())
+        if len(_run_folders) > 10000:
+            cleanup_old_cache(_run_folders, max_age_seconds=max_age)
+    return run_path
+
+
+def prune_run_folders(max_age=3600):
+    """
+    Remove cached run folder lookups older than max_age seconds
+
+    Returns:
+        Number of removed lookups
+    """
+    with _run_folders_lock:
+        before = len(_run_folders)
+        cleanup_old_cache(_run_folders, max_age_seconds=max_age)
+        return before - len(_run_folders)
+
+
+def export_run_metadata(row):
+    """Run-level fields of a RunMetadata row"""
+    return {
+        "platform": row.platform,
+        "run_id": row.run_id,
+        "instrument": row.instrument,
+        "flowcell": row.flowcell,
+        "run_date": row.run_date,
+        "experiment_name": row.experiment_name
+    }
+
+
+def get_run_metadata(folder_paths, max_levels=4, max_age=3600):
+    """
+    Get metadata for FASTQ directories, parsing run files only when they changed
+    Requires an application context
+
+    Args:
+        folder_paths: Directories containing FASTQ files
+        max_levels: Number of parent directories searched for run files
+        max_age: Maximum age of cached run folder lookups in seconds
+
+    Returns:
+        Dict of folder path -> RunMetadata instance (folders without run files are omitted)
+    """
+    run_paths = {}
+    for folder_path in set(folder_paths):
+        run_path = find_run_folder(folder_path, max_levels, max_age)
+        if run_path:
+            run_paths[folder_path] = run_path
+
+    if not run_paths:
+        return {}
+
+    unique_runs = set(run_paths.values())
+    rows = {
+        row.run_path: row
+        for row in RunMetadata.query.filter(RunMetadata.run_path.in_(unique_runs)).all()
+    }
+
+    changed = 0
+    for run_path in unique_runs:
+        signature = source_signature(run_path)
+        row = rows.get(run_path)
+        if row is not None and row.source_files == signature:
+            continue
+
+        values = read_run_metadata(run_path, signature)
+        if row is None:
+            row = rows[run_path] = RunMetadata(run_path=run_path)
+            db.session.add(row)
+        for key in ('platform', 'run_id', 'instrument', 'flowcell', 'run_date', 'experiment_name', 'samples'):
+            setattr(row, key, values.get(key))
+        row.source_files = signature
+        row.parsed_at = datetime.now(timezone.utc)
+        changed += 1
+
+    if changed:
+        try:
+            db.session.commit()
+            logger.info(f"Parsed run metadata of {changed} run folder(s)")
+        except IntegrityError:
+            # Another worker ingested the same run concurrently
+            db.session.rollback()
+            logger.info("Run metadata was ingested concurrently, using stored rows")
+            rows = {
+                row.run_path: row
+                for row in RunMetadata.query.filter(RunMetadata.run_path.in_(unique_runs)).all()
+            }
+
+    return {folder: rows[run] for folder, run in run_paths.items() if run in rows}
+
+
+def sample_lookup_key(file_path):
+    """
+    Key of a FASTQ file in the run's sample table
+
+    Args:
+        file_path: Path to FASTQ file
+
+    Returns:
+        Lowercase Sample_ID/Sample_Name (Illumina), barcode (IonTorrent) or None
+    """
+    match = FASTQ_PATTERN.search(os.path.basename(file_path))
+    if not match:
+        return None
+    if match.group("ion_sample"):
+        return f"ionxpress_{match.group('ion_sample')}"
+    if match.group("illumina_source"):
+        return f"{match.group('illumina_source')}-{match.group('illumina_id')}".lower()
+    return match.group("special_source").lower()
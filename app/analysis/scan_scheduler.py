@@ -0,0 +1,417 @@
+# analysis/scan_scheduler.py
+"""
+Admission control for expensive filesystem scans
+Global and per-user concurrency limits, a bounded wait queue and
+deduplication of identical in-flight scans. The limits are enforced across
+worker processes by leasing scan slots in the database; the wait queue and
+the deduplication of identical scans are per process.
+"""
+
+import os
+import copy
+import math
+import time
+import uuid
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future
+
+from sqlalchemy import select, insert, update, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import ScanSlot
+from app.core.utils import ApplicationError
+from app.core.metrics import metrics
+
+logger = logging.getLogger('analysis')
+
+
+class ScanRejected(ApplicationError):
+    """Scan was not admitted (queue full or wait timeout)"""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _InflightScan:
+    """Result and progress of a running scan, shared with callers joining it"""
+
+    def __init__(self):
+        self.future = Future()
+        self._events = []
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def progress(self, *args):
+        """Record a progress event and pass it to all listeners"""
+        with self._lock:
+            self._events.append(args)
+            for listener in self._listeners:
+                listener(*args)
+
+    def listen(self, listener):
+        """Replay past progress events to a listener and add it for future ones"""
+        with self._lock:
+            for args in self._events:
+                listener(*args)
+            self._listeners.append(listener)
+
+
+class ScanSlotLeases:
+    """
+    Scan slots leased in the database, shared by all worker processes
+
+    A scan holds one of max_per_user slots of its user and one of
+    max_concurrent global slots. Slots are claimed with a conditional UPDATE
+    like the maintenance task leases; a heartbeat thread renews the leases of
+    running scans, so the slots of a crashed process expire after
+    lease_seconds.
+    """
+
+    def __init__(self, max_concurrent, max_per_user, lease_seconds=60):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.lease_seconds = lease_seconds
+        self._engine = None
+        self._known = set()  # slot rows known to exist
+        self._held = set()  # lease tokens of scans running in this process
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_rows(self, names):
+        missing = [name for name in names if name not in self._known]
+        if not missing:
+            return
+        with self._engine.begin() as conn:
+            existing = set(conn.scalars(select(ScanSlot.name).where(ScanSlot.name.in_(missing))))
+        for name in missing:
+            if name not in existing:
+                try:
+                    with self._engine.begin() as conn:
+                        conn.execute(insert(ScanSlot).values(name=name))
+                except IntegrityError:
+                    # Created by another worker in the meantime
+                    pass
+            self._known.add(name)
+
+    def _claim(self, names, token, now):
+        """Lease the first free slot of names; returns its name or None"""
+        self._ensure_rows(names)
+        for name in names:
+            with self._engine.begin() as conn:
+                result = conn.execute(
+                    update(ScanSlot).where(
+                        ScanSlot.name == name,
+                        or_(ScanSlot.lease_until.is_(None), ScanSlot.lease_until < now)
+                    ).values(lease_owner=token, lease_until=now + timedelta(seconds=self.lease_seconds))
+                )
+            if result.rowcount == 1:
+                return name
+        return None
+
+    def acquire(self, user_id):
+        """
+        Lease a user slot and a global slot (requires an application context)
+
+        Args:
+            user_id: User requesting the scan
+
+        Returns:
+            Lease token, or None if no slot is free
+        """
+        self._engine = db.engine
+        self._ensure_heartbeat()
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        now = datetime.now(timezone.utc)
+
+        user_slots = [f"user:{user_id}:{n}" for n in range(self.max_per_user)]
+        if self._claim(user_slots, token, now) is None:
+            return None
+        try:
+            global_slots = [f"global:{n}" for n in range(self.max_concurrent)]
+            if self._claim(global_slots, token, now) is None:
+                self.release(token)
+                return None
+        except Exception:
+            self.release(token)
+            raise
+
+        with self._lock:
+            self._held.add(token)
+        return token
+
+    def release(self, token):
+        """Release all slots leased with token"""
+        with self._lock:
+            self._held.discard(token)
+        with self._engine.begin() as conn:
+            conn.execute(
+                update(ScanSlot).where(ScanSlot.lease_owner == token).values(lease_owner=None, lease_until=None)
+            )
+
+    def running(self):
+        """Number of scans running in all worker processes"""
+        with self._engine.begin() as conn:
+            return conn.scalar(
+                select(func.count()).select_from(ScanSlot).where(
+                    ScanSlot.name.like('global:%'),
+                    ScanSlot.lease_until >= datetime.now(timezone.utc)
+                )
+            )
+
+    def _ensure_heartbeat(self):
+        # Threads do not survive a fork; leases of the parent are not ours
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._held.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._heartbeat, name='scan-slot-heartbeat', daemon=True)
+            self._thread.start()
+
+    def _heartbeat(self):
+        while not self._stop.wait(max(1, self.lease_seconds / 3)):
+            with self._lock:
+                tokens = list(self._held)
+            if not tokens:
+                continue
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(
+                        update(ScanSlot).where(ScanSlot.lease_owner.in_(tokens)).values(
+                            lease_until=datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+                        )
+                    )
+            except Exception as e:
+                logger.error(f"Could not renew scan slot leases: {e}")
+
+
+class ScanScheduler:
+    """Limits concurrent scans and shares results of identical scans"""
+
+    def __init__(self, max_concurrent=4, max_per_user=2, max_queue=16, queue_timeout=30, retry_after=5,
+                 slots=None, poll_interval=0.5):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.slots = slots  # ScanSlotLeases for limits across processes (None = this process only)
+        self.poll_interval = poll_interval
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._running_per_user = {}
+        self._queued = 0
+        self._inflight = {}  # key -> _InflightScan of the leading scan
+
+    def _estimate_retry_after(self):
+        """Seconds until a slot is likely free, from recent scan durations"""
+        summary = metrics.get_summary('scan_duration_seconds')
+        if summary and summary['p50']:
+            return max(1, math.ceil(summary['p50']))
+        return self.retry_after
+
+    def _export_gauges(self):
+        metrics.set_gauge('scan_queue_depth', self._queued)
+        metrics.set_gauge('scans_running', self._running)
+
+    def _export_shared_gauge(self):
+        # Scans of all worker processes, from the slot leases
+        if self.slots is None:
+            return
+        try:
+            metrics.set_gauge('scans_running_all_workers', self.slots.running())
+        except Exception as e:
+            logger.error(f"Could not count scan slot leases: {e}")
+
+    def _can_start(self, user_id):
+        return self._running < self.max_concurrent \
+            and self._running_per_user.get(user_id, 0) < self.max_per_user
+
+    def _try_start(self, user_id):
+        """
+        Take a local slot and, with shared limits, a leased slot (caller holds _cond)
+
+        Returns:
+            Tuple of (started, lease_token)
+        """
+        if not self._can_start(user_id):
+            return False, None
+
+        token = None
+        if self.slots is not None:
+            try:
+                token = self.slots.acquire(user_id)
+                if token is None:
+                    return False, None
+            except Exception as e:
+                # Without the lease table only the limits of this process apply
+                logger.error(f"Could not lease scan slot, using local limits only: {e}")
+
+        self._running += 1
+        self._running_per_user[user_id] = self._running_per_user.get(user_id, 0) + 1
+        self._export_gauges()
+        return True, token
+
+    def _acquire(self, user_id):
+        """
+        Wait for a scan slot
+
+        Returns:
+            Lease token of the shared slots (None without shared limits)
+
+        Raises:
+            ScanRejected: If the queue is full or the wait timed out
+        """
+        started = time.monotonic()
+        with self._cond:
+            admitted, token = self._try_start(user_id)
+            if not admitted:
+                if self._queued >= self.max_queue:
+                    metrics.increment('scans_rejected', reason='queue_full')
+                    raise ScanRejected(
+                        "Zu viele laufende Suchen, bitte später erneut versuchen",
+                        429, self._estimate_retry_after()
+                    )
+
+                self._queued += 1
+                self._export_gauges()
+                try:
+                    # Local releases notify; slots freed by other processes are polled
+                    deadline = started + self.queue_timeout
+                    while not admitted:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(min(remaining, self.poll_interval) if self.slots is not None else remaining)
+                        admitted, token = self._try_start(user_id)
+                finally:
+                    self._queued -= 1
+                    self._export_gauges()
+
+                if not admitted:
+                    metrics.increment('scans_rejected', reason='timeout')
+                    raise ScanRejected(
+                        "Zeitüberschreitung beim Warten auf einen Suchplatz",
+                        503, self._estimate_retry_after()
+                    )
+
+        metrics.observe('scan_wait_seconds', time.monotonic() - started)
+        self._export_shared_gauge()
+        return token
+
+    def _release(self, user_id, token=None):
+        if token is not None:
+            try:
+                self.slots.release(token)
+            except Exception as e:
+                # The lease expires without heartbeat
+                logger.error(f"Could not release scan slot lease: {e}")
+            self._export_shared_gauge()
+
+        with self._cond:
+            self._running -= 1
+            remaining = self._running_per_user.get(user_id, 1) - 1
+            if remaining > 0:
+                self._running_per_user[user_id] = remaining
+            else:
+                self._running_per_user.pop(user_id, None)
+            self._export_gauges()
+            self._cond.notify_all()
+
+    def run(self, key, user_id, func, on_progress=None):
+        """
+        Run a scan under admission control
+
+        Args:
+            key: Identity of the scan (identical keys share one execution)
+            user_id: User requesting the scan
+            func: Callable(progress) performing the scan; progress(*args) reports
+                  progress to all callers sharing the scan
+            on_progress: Optional progress listener of this caller (also receives
+                         the progress of a joined scan, including earlier events)
+
+        Returns:
+            Deep copy of the result of func
+
+        Raises:
+            ScanRejected: If the scan could not be admitted
+        """
+        with self._cond:
+            leader = self._inflight.get(key)
+            if leader is None:
+                inflight = self._inflight[key] = _InflightScan()
+
+        if leader is not None:
+            metrics.increment('scans_deduplicated')
+            logger.info(f"Joining in-flight scan {key}")
+            if on_progress is not None:
+                leader.listen(on_progress)
+            return copy.deepcopy(leader.future.result(timeout=self.queue_timeout + 3600))
+
+        if on_progress is not None:
+            inflight.listen(on_progress)
+
+        try:
+            token = self._acquire(user_id)
+        except ScanRejected as e:
+            with self._cond:
+                self._inflight.pop(key, None)
+            inflight.future.set_exception(e)
+            raise
+
+        started = time.monotonic()
+        try:
+            result = func(inflight.progress)
+            inflight.future.set_result(result)
+            # The shared result stays untouched for joining callers
+            return copy.deepcopy(result)
+        except BaseException as e:
+            inflight.future.set_exception(e)
+            raise
+        finally:
+            metrics.observe('scan_duration_seconds', time.monotonic() - started)
+            with self._cond:
+                self._inflight.pop(key, None)
+            self._release(user_id, token)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scan_scheduler(config):
+    """
+    Get the process-wide scan scheduler (limits shared by all processes)
+
+    Args:
+        config: Application config (only used on first call)
+
+    Returns:
+        ScanScheduler instance
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ScanScheduler(
+                max_concurrent=config.get('SCAN_MAX_CONCURRENT', 4),
+                max_per_user=config.get('SCAN_MAX_PER_USER', 2),
+                max_queue=config.get('SCAN_MAX_QUEUE', 16),
+                queue_timeout=config.get('SCAN_QUEUE_TIMEOUT', 30),
+                retry_after=config.get('SCAN_RETRY_AFTER', 5),
+                slots=ScanSlotLeases(
+                    config.get('SCAN_MAX_CONCURRENT', 4),
+                    config.get('SCAN_MAX_PER_USER', 2),
+                    lease_seconds=config.get('SCAN_SLOT_LEASE_SECONDS', 60)
+                )
+            )
+        return _scheduler
@@ -0,0 +1,424 @@
+# analysis/scan_tasks.py
+"""
+Background sample scans with progress reporting
+Long recursive scans run outside the HTTP request; clients poll for
+progress and partial results. The scan runs in the worker process that
+accepted it; its state is written to the database about once a second,
+so polls and identical submissions can be served by any worker process.
+Samples found while the scan runs are appended as chunks (only the new
+ones per save); the final sample list is written once at the end.
+"""
+
+import os
+import time
+import uuid
+import logging
+import itertools
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, update, delete, or_
+
+from extensions import db
+from models import ScanTaskState, ScanTaskChunk
+from .utils import parse_fastq_filename
+
+logger = logging.getLogger('analysis')
+
+
+class ScanTask:
+    """State of one background scan in the process running it"""
+
+    def __init__(self, folder_path, recursive, user_id):
+        self.id = uuid.uuid4().hex
+        self.folder_path = folder_path
+        self.recursive = recursive
+        self.user_id = user_id
+        self.status = 'queued'  # queued, running, finished, failed
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.dirs_visited = 0
+        self.files_matched = 0
+        self.version = 0  # incremented on every change, for saving
+        self._samples = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        return self.folder_path, self.recursive
+
+    @property
+    def is_done(self):
+        return self.status in ('finished', 'failed')
+
+    def start(self):
+        with self._lock:
+            self.status = 'running'
+            self.version += 1
+
+    def visit_directory(self, directory, fastq_paths):
+        """Progress callback: collect samples of one visited directory"""
+        parsed = [parse_fastq_filename(path) for path in fastq_paths]
+        with self._lock:
+            self.dirs_visited += 1
+            self.files_matched += len(fastq_paths)
+            for item in parsed:
+                if item and item[0] not in self._samples:
+                    self._samples[item[0]] = item[1]
+            self.version += 1
+
+    def finish(self, samples):
+        """
+        Replace partial results with the final sample list
+        (same traversal order, so client offsets stay valid)
+        """
+        with self._lock:
+            self._samples = collections.OrderedDict(
+                (key, {k: v for k, v in sample.items() if k != 'files'})
+                for key, sample in enumerate(samples)
+            )
+            self.status = 'finished'
+            self.finished_at = time.time()
+            self.version += 1
+
+    def fail(self, error):
+        with self._lock:
+            self.status = 'failed'
+            self.error = error
+            self.finished_at = time.time()
+            self.version += 1
+
+    def to_dict(self, offset=0):
+        """
+        Export task state
+
+        Args:
+            offset: Number of samples the client already has
+
+        Returns:
+            Dict with status, progress counters and samples[offset:]
+        """
+        with self._lock:
+            samples = list(self._samples.values())
+            return {
+                'task_id': self.id,
+                'status': self.status,
+                'folder_path': self.folder_path,
+                'recursive': self.recursive,
+                'dirs_visited': self.dirs_visited,
+                'files_matched': self.files_matched,
+                'sample_count': len(samples),
+                'offset': offset,
+                'samples': samples[offset:],
+                'error': self.error,
+                'elapsed_seconds': round((self.finished_at or time.time()) - self.created_at, 1)
+            }
+
+    def to_values(self, saved_count=0):
+        """
+        Column values of the task's ScanTaskState row
+
+        Partial results only grow, so a running task returns the samples
+        added since saved_count; a finished task returns its final list in
+        the 'samples' column value.
+
+        Args:
+            saved_count: Number of samples already saved
+
+        Returns:
+            Tuple of (column values, new samples, version)
+        """
+        with self._lock:
+            values = {
+                'status': self.status,
+                'error': self.error,
+                'dirs_visited': self.dirs_visited,
+                'files_matched': self.files_matched,
+                'sample_count': len(self._samples),
+                'finished_at': _utc(self.finished_at) if self.finished_at else None
+            }
+            if self.status == 'finished':
+                values['samples'] = list(self._samples.values())
+                return values, [], self.version
+            new_samples = list(itertools.islice(self._samples.values(), saved_count, None))
+            return values, new_samples, self.version
+
+
+def _utc(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _as_utc(value):
+    """Database timestamps come back naive on SQLite"""
+    return value if value is None or value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _saved_samples(state, offset=0):
+    """
+    Samples of a ScanTaskState row from offset
+
+    Returns:
+        Tuple of (sample_count, samples[offset:])
+    """
+    if state.samples is not None:
+        return len(state.samples), state.samples[offset:]
+
+    # Partial results: only the chunks reaching past offset
+    chunks = db.session.scalars(
+        select(ScanTaskChunk).where(
+            ScanTaskChunk.task_id == state.id,
+            ScanTaskChunk.start + ScanTaskChunk.sample_count > offset
+        ).order_by(ScanTaskChunk.start)
+    ).all()
+    samples = []
+    for chunk in chunks:
+        samples.extend(chunk.samples[max(0, offset - chunk.start):])
+    return state.sample_count, samples
+
+
+def _state_to_dict(state, offset=0, stale_seconds=120):
+    """Export a ScanTaskState row like ScanTask.to_dict"""
+    sample_count, samples = _saved_samples(state, offset)
+    status, error = state.status, state.error
+    now = datetime.now(timezone.utc)
+    if status in ('queued', 'running') and _as_utc(state.updated_at) < now - timedelta(seconds=stale_seconds):
+        # The worker process running the scan is gone
+        status, error = 'failed', 'Suche abgebrochen (Prozess beendet)'
+    end = _as_utc(state.finished_at) or now
+    return {
+        'task_id': state.id,
+        'status': status,
+        'folder_path': state.folder_path,
+        'recursive': state.recursive,
+        'dirs_visited': state.dirs_visited,
+        'files_matched': state.files_matched,
+        'sample_count': sample_count,
+        'offset': offset,
+        'samples': samples,
+        'error': error,
+        'elapsed_seconds': round((end - _as_utc(state.created_at)).total_seconds(), 1)
+    }
+
+
+class ScanTaskManager:
+    """Runs scan tasks in a thread pool and shares their state through the database"""
+
+    def __init__(self, max_workers=4, result_ttl=300, save_interval=1.0, stale_seconds=120):
+        self.result_ttl = result_ttl
+        self.save_interval = save_interval
+        self.stale_seconds = stale_seconds
+        self._max_workers = max_workers
+        self._executor = None
+        self._saver = None
+        self._pid = None
+        self._app = None
+        self._tasks = {}  # task_id -> ScanTask running in this process
+        self._saved = {}  # task_id -> (saved version, saved sample count)
+        self._lock = threading.Lock()
+
+    def _ensure_threads(self, app):
+        """Start executor and saver (again after a fork, threads do not survive it)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._saver is not None and self._saver.is_alive():
+                return
+            self._pid = os.getpid()
+            self._app = app
+            self._tasks.clear()
+            self._saved.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='scan-task')
+            self._saver = threading.Thread(target=self._save_loop, name='scan-task-saver', daemon=True)
+            self._saver.start()
+
+    def _find_reusable(self, folder_path, recursive):
+        """Running or recently finished task of the same scan in any worker process"""
+        now = datetime.now(timezone.utc)
+        return db.session.scalars(
+            select(ScanTaskState).where(
+                ScanTaskState.folder_path == folder_path,
+                ScanTaskState.recursive == recursive,
+                or_(
+                    ScanTaskState.status.in_(('queued', 'running'))
+                    & (ScanTaskState.updated_at >= now - timedelta(seconds=self.stale_seconds)),
+                    (ScanTaskState.status == 'finished')
+                    & (ScanTaskState.finished_at >= now - timedelta(seconds=self.result_ttl))
+                )
+            ).order_by(ScanTaskState.created_at.desc()).limit(1)
+        ).first()
+
+    def submit(self, app, folder_path, recursive, user_id, scan):
+        """
+        Start a scan task or reuse a running or recently finished one
+
+        Args:
+            app: Flask application (for the app context)
+            folder_path: Validated folder path
+            recursive: Whether to search recursively
+            user_id: Requesting user
+            scan: Callable(task) performing the scan and returning samples
+
+        Returns:
+            Task dictionary (see ScanTask.to_dict)
+        """
+        self._ensure_threads(app)
+
+        existing = self._find_reusable(folder_path, recursive)
+        if existing is not None:
+            logger.info(f"Reusing scan task {existing.id} for {folder_path}")
+            return self.get(existing.id)
+
+        task = ScanTask(folder_path, recursive, user_id)
+        now = _utc(task.created_at)
+        db.session.add(ScanTaskState(
+            id=task.id, folder_path=folder_path, recursive=recursive, user_id=user_id,
+            status=task.status, dirs_visited=0, files_matched=0, sample_count=0,
+            created_at=now, updated_at=now
+        ))
+        db.session.commit()
+
+        with self._lock:
+            self._tasks[task.id] = task
+            self._saved[task.id] = (task.version, 0)
+        self._executor.submit(self._run, app, task, scan)
+        logger.info(f"Submitted scan task {task.id} for {folder_path} (recursive={recursive})")
+        return task.to_dict()
+
+    def _run(self, app, task, scan):
+        with app.app_context():
+            task.start()
+            try:
+                samples = scan(task)
+                task.finish(samples)
+                logger.info(
+                    f"Scan task {task.id} finished: {len(samples)} samples, "
+                    f"{task.dirs_visited} directories"
+                )
+            except Exception as e:
+                logger.error(f"Scan task {task.id} failed: {e}")
+                task.fail(str(e))
+            finally:
+                db.session.remove()
+
+    def _save_loop(self):
+        while True:
+            time.sleep(self.save_interval)
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Saving scan task state failed: {e}")
+
+    def save(self):
+        """
+        Write changed state of this process's tasks; unchanged running tasks
+        get a heartbeat so other workers do not consider them dead
+
+        New samples are appended as a ScanTaskChunk, so a save writes only
+        what was found since the previous one. The final sample list replaces
+        the chunks when the task finishes.
+        """
+        with self._lock:
+            tasks = list(self._tasks.values())
+        if not tasks or self._app is None:
+            return
+
+        with self._app.app_context():
+            try:
+                now = datetime.now(timezone.utc)
+                for task in tasks:
+                    saved_version, saved_count = self._saved.get(task.id, (None, 0))
+                    values, new_samples, version = task.to_values(saved_count)
+                    if version != saved_version:
+                        if 'samples' in values:
+                            db.session.execute(delete(ScanTaskChunk).where(ScanTaskChunk.task_id == task.id))
+                        elif new_samples:
+                            db.session.execute(insert(ScanTaskChunk).values(
+                                task_id=task.id, start=saved_count,
+                                sample_count=len(new_samples), samples=new_samples
+                            ))
+                        db.session.execute(
+                            update(ScanTaskState).where(ScanTaskState.id == task.id).values(updated_at=now, **values)
+                        )
+                        saved_count = values['sample_count']
+                    else:
+                        db.session.execute(
+                            update(ScanTaskState).where(ScanTaskState.id == task.id).values(updated_at=now)
+                        )
+                    db.session.commit()
+
+                    with self._lock:
+                        self._saved[task.id] = (version, saved_count)
+                        # Done tasks are served from the database once their final state is saved
+                        if values['status'] in ('finished', 'failed'):
+                            self._tasks.pop(task.id, None)
+                            self._saved.pop(task.id, None)
+            finally:
+                db.session.remove()
+
+    def get(self, task_id, offset=0):
+        """
+        Get task state by id
+
+        Args:
+            task_id: Scan task id
+            offset: Number of samples the client already has
+
+        Returns:
+            Task dictionary or None if unknown
+        """
+        with self._lock:
+            task = self._tasks.get(task_id) if self._pid == os.getpid() else None
+        if task is not None:
+            return task.to_dict(offset)
+
+        state = db.session.get(ScanTaskState, task_id)
+        if state is None:
+            return None
+        return _state_to_dict(state, offset, self.stale_seconds)
+
+
+def prune_scan_tasks(ttl):
+    """
+    Delete task states finished (or last updated) more than ttl seconds ago
+
+    Args:
+        ttl: Age in seconds
+
+    Returns:
+        Number of deleted rows
+    """
+    limit = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+    expired = select(ScanTaskState.id).where(ScanTaskState.updated_at < limit)
+    db.session.execute(delete(ScanTaskChunk).where(ScanTaskChunk.task_id.in_(expired)))
+    result = db.session.execute(
+        delete(ScanTaskState).where(ScanTaskState.updated_at < limit)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_scan_task_manager(config):
+    """
+    Get the process-wide scan task manager
+
+    Args:
+        config: Application config (only used on first call)
+
+    Returns:
+        ScanTaskManager instance
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ScanTaskManager(
+                max_workers=config.get('SCAN_TASK_WORKERS', 4),
+                result_ttl=config.get('SCAN_TASK_RESULT_SECONDS', 300),
+                save_interval=config.get('SCAN_TASK_SAVE_SECONDS', 1.0),
+                stale_seconds=config.get('SCAN_TASK_STALE_SECONDS', 120)
+            )
+        return _manager
@@ -8,13 +8,26 @@ import os
 import re
 import logging
 from datetime import datetime, timedelta, timezone
-from functools import lru_cache
-import time
+
+from flask import current_app
 
 from extensions import db
 from models import AnalysisJob
-from app.core.utils import validate_path, generate_job_code, truncate_log, is_valid_report_file, ANALYSIS_BASE_PATHS
+from app.core.utils import validate_path, truncate_log, is_valid_report_file, format_file_size, ANALYSIS_BASE_PATHS, JOB_TERMINAL_STATUSES
+from app.core.db_routing import read_only, use_primary
+from app.history.reports import index_job_reports
+from app.history.job_index import index_job_parameters
 from .utils import ssh_start_analysis, ssh_kill_job, ssh_get_log, extract_samples_with_details
+from .folder_cache import folder_cache
+from .disk_usage import disk_usage
+from .preflight import run_preflight
+from .fastq_stats import get_files_stats, merge_stats
+from .catalog import update_catalog_async, search_catalog
+from .run_metadata import get_run_metadata, export_run_metadata, sample_lookup_key
+from .scan_scheduler import get_scan_scheduler, ScanRejected
+from .scan_tasks import get_scan_task_manager
+from .job_codes import next_job_code
+from .job_events import record_job_event
 
 logger = logging.getLogger('analysis')
 
@@ -23,24 +36,71 @@ class AnalysisService:
     """Service class for analysis operations"""
     
     @staticmethod
-    def cleanup_stuck_jobs():
-        """Clean up jobs that are stuck in running state"""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=12)
-        stuck_jobs = AnalysisJob.query.filter_by(status='running').filter(
-            AnalysisJob.created_at < cutoff
-        ).all()
+    def set_job_status(job, status, cause=None, user_id=None, detail=None):
+        """
+        Change job status (caller commits)
+        Records the transition in the job event log; terminal states also
+        index the job's report files
+        
+        Args:
+            job: AnalysisJob instance
+            status: New status
+            cause: Why the status changed (see JobEvent.cause)
+            user_id: User who caused the change
+            detail: Additional information for the event log
+        """
+        now = datetime.now(timezone.utc)
+        if job.status != status:
+            record_job_event(job, job.status, status, cause, user_id, detail, at=now)
+        
+        job.status = status
+        job.updated_at = now
+        
+        if status in JOB_TERMINAL_STATUSES:
+            try:
+                index_job_reports(job)
+            except Exception as e:
+                logger.error(f"Error indexing reports for job {job.id}: {e}")
+    
+    @staticmethod
+    def _running_cutoff():
+        """Start time before which a running job counts as stuck"""
+        hours = current_app.config.get('JOB_TIMEOUT_HOURS', 1)
+        return datetime.now(timezone.utc) - timedelta(hours=hours)
+    
+    @staticmethod
+    def stuck_jobs_query():
+        """Query of running jobs older than JOB_TIMEOUT_HOURS"""
+        return AnalysisJob.query.filter(
+            AnalysisJob.status == 'running',
+            AnalysisJob.created_at < AnalysisService._running_cutoff()
+        )
+    
+    @staticmethod
+    def expire_stuck_jobs():
+        """
+        Mark jobs that are running longer than JOB_TIMEOUT_HOURS as failed
+        Runs as a scheduled maintenance task
+        
+        Returns:
+            Number of expired jobs
+        """
+        stuck_jobs = AnalysisService.stuck_jobs_query().all()
         
         for job in stuck_jobs:
-            job.status = "failed"
+            AnalysisService.set_job_status(job, "failed", cause="stuck")
             logger.info(f"Marked stuck job {job.id} as failed")
         
         if stuck_jobs:
             db.session.commit()
+        return len(stuck_jobs)
     
     @staticmethod
     def get_running_job(user_id):
         """
-        Get running job for user with validation
+        Get running job for user (read-only)
+        Jobs older than JOB_TIMEOUT_HOURS are ignored; the maintenance
+        scheduler marks them as failed
         
         Args:
             user_id: User ID
@@ -48,38 +108,50 @@ class AnalysisService:
         Returns:
             AnalysisJob or None
         """
-        running_job = db.session.query(AnalysisJob).filter_by(
-            user_id=user_id, 
-            status='running'
-        ).first()
-        
-        # Double-check: if job exists but is old, mark as failed
-        if running_job:
-            cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
-            if running_job.created_at < cutoff:
-                logger.warning(f"Force-failing old running job {running_job.id}")
-                running_job.status = "failed"
-                running_job.updated_at = datetime.now(timezone.utc)
-                db.session.commit()
-                return None
+        return db.session.query(AnalysisJob).filter(
+            AnalysisJob.user_id == user_id,
+            AnalysisJob.status == 'running',
+            AnalysisJob.created_at >= AnalysisService._running_cutoff()
+        ).order_by(AnalysisJob.created_at.desc()).first()
+    
+    @staticmethod
+    def scan_samples(validated_path, recursive=False, on_directory=None):
+        """
+        Scan folder for samples and update the sample catalog in the background
+        
+        Args:
+            validated_path: Validated folder path
+            recursive: Whether to search recursively
+            on_directory: Optional progress callback(directory, fastq_paths)
             
-            # Add job code if missing
-            if not running_job.job_code:
-                running_job.job_code = f"{running_job.job_type}{running_job.created_at.strftime('%y%m%d')}_{running_job.id:02d}"
+        Returns:
+            List of sample dictionaries including 'files'
+        """
+        samples = extract_samples_with_details(
+            validated_path, recursive=recursive, with_files=True, on_directory=on_directory
+        )
+        
+        # Every scan keeps the cross-run sample catalog current
+        update_catalog_async(current_app._get_current_object(), validated_path, samples, recursive=recursive)
         
-        return running_job
+        return samples
     
     @staticmethod
-    def get_samples(folder_path, recursive=False):
+    def get_samples(folder_path, recursive=False, with_stats=False, user_id=None):
         """
         Get samples from folder with validation
         
         Args:
             folder_path: Path to folder
             recursive: Whether to search recursively
+            with_stats: Whether to add FASTQ read statistics per sample
+            user_id: Requesting user (for per-user scan limits)
             
         Returns:
             Tuple of (samples_list, error_message)
+            
+        Raises:
+            ScanRejected: If the scan limiter refuses the scan
         """
         try:
             validated_path = validate_path(folder_path)
@@ -87,7 +159,21 @@ class AnalysisService:
             if not os.path.isdir(validated_path):
                 return None, "Pfad ist kein gültiger Ordner"
             
-            samples = extract_samples_with_details(validated_path, recursive=recursive)
+            # Concurrent identical scans share one filesystem walk
+            samples = get_scan_scheduler(current_app.config).run(
+                (validated_path, recursive),
+                user_id,
+                lambda progress: AnalysisService.scan_samples(validated_path, recursive, on_directory=progress)
+            )
+            
+            if samples:
+                AnalysisService.add_run_metadata(samples)
+            
+            if with_stats and samples:
+                AnalysisService.add_sample_stats(samples)
+            else:
+                for sample in samples:
+                    sample.pop("files", None)
             
             if not samples:
                 search_type = "rekursiv in diesem Ordner und allen Unterordnern" if recursive else "in diesem Ordner"
@@ -97,12 +183,194 @@ class AnalysisService:
             logger.info(f"Found {len(samples)} samples in {folder_path}{search_info}")
             return samples, None
             
+        except ScanRejected:
+            raise
         except Exception as e:
             logger.error(f"Error in get_samples: {e}")
             return None, str(e)
     
     @staticmethod
-    def create_and_start_job(user_id, folder_path, analysis_type, run_name, selected_samples):
+    def start_scan_task(folder_path, recursive=False, user_id=None):
+        """
+        Start a background sample scan
+        
+        Args:
+            folder_path: Path to folder
+            recursive: Whether to search recursively
+            user_id: Requesting user (for per-user scan limits)
+            
+        Returns:
+            Tuple of (task_dict, error_message)
+        """
+        try:
+            validated_path = validate_path(folder_path)
+            
+            if not os.path.isdir(validated_path):
+                return None, "Pfad ist kein gültiger Ordner"
+            
+            config = current_app.config
+            
+            def scan(task):
+                # Admission control applies to background scans as well
+                # Joining an identical running scan still reports its progress to this task
+                return get_scan_scheduler(config).run(
+                    (validated_path, recursive),
+                    user_id,
+                    lambda progress: AnalysisService.scan_samples(validated_path, recursive, on_directory=progress),
+                    on_progress=task.visit_directory
+                )
+            
+            task = get_scan_task_manager(config).submit(
+                current_app._get_current_object(), validated_path, recursive, user_id, scan
+            )
+            return task, None
+            
+        except Exception as e:
+            logger.error(f"Error in start_scan_task: {e}")
+            return None, str(e)
+    
+    @staticmethod
+    def get_scan_task(task_id, offset=0):
+        """
+        Get progress and partial results of a background scan
+        
+        Args:
+            task_id: Scan task id
+            offset: Number of samples the client already has
+            
+        Returns:
+            Task dictionary or None if unknown
+        """
+        return get_scan_task_manager(current_app.config).get(task_id, max(0, offset))
+    
+    @staticmethod
+    def search_samples(query, exact=False, analysis_type=None, limit=100):
+        """
+        Search samples across all cataloged run folders
+        
+        Args:
+            query: Probennummer or prefix
+            exact: Exact match instead of prefix match
+            analysis_type: Restrict to one analysis type
+            limit: Maximum number of results
+            
+        Returns:
+            Tuple of (results_list, error_message)
+        """
+        try:
+            if not query or not query.strip():
+                return None, "Suchbegriff ist leer"
+            
+            if analysis_type and analysis_type not in ANALYSIS_BASE_PATHS:
+                return None, f"Invalid analysis type: {analysis_type}"
+            
+            # The catalog is kept current by scans and the refresh_catalog maintenance task
+            config = current_app.config
+            limit = max(1, min(limit, config.get('CATALOG_SEARCH_MAX_RESULTS', 500)))
+            results = search_catalog(query, exact=exact, analysis_type=analysis_type, limit=limit)
+            return results, None
+            
+        except Exception as e:
+            logger.error(f"Error in search_samples: {e}")
+            return None, str(e)
+    
+    @staticmethod
+    def add_run_metadata(samples):
+        """
+        Add run metadata (SampleSheet/RunInfo or IonTorrent run files) to samples (in place)
+        
+        Args:
+            samples: Sample dictionaries with 'files' lists
+        """
+        config = current_app.config
+        try:
+            metadata = get_run_metadata(
+                {sample["file_path"] for sample in samples},
+                max_levels=config.get('RUN_METADATA_SEARCH_LEVELS', 4),
+                max_age=config.get('CATALOG_REFRESH_SECONDS', 3600)
+            )
+        except Exception as e:
+            logger.error(f"Error reading run metadata: {e}")
+            db.session.rollback()
+            return
+        
+        for sample in samples:
+            row = metadata.get(sample["file_path"])
+            if row is None:
+                continue
+            
+            details = export_run_metadata(row)
+            # Recursive scans merge files of the same sample from several runs
+            files = [path for path in sample.get("files") or [] if os.path.dirname(path) == sample["file_path"]]
+            key = sample_lookup_key(files[0]) if files else None
+            if key and row.samples and key in row.samples:
+                details.update(row.samples[key])
+            sample["run_metadata"] = details
+    
+    @staticmethod
+    def add_sample_stats(samples):
+        """
+        Add read statistics to sample dictionaries (in place)
+        Samples with files still being processed get {"pending": True}
+        
+        Args:
+            samples: Sample dictionaries with 'files' lists (removed afterwards)
+            
+        Returns:
+            Number of samples with pending statistics
+        """
+        config = current_app.config
+        all_files = [path for sample in samples for path in sample.get("files", [])]
+        
+        file_stats = get_files_stats(
+            all_files,
+            max_reads=config.get('FASTQ_STATS_MAX_READS', 0),
+            max_workers=config.get('FASTQ_WORKERS', 4)
+        )
+        
+        pending = 0
+        for sample in samples:
+            files = sample.pop("files", [])
+            stats = [file_stats[path] for path in files]
+            if any(item is None for item in stats):
+                sample["stats"] = {"pending": True, "files": len(files), "done": sum(item is not None for item in stats)}
+                pending += 1
+            else:
+                sample["stats"] = merge_stats(stats)
+        return pending
+    
+    @staticmethod
+    def preflight(folder_path, selected_samples=None, recursive=False):
+        """
+        Check FASTQ pairing, lane completeness and file headers of a run;
+        gzip integrity is checked in the background (see run_preflight)
+        
+        Args:
+            folder_path: Path to input folder
+            selected_samples: List of selected samples (None = all)
+            recursive: Whether the samples were scanned recursively
+            
+        Returns:
+            Tuple of (preflight_result, error_message)
+        """
+        try:
+            validated_path = validate_path(folder_path)
+            
+            if not os.path.isdir(validated_path):
+                return None, "Pfad ist kein gültiger Ordner"
+            
+            result = run_preflight(
+                validated_path, selected_samples, recursive=recursive,
+                max_workers=current_app.config.get('FASTQ_WORKERS', 4)
+            )
+            return result, None
+            
+        except Exception as e:
+            logger.error(f"Error in preflight: {e}")
+            return None, str(e)
+    
+    @staticmethod
+    def create_and_start_job(user_id, folder_path, analysis_type, run_name, selected_samples, recursive=False):
         """
         Create and start a new analysis job
         
@@ -112,6 +380,7 @@ class AnalysisService:
             analysis_type: Type of analysis
             run_name: Name of the run
             selected_samples: List of selected samples
+            recursive: Whether the samples were scanned recursively
             
         Returns:
             Tuple of (job, error_message)
@@ -122,32 +391,31 @@ class AnalysisService:
                 return None, f"Invalid analysis type: {analysis_type}"
             
             # Check for running job
-            running_job = AnalysisJob.query.filter_by(
-                user_id=user_id, 
-                status='running'
-            ).first()
-            
-            if running_job:
+            if AnalysisService.get_running_job(user_id):
                 return None, "Es läuft bereits eine Analyse"
             
             # Validate path
             validated_path = validate_path(folder_path, analysis_type)
             
+            # Catch missing mates, broken headers and gzip files the background
+            # integrity check (started by /api/preflight) found truncated or corrupt
+            # before they reach the compute host; checks still running do not block
+            if current_app.config.get('PREFLIGHT_ENABLED', True):
+                preflight, error = AnalysisService.preflight(validated_path, selected_samples, recursive)
+                if error:
+                    return None, error
+                if not preflight["ok"]:
+                    logger.warning(f"Preflight failed for {validated_path}: {preflight['errors']}")
+                    return None, "Preflight fehlgeschlagen: " + "; ".join(preflight["errors"][:5])
+            
             # Use folder name as run_name if empty
             if not run_name:
                 run_name = os.path.basename(os.path.normpath(folder_path))
             
-            # Create job with correct counter
             now = datetime.now(timezone.utc)
-            start_of_day = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
             
-            # Count only jobs of the same type from today
-            job_count_today = db.session.query(AnalysisJob).filter(
-                AnalysisJob.created_at >= start_of_day,
-                AnalysisJob.job_type == analysis_type
-            ).count() + 1
-            
-            job_code = generate_job_code(analysis_type, job_count_today)
+            # Atomic per-day counter; the reservation is committed together with the job
+            job_code = next_job_code(analysis_type)
             
             job = AnalysisJob(
                 user_id=user_id,
@@ -166,6 +434,10 @@ class AnalysisService:
             
             logger.info(f"Creating job {job_code} for user {user_id} with {len(selected_samples)} samples")
             db.session.add(job)
+            record_job_event(job, None, "queued", cause="created", user_id=user_id, at=now)
+            db.session.flush()
+            # Samples and input path become searchable together with the job
+            index_job_parameters([job])
             db.session.commit()
             
             # Start analysis
@@ -177,14 +449,14 @@ class AnalysisService:
             )
             
             if success:
-                job.status = "running"
+                AnalysisService.set_job_status(job, "running", cause="started", user_id=user_id)
                 db.session.commit()
                 logger.info(f"Started analysis {job_code}")
                 return job, None
             else:
-                job.status = "failed"
-                db.session.commit()
                 error_msg = result or "Unbekannter Fehler beim Starten"
+                AnalysisService.set_job_status(job, "failed", cause="start_failed", user_id=user_id, detail=error_msg)
+                db.session.commit()
                 logger.error(f"Failed to start analysis {job_code}: {error_msg}")
                 return job, error_msg
                 
@@ -224,8 +496,7 @@ class AnalysisService:
             success, error = ssh_kill_job(job_identifier, job.job_type)
             
             if success:
-                job.status = "failed"
-                job.updated_at = datetime.now(timezone.utc)
+                AnalysisService.set_job_status(job, "failed", cause="cancelled", user_id=user_id)
                 db.session.commit()
                 logger.info(f"Cancelled analysis {job.job_code}")
                 return True, None
@@ -256,8 +527,7 @@ class AnalysisService:
             
             reset_count = 0
             for job in running_jobs:
-                job.status = 'failed'
-                job.updated_at = datetime.now(timezone.utc)
+                AnalysisService.set_job_status(job, 'failed', cause="force_reset", user_id=user_id)
                 reset_count += 1
                 logger.warning(f"Force-reset job {job.id} ({job.job_code})")
             
@@ -302,17 +572,22 @@ class AnalysisService:
             if job.status == "running":
                 log_content = ssh_get_log(input_path, job.job_type)
                 
+                new_status = None
                 if log_content:
                     if re.search(r"Bioinformatic analysis is ready", log_content, re.IGNORECASE):
-                        job.status = "finished"
-                        job.updated_at = datetime.now(timezone.utc)
-                        db.session.commit()
-                        logger.info(f"Job {job.job_code} marked as finished")
+                        new_status = "finished"
                     elif re.search(r"Exiting pipeline|ANALYSIS FAILED|ERROR.*FATAL", log_content, re.IGNORECASE):
-                        job.status = "failed"
-                        job.updated_at = datetime.now(timezone.utc)
-                        db.session.commit()
-                        logger.info(f"Job {job.job_code} marked as failed")
+                        new_status = "failed"
+                
+                if new_status:
+                    # The job may have been read from a lagging replica; the whole
+                    # transition (re-read, event, report index) runs on the primary
+                    with use_primary():
+                        db.session.refresh(job)
+                        if job.status == "running":
+                            AnalysisService.set_job_status(job, new_status, cause="log")
+                            db.session.commit()
+                            logger.info(f"Job {job.job_code} marked as {new_status}")
             
             return {"status": job.status}
             
@@ -321,6 +596,7 @@ class AnalysisService:
             return {"status": job.status if job else "unknown", "error": str(e)}
     
     @staticmethod
+    @read_only
     def get_job_log(job_id, user_id):
         """
         Get job log content
@@ -375,8 +651,7 @@ class AnalysisService:
                 return False, "Job not found"
             
             if job.status == "running":
-                job.status = "finished"
-                job.updated_at = datetime.now(timezone.utc)
+                AnalysisService.set_job_status(job, "finished", cause="callback")
                 db.session.commit()
                 logger.info(f"Marked job {job_code} as finished via callback")
                 return True, None
@@ -390,40 +665,146 @@ class AnalysisService:
             return False, str(e)
     
     @staticmethod
-    @lru_cache(maxsize=128)
-    def get_folder_list(path, timestamp):
+    def get_folder_list(path, max_age=300):
         """
         Get list of folders in path (cached)
         
         Args:
             path: Path to browse
-            timestamp: Timestamp for cache invalidation
+            max_age: Maximum age of cached listing in seconds
             
         Returns:
             List of folder dictionaries
         """
-        folders = []
-        try:
-            if os.path.exists(path):
-                with os.scandir(path) as entries:
-                    for entry in entries:
-                        if entry.is_dir():
-                            folders.append({"name": entry.name, "path": entry.path})
-                
-                # Sort case-insensitive
-                folders.sort(key=lambda x: x["name"].lower())
-        except (OSError, PermissionError) as e:
-            logger.error(f"Error listing folders in {path}: {e}")
+        return folder_cache.list(path, max_age)
+    
+    @staticmethod
+    def _expand_folders(folders, levels, with_counts, max_age):
+        """
+        Attach child counts and nested listings to folder dictionaries
+        
+        Args:
+            folders: List of folder dictionaries
+            levels: Number of levels to return (1 = only these folders)
+            with_counts: Whether to add child_count to each folder
+            max_age: Maximum age of cached listings in seconds
+            
+        Returns:
+            Tuple of (folders, paths_of_deepest_level)
+        """
+        if levels <= 1 and not with_counts:
+            return folders, [folder["path"] for folder in folders]
+        
+        listings = folder_cache.list_many([folder["path"] for folder in folders], max_age)
+        
+        expanded = []
+        leaves = []
+        for folder in folders:
+            children = listings.get(folder["path"], [])
+            item = dict(folder)
+            
+            if with_counts:
+                item["child_count"] = len(children)
+            
+            if levels > 1:
+                item["children"], child_leaves = AnalysisService._expand_folders(
+                    children, levels - 1, with_counts, max_age
+                )
+                leaves.extend(child_leaves)
+            else:
+                leaves.append(folder["path"])
+            
+            expanded.append(item)
+        
+        return expanded, leaves
+    
+    @staticmethod
+    def _add_folder_sizes(folders, max_age):
+        """
+        Attach cached sizes to folder dictionaries (in place)
+        Uncached folders are marked as pending and sized in the background
+        
+        Args:
+            folders: List of folder dictionaries
+            max_age: Maximum age of cached sizes in seconds
+            
+        Returns:
+            True if any size is still pending
+        """
+        sizes = disk_usage.request([folder["path"] for folder in folders], max_age)
+        
+        pending = False
+        for folder in folders:
+            size = sizes.get(folder["path"])
+            if size is None:
+                folder["size_pending"] = True
+                pending = True
+            else:
+                folder["size_bytes"], folder["file_count"], _ = size
+                folder["size"] = format_file_size(size[0])
         
-        return folders
+        return pending
     
     @staticmethod
-    def browse_folder(path):
+    def get_largest_run_folders(analysis_type=None, limit=20):
+        """
+        Rank run folders by disk usage
+        
+        Args:
+            analysis_type: Restrict to one analysis type (None = all)
+            limit: Maximum number of run folders
+            
+        Returns:
+            Tuple of (result_dict, error_message)
+        """
+        try:
+            if analysis_type and analysis_type not in ANALYSIS_BASE_PATHS:
+                return None, f"Invalid analysis type: {analysis_type}"
+            
+            config = current_app.config
+            max_age = config.get('DISK_USAGE_CACHE_SECONDS', 900)
+            types = [analysis_type] if analysis_type else list(ANALYSIS_BASE_PATHS.keys())
+            
+            runs = []
+            for atype in types:
+                for folder in folder_cache.list(ANALYSIS_BASE_PATHS[atype], config.get('BROWSE_CACHE_SECONDS', 300)):
+                    runs.append(dict(folder, analysis_type=atype))
+            
+            sizes = disk_usage.request([run["path"] for run in runs], max_age)
+            
+            ranked = []
+            for run in runs:
+                size = sizes.get(run["path"])
+                if size is not None:
+                    run["size_bytes"], run["file_count"], computed_at = size
+                    run["size"] = format_file_size(run["size_bytes"])
+                    run["computed_at"] = computed_at.strftime('%d.%m.%Y %H:%M')
+                    ranked.append(run)
+            ranked.sort(key=lambda run: run["size_bytes"], reverse=True)
+            
+            return {
+                "runs": ranked[:max(1, limit)],
+                "total_bytes": sum(run["size_bytes"] for run in ranked),
+                "total_size": format_file_size(sum(run["size_bytes"] for run in ranked)),
+                "run_count": len(runs),
+                "pending": len(runs) - len(ranked)
+            }, None
+            
+        except Exception as e:
+            logger.error(f"Error in get_largest_run_folders: {e}")
+            return None, str(e)
+    
+    @staticmethod
+    def browse_folder(path, levels=1, with_counts=False, with_sizes=False):
         """
         Browse folder with validation and caching
         
         Args:
             path: Path to browse
+            levels: Number of folder levels to return
+            with_counts: Whether to return the number of subfolders per folder
+            with_sizes: Whether to return disk usage of the listed folders
+                (first level only; pending sizes are computed in the background)
             
         Returns:
             Tuple of (folders_list, current_path, error_message)
@@ -444,12 +825,28 @@ class AnalysisService:
             
             validated_path = validate_path(path, analysis_type)
             
-            # Use cache with timestamp for invalidation
-            timestamp = int(time.time() / 300)  # Cache for 5 minutes
-            folders = AnalysisService.get_folder_list(validated_path, timestamp)
+            config = current_app.config
+            max_age = config.get('BROWSE_CACHE_SECONDS', 300)
+            levels = max(1, min(levels, config.get('BROWSE_MAX_LEVELS', 3)))
+            
+            folders = AnalysisService.get_folder_list(validated_path, max_age)
+            folders, leaves = AnalysisService._expand_folders(folders, levels, with_counts, max_age)
+            
+            if with_sizes:
+                # Listings may be shared cache entries
+                folders = [dict(folder) for folder in folders]
+                AnalysisService._add_folder_sizes(folders, config.get('DISK_USAGE_CACHE_SECONDS', 900))
+            
+            # Warm the cache for the next clicks in the background
+            folder_cache.prefetch(
+                leaves,
+                depth=config.get('BROWSE_PREFETCH_DEPTH', 2) - 1,
+                budget=config.get('BROWSE_PREFETCH_BUDGET', 200),
+                max_age=max_age
+            )
             
             return folders, validated_path, None
             
         except Exception as e:
             logger.error(f"Error in browse_folder: {e}")
-            return [], "", str(e)          
\ No newline at end of file
+            return [], "", str(e)
@@ -9,7 +9,9 @@ import re
 import subprocess
 import collections
 import logging
-from app.core.utils import MAX_RECURSIVE_DEPTH
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.core.utils import ANALYSIS_HOSTS, MAX_RECURSIVE_DEPTH
 
 logger = logging.getLogger('analysis')
 
@@ -18,6 +20,9 @@ SSH_COMMAND_TIMEOUT = 30
 SSH_KILL_TIMEOUT = 10
 SSH_LOG_TIMEOUT = 15
 
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
 
 def ssh_command(mode, *args, capture_output=False, background=False, timeout=SSH_COMMAND_TIMEOUT):
     """
@@ -34,13 +39,16 @@ def ssh_command(mode, *args, capture_output=False, background=False, timeout=SSH
         Tuple of (result/success, error_message/pid)
     """
     cmd = ["/opt/ngs_webinterface/scripts/ssh_wrapper.sh", mode, *args]
+    # The wrapper takes the compute hosts from the app config
+    env = {**os.environ, 'WGS_HOST': ANALYSIS_HOSTS['wgs'], 'SPECIES_HOST': ANALYSIS_HOSTS['species']}
     
     try:
         if background:
             process = subprocess.Popen(
                 cmd, 
                 stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
+                stderr=subprocess.DEVNULL,
+                env=env
             )
             logger.info(f"Started background SSH command: {' '.join(cmd)} with PID {process.pid}")
             return True, process.pid
@@ -50,7 +58,8 @@ def ssh_command(mode, *args, capture_output=False, background=False, timeout=SSH
                 capture_output=capture_output,
                 text=True,
                 timeout=timeout,
-                check=False
+                check=False,
+                env=env
             )
             logger.info(f"Executed SSH command: {' '.join(cmd)}")
             if result.returncode == 0:
@@ -113,13 +122,14 @@ def ssh_get_log(*args):
     return result or "[INFO] Noch kein Log verfügbar"
 
 
-def find_fastq_files_recursive(folder_path, depth=0):
+def find_fastq_files_recursive(folder_path, depth=0, on_directory=None):
     """
     Recursively find all FASTQ files in a directory and its subdirectories
     
     Args:
         folder_path: Root folder to search
         depth: Current recursion depth (internal)
+        on_directory: Optional callback(directory, fastq_paths) per visited directory
         
     Returns:
         List of FASTQ file paths
@@ -129,126 +139,199 @@ def find_fastq_files_recursive(folder_path, depth=0):
         return []
     
     fastq_files = []
+    subfolders = []
     
     try:
         with os.scandir(folder_path) as entries:
             for entry in entries:
-                if entry.is_file() and (entry.name.endswith('.fastq.gz') or entry.name.endswith('.fastq')):
+                if entry.is_file():
                     # Skip undetermined files
-                    if not entry.name.startswith('Undetermined_'):
+                    if is_fastq_file(entry.name):
                         fastq_files.append(entry.path)
                 elif entry.is_dir() and not entry.name.startswith('.'):
-                    # Recursively search subdirectories
-                    subfolder_files = find_fastq_files_recursive(entry.path, depth + 1)
-                    fastq_files.extend(subfolder_files)
+                    subfolders.append(entry.path)
         
     except (OSError, PermissionError) as e:
         logger.error(f"Error scanning directory {folder_path}: {e}")
     
+    if on_directory:
+        on_directory(folder_path, list(fastq_files))
+    
+    # Recursively search subdirectories
+    for subfolder in subfolders:
+        fastq_files.extend(find_fastq_files_recursive(subfolder, depth + 1, on_directory))
+    
+    return fastq_files
+
+
+def is_fastq_file(file_name):
+    """
+    Check if a filename is a FASTQ file that should be analysed
+    
+    Args:
+        file_name: Name of the file
+        
+    Returns:
+        True for .fastq/.fastq.gz files except Undetermined reads
+    """
+    return (file_name.endswith('.fastq.gz') or file_name.endswith('.fastq')) \
+        and not file_name.startswith('Undetermined_')
+
+
+def list_fastq_files(folder_path, recursive=False, on_directory=None):
+    """
+    List FASTQ files in a folder
+    
+    Args:
+        folder_path: Folder containing FASTQ files
+        recursive: Whether to search recursively
+        on_directory: Optional callback(directory, fastq_paths) per visited directory
+        
+    Returns:
+        List of FASTQ file paths
+    """
+    if recursive:
+        fastq_files = find_fastq_files_recursive(folder_path, on_directory=on_directory)
+        logger.info(f"Found {len(fastq_files)} FASTQ files recursively in {folder_path}")
+        return fastq_files
+    
+    fastq_files = []
+    if os.path.exists(folder_path):
+        with os.scandir(folder_path) as entries:
+            fastq_files = [
+                entry.path for entry in entries 
+                if entry.is_file() and is_fastq_file(entry.name)
+            ]
+        if on_directory:
+            on_directory(folder_path, list(fastq_files))
+    logger.info(f"Found {len(fastq_files)} FASTQ files in {folder_path}")
     return fastq_files
 
 
-def extract_samples_with_details(folder_path, recursive=False):
+SOURCE_MAP = {
+    "L": "Lebensmittel",
+    "H": "Humanmedizinisch", 
+    "V": "Veterinärmedizinisch",
+    "U": "Umgebung",
+    "R": "Referenz",
+    "TA": "Tierart",
+    "NTC": "Negativkontrolle",
+    "PTC": "Positivkontrolle"
+}
+
+FASTQ_PATTERN = re.compile(
+    r"(?:"
+    # --- IonTorrent ---
+    r"\.R_(?P<ion_run>\d{4}_\d{2}_\d{2})_\d{2}_\d{2}_\d{2}_user_.*?-(?P<ion_source>[LHVUR]|TA|NTC|PTC)_(?P<ion_date>\d{8})\.IonXpress_(?P<ion_sample>\d{3})\.fastq(?:\.gz)?"
+    r"|"
+    # --- Illumina ---
+    r"(?:(?P<illumina_source>[LHVUR])-(?P<illumina_id>[A-Za-z0-9\-]+)_S\d+_L(?P<illumina_lane>\d{3})_R(?P<illumina_read>[12])_001)\.fastq(?:\.gz)?"
+    r"|"
+    # --- Illumina NTC / PTC ---
+    r"(?P<special_source>NTC|PTC)_S\d+_L(?P<special_lane>\d{3})_R(?P<special_read>[12])_001\.fastq(?:\.gz)?"
+    r")$", re.IGNORECASE
+)
+
+
+def parse_fastq_filename(file_path):
+    """
+    Parse sample information from a FASTQ file path
+    
+    Args:
+        file_path: Path to FASTQ file
+        
+    Returns:
+        Tuple of (sample_key, sample_dict, read_info) or None if no match.
+        read_info is a dict with 'platform', 'lane' and 'read' (None for IonTorrent)
+    """
+    file_name = os.path.basename(file_path)
+    
+    match = FASTQ_PATTERN.search(file_name)
+    if not match:
+        logger.debug(f"{file_name} - Kein Pattern-Match")
+        return None
+    
+    # IonTorrent
+    if match.group("ion_source"):
+        source_code = match.group("ion_source")
+        run_date = match.group("ion_run").replace("_", "-")
+        sample_date = match.group("ion_date")
+        sample_num = match.group("ion_sample")
+        formatted_sample_date = f"{sample_date[4:]}-{sample_date[2:4]}-{sample_date[:2]}"
+        key = f"{source_code}-{formatted_sample_date}_S{sample_num}"
+        sample = {
+            "source": SOURCE_MAP.get(source_code, source_code),
+            "probennummer": f"{formatted_sample_date}_S{sample_num}",
+            "file_path": os.path.dirname(file_path),
+            "run_date": run_date,
+            "original_sample_date": sample_date
+        }
+        return key, sample, {"platform": "iontorrent", "lane": None, "read": None}
+    
+    # Illumina
+    if match.group("illumina_source"):
+        source_code = match.group("illumina_source")
+        raw_name = match.group("illumina_id")
+        key = f"{source_code}-{raw_name}"
+        sample = {
+            "source": SOURCE_MAP.get(source_code, source_code),
+            "probennummer": raw_name,
+            "file_path": os.path.dirname(file_path)
+        }
+        return key, sample, {
+            "platform": "illumina",
+            "lane": int(match.group("illumina_lane")),
+            "read": int(match.group("illumina_read"))
+        }
+    
+    # Illumina NTC/PTC
+    if match.group("special_source"):
+        source_code = match.group("special_source")
+        sample = {
+            "source": SOURCE_MAP.get(source_code, source_code),
+            "probennummer": source_code,
+            "file_path": os.path.dirname(file_path)
+        }
+        return source_code, sample, {
+            "platform": "illumina",
+            "lane": int(match.group("special_lane")),
+            "read": int(match.group("special_read"))
+        }
+    
+    logger.debug(f"{file_name} - Match gefunden, aber keine Gruppe erkannt")
+    return None
+
+
+def extract_samples_with_details(folder_path, recursive=False, with_files=False, on_directory=None):
     """
     Extract sample information from fastq files with optional recursive search
     
     Args:
         folder_path: Folder containing FASTQ files
         recursive: Whether to search recursively
+        with_files: Whether to add the list of FASTQ paths as 'files'
+        on_directory: Optional callback(directory, fastq_paths) per visited directory
         
     Returns:
         List of sample dictionaries
     """
-    source_map = {
-        "L": "Lebensmittel",
-        "H": "Humanmedizinisch", 
-        "V": "Veterinärmedizinisch",
-        "U": "Umgebung",
-        "R": "Referenz",
-        "TA": "Tierart",
-        "NTC": "Negativkontrolle",
-        "PTC": "Positivkontrolle"
-    }
-    
     sample_dict = collections.OrderedDict()
-    pattern_universal = re.compile(
-        r"(?:"
-        # --- IonTorrent ---
-        r"\.R_(?P<ion_run>\d{4}_\d{2}_\d{2})_\d{2}_\d{2}_\d{2}_user_.*?-(?P<ion_source>[LHVUR]|TA|NTC|PTC)_(?P<ion_date>\d{8})\.IonXpress_(?P<ion_sample>\d{3})\.fastq(?:\.gz)?"
-        r"|"
-        # --- Illumina ---
-        r"(?:(?P<illumina_source>[LHVUR])-(?P<illumina_id>[A-Za-z0-9\-]+)_S\d+_L\d{3}_R[12]_001)\.fastq(?:\.gz)?"
-        r"|"
-        # --- Illumina NTC / PTC ---
-        r"(?P<special_source>NTC|PTC)_S\d+_L\d{3}_R[12]_001\.fastq(?:\.gz)?"
-        r")$", re.IGNORECASE
-    )
 
     try:
         # Get FASTQ files based on search mode
-        if recursive:
-            fastq_files = find_fastq_files_recursive(folder_path)
-            logger.info(f"Found {len(fastq_files)} FASTQ files recursively in {folder_path}")
-        else:
-            fastq_files = []
-            if os.path.exists(folder_path):
-                with os.scandir(folder_path) as entries:
-                    fastq_files = [
-                        entry.path for entry in entries 
-                        if entry.is_file() and (entry.name.endswith('.fastq.gz') or entry.name.endswith('.fastq'))
-                        and not entry.name.startswith('Undetermined_')
-                    ]
-            logger.info(f"Found {len(fastq_files)} FASTQ files in {folder_path}")
+        fastq_files = list_fastq_files(folder_path, recursive=recursive, on_directory=on_directory)
         
         # Process each FASTQ file
         for file_path in fastq_files:
-            file_name = os.path.basename(file_path)
-            
-            match = pattern_universal.search(file_name)
-            if not match:
-                logger.debug(f"{file_name} - Kein Pattern-Match")
+            parsed = parse_fastq_filename(file_path)
+            if not parsed:
                 continue
-                
-            # IonTorrent
-            if match.group("ion_source"):
-                source_code = match.group("ion_source")
-                run_date = match.group("ion_run").replace("_", "-")
-                sample_date = match.group("ion_date")
-                sample_num = match.group("ion_sample")
-                formatted_sample_date = f"{sample_date[4:]}-{sample_date[2:4]}-{sample_date[:2]}"
-                key = f"{source_code}-{formatted_sample_date}_S{sample_num}"
-                if key not in sample_dict:
-                    sample_dict[key] = {
-                        "source": source_map.get(source_code, source_code),
-                        "probennummer": f"{formatted_sample_date}_S{sample_num}",
-                        "file_path": os.path.dirname(file_path),
-                        "run_date": run_date,
-                        "original_sample_date": sample_date
-                    }
-            
-            # Illumina
-            elif match.group("illumina_source"):
-                source_code = match.group("illumina_source")
-                raw_name = match.group("illumina_id")
-                key = f"{source_code}-{raw_name}"
-                if key not in sample_dict:
-                    sample_dict[key] = {
-                        "source": source_map.get(source_code, source_code),
-                        "probennummer": raw_name,
-                        "file_path": os.path.dirname(file_path)
-                    }
             
-            # Illumina NTC/PTC
-            elif match.group("special_source"):
-                source_code = match.group("special_source")
-                if source_code not in sample_dict: 
-                    sample_dict[source_code] = {
-                        "source": source_map.get(source_code, source_code),
-                        "probennummer": source_code,
-                        "file_path": os.path.dirname(file_path)
-                    }
-            else:
-                logger.debug(f"{file_name} - Match gefunden, aber keine Gruppe erkannt")
+            key, sample, _ = parsed
+            if key not in sample_dict:
+                sample_dict[key] = sample
+            if with_files:
+                sample_dict[key].setdefault("files", []).append(file_path)
                 
         return list(sample_dict.values())
         
@@ -257,4 +340,146 @@ def extract_samples_with_details(folder_path, recursive=False):
         return []
     except Exception as e:
         logger.error(f"Unexpected error in extract_samples_with_details: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def get_process_pool(max_workers=None):
+    """
+    Get the shared process pool for CPU-bound file checks
+    
+    Args:
+        max_workers: Number of worker processes (only used on first call)
+        
+    Returns:
+        ProcessPoolExecutor instance
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+            logger.info(f"Started process pool with {_process_pool._max_workers} workers")
+        return _process_pool
+
+
+def file_signature(file_path):
+    """
+    Get cache signature of a file
+    
+    Args:
+        file_path: Path to file
+        
+    Returns:
+        Tuple of (path, size, mtime_ns)
+    """
+    stat = os.stat(file_path)
+    return file_path, stat.st_size, stat.st_mtime_ns
+
+
+class FileResultCache:
+    """Bounded LRU cache of per-file results keyed by (path, size, mtime)"""
+    
+    def __init__(self, max_entries=10000):
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+    
+    def get(self, signature):
+        """Get cached result for a file signature or None"""
+        with self._lock:
+            result = self._entries.get(signature)
+            if result is not None:
+                self._entries.move_to_end(signature)
+            return result
+    
+    def set(self, signature, result):
+        """Store result for a file signature"""
+        with self._lock:
+            self._entries[signature] = result
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class BackgroundFileResults:
+    """
+    Per-file results computed on the shared process pool in the background
+    
+    Results are stored by a done-callback under the file signature, so no
+    request waits for them and finished work is kept even if the requesting
+    client has gone away. Files already being computed are not submitted
+    again.
+    """
+    
+    def __init__(self, func, max_entries=10000):
+        """
+        Args:
+            func: Picklable function(file_path, *args) returning a result dict
+            max_entries: Maximum number of cached results
+        """
+        self.func = func
+        self._cache = FileResultCache(max_entries)
+        self._inflight = set()  # signatures submitted to the pool
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def request(self, file_paths, *args, max_workers=None):
+        """
+        Get cached results and start computing the missing ones
+        
+        Args:
+            file_paths: File paths
+            *args: Additional arguments of func (part of the cache key)
+            max_workers: Size of the process pool
+            
+        Returns:
+            Dict of path -> result, None while the result is being computed
+        """
+        results = {}
+        submit = {}
+        
+        with self._lock:
+            # Futures of the parent process never complete in a forked worker
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._inflight.clear()
+            
+            for file_path in file_paths:
+                try:
+                    signature = file_signature(file_path) + args
+                except OSError as e:
+                    results[file_path] = {"ok": False, "error": f"Datei nicht lesbar: {e}"}
+                    continue
+                
+                result = self._cache.get(signature)
+                results[file_path] = result
+                if result is None and signature not in self._inflight:
+                    self._inflight.add(signature)
+                    submit[file_path] = signature
+        
+        if submit:
+            pool = get_process_pool(max_workers)
+            remaining = list(submit.items())
+            try:
+                while remaining:
+                    file_path, signature = remaining[0]
+                    future = pool.submit(self.func, file_path, *args)
+                    future.add_done_callback(lambda future, signature=signature: self._store(signature, future))
+                    remaining.pop(0)
+            except Exception:
+                # E.g. a broken pool: release files that were never submitted
+                with self._lock:
+                    self._inflight.difference_update(signature for _, signature in remaining)
+                raise
+            logger.info(f"Submitted {len(submit)} files to {self.func.__name__}")
+        
+        return results
+    
+    def _store(self, signature, future):
+        try:
+            self._cache.set(signature, future.result())
+        except Exception as e:
+            # Not cached: the next request submits the file again
+            logger.error(f"{self.func.__name__} failed for {signature[0]}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(signature)
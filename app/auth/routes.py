@@ -95,13 +95,8 @@ def register():
             return render_template('register.html', form=form)
         
         try:
-            # Get next available ID
-            last_user = User.query.order_by(User.id.desc()).first()
-            next_id = (last_user.id + 1) if last_user else 1
-            
-            # Create new user (default role_id=2 for regular user)
+            # Create new user (default role_id=2 for regular user, id from the database sequence)
             new_user = User(
-                id=next_id,
                 username=username,
                 email=email,
                 password_hash=generate_password_hash(password),
@@ -111,7 +106,7 @@ def register():
             db.session.add(new_user)
             db.session.commit()
             
-            logger.info(f"New user registered: {username} (ID: {next_id})")
+            logger.info(f"New user registered: {username} (ID: {new_user.id})")
             flash('Registrierung erfolgreich! Du kannst dich jetzt anmelden.', 'success')
             return redirect(url_for('auth.login'))
             
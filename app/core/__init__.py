@@ -11,10 +11,17 @@ from .utils import (
     format_file_size,
     truncate_log,
     is_valid_report_file,
+    escape_like,
+    encode_cursor,
+    decode_cursor,
     ApplicationError,
     ANALYSIS_BASE_PATHS,
-    SUPPORTED_REPORT_EXTENSIONS
+    ANALYSIS_HOSTS,
+    SUPPORTED_REPORT_EXTENSIONS,
+    JOB_STATUSES,
+    JOB_TERMINAL_STATUSES
 )
+from .auth import require_admin
 
 __all__ = [
     'validate_path',
@@ -23,7 +30,14 @@ __all__ = [
     'format_file_size',
     'truncate_log',
     'is_valid_report_file',
+    'escape_like',
+    'encode_cursor',
+    'decode_cursor',
     'ApplicationError',
     'ANALYSIS_BASE_PATHS',
-    'SUPPORTED_REPORT_EXTENSIONS'
+    'ANALYSIS_HOSTS',
+    'SUPPORTED_REPORT_EXTENSIONS',
+    'JOB_STATUSES',
+    'JOB_TERMINAL_STATUSES',
+    'require_admin'
 ]
\ No newline at end of file
@@ -0,0 +1,248 @@
+# core/audit.py
+"""
+Audit trail
+Admin and job actions are queued in memory and inserted in batches by a
+background thread, so recording an action adds no database work to the
+request. Entries are written after the action itself committed; if the
+process dies before the next flush, the queued entries are lost (the
+free-text log lines remain).
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from flask import has_request_context, request
+from flask_login import current_user
+from sqlalchemy import select, insert, tuple_
+
+from extensions import db
+from models import AuditEvent
+from app.core.metrics import metrics
+from app.core.utils import decode_cursor, encode_cursor
+
+logger = logging.getLogger('core')
+
+
+class AuditLog:
+    """Bounded queue of audit entries with a batch-writing background thread"""
+
+    def __init__(self, max_queue=10000, batch_size=200, flush_seconds=2.0, max_attempts=3):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self._app = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        """
+        Configure from the application config
+
+        Args:
+            app: Flask application (the writer runs in its app context)
+        """
+        self._app = app
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 200)
+        self.flush_seconds = app.config.get('AUDIT_FLUSH_SECONDS', 2.0)
+        max_queue = app.config.get('AUDIT_QUEUE_SIZE', 10000)
+        if max_queue != self.max_queue:
+            self.max_queue = max_queue
+            self._queue = queue.Queue(maxsize=max_queue)
+        atexit.register(self.flush)
+
+    def record(self, action, target_type=None, target_id=None, success=True, detail=None, actor=None):
+        """
+        Queue an audit entry (never raises)
+
+        Args:
+            action: Action name, e.g. user.create or job.cancel
+            target_type: Kind of the affected object (user, job)
+            target_id: Id of the affected object
+            success: Whether the action succeeded
+            detail: JSON-serializable details (no passwords)
+            actor: User performing the action (defaults to current_user)
+        """
+        try:
+            if actor is None and has_request_context() and current_user.is_authenticated:
+                actor = current_user
+            entry = {
+                'created_at': datetime.now(timezone.utc),
+                'actor_id': getattr(actor, 'id', None),
+                'actor_name': getattr(actor, 'username', None),
+                'action': action,
+                'target_type': target_type,
+                'target_id': str(target_id) if target_id is not None else None,
+                'success': success,
+                'detail': detail,
+                'remote_addr': request.remote_addr if has_request_context() else None
+            }
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            metrics.increment('audit_events_dropped')
+            logger.error(f"Audit queue full, dropped entry: {json.dumps(entry, default=str)}")
+            return
+        except Exception as e:
+            logger.error(f"Failed to record audit entry {action}: {e}")
+            return
+
+        metrics.set_gauge('audit_queue_depth', self._queue.qsize())
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        """Start the writer thread (again after a fork, threads do not survive it)"""
+        if self._app is None:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=60)
+            except queue.Empty:
+                continue
+            # Collect more entries for a short while so bursts become one insert
+            batch = [first]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        """Insert one batch, retrying a few times before giving up"""
+        with self._flush_lock:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    with self._app.app_context():
+                        try:
+                            db.session.execute(insert(AuditEvent), batch)
+                            db.session.commit()
+                        finally:
+                            db.session.remove()
+                    metrics.increment('audit_events_written', len(batch))
+                    metrics.set_gauge('audit_queue_depth', self._queue.qsize())
+                    return True
+                except Exception as e:
+                    logger.warning(f"Writing {len(batch)} audit entries failed (attempt {attempt}): {e}")
+                    if attempt < self.max_attempts:
+                        time.sleep(min(2 ** attempt, 30))
+
+        metrics.increment('audit_events_dropped', len(batch))
+        for entry in batch:
+            logger.error(f"Audit entry not written: {json.dumps(entry, default=str)}")
+        return False
+
+    def flush(self):
+        """
+        Write all queued entries now (tests, shutdown)
+
+        Returns:
+            Number of written entries
+        """
+        if self._app is None:
+            return 0
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            if self._write(batch):
+                written += len(batch)
+
+
+def query_audit_events(limit=50, cursor=None, action=None, actor_id=None, target_type=None, target_id=None,
+                       date_from=None, date_to=None):
+    """
+    Get one page of audit entries, newest first
+
+    Args:
+        limit: Page size
+        cursor: Cursor from the previous page (None = first page)
+        action: Action name, or a prefix ending in '.' (e.g. 'user.')
+        actor_id: User who performed the actions
+        target_type: Kind of the affected object
+        target_id: Id of the affected object (requires target_type)
+        date_from: First day (inclusive)
+        date_to: Last day (inclusive)
+
+    Returns:
+        Tuple of (entries, next_cursor); entries are dictionaries
+    """
+    query = select(AuditEvent)
+    if action:
+        if action.endswith('.'):
+            query = query.where(AuditEvent.action.startswith(action, autoescape=True))
+        else:
+            query = query.where(AuditEvent.action == action)
+    if actor_id is not None:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if target_type:
+        query = query.where(AuditEvent.target_type == target_type)
+        if target_id is not None:
+            query = query.where(AuditEvent.target_id == str(target_id))
+    if date_from:
+        query = query.where(AuditEvent.created_at >= date_from)
+    if date_to:
+        query = query.where(AuditEvent.created_at < date_to + timedelta(days=1))
+
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            position = (datetime.fromisoformat(values[0]), int(values[1]))
+        except (IndexError, TypeError, ValueError):
+            raise ValueError("Ungültiger Cursor")
+        query = query.where(tuple_(AuditEvent.created_at, AuditEvent.id) < position)
+
+    events = db.session.scalars(
+        query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc()).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].created_at, events[-1].id)
+
+    return [
+        {
+            'id': event.id,
+            'created_at': event.created_at.isoformat(),
+            'actor_id': event.actor_id,
+            'actor_name': event.actor_name,
+            'action': event.action,
+            'target_type': event.target_type,
+            'target_id': event.target_id,
+            'success': event.success,
+            'detail': event.detail,
+            'remote_addr': event.remote_addr
+        }
+        for event in events
+    ], next_cursor
+
+
+# Global instance
+audit_log = AuditLog()
@@ -0,0 +1,26 @@
+# core/auth.py
+"""
+Authorization decorators shared by the blueprints
+"""
+
+import logging
+from functools import wraps
+
+from flask import jsonify
+from flask_login import current_user
+
+logger = logging.getLogger('auth')
+
+
+def require_admin(func):
+    """Decorator to require admin role (use below login_required)"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.is_admin:
+            logger.warning(
+                f"Non-admin user {current_user.username if current_user.is_authenticated else 'anonymous'} "
+                f"attempted admin action {func.__name__}"
+            )
+            return jsonify({'error': 'Keine Berechtigung'}), 403
+        return func(*args, **kwargs)
+    return wrapper
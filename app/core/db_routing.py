@@ -0,0 +1,185 @@
+# core/db_routing.py
+"""
+Read replica routing
+With a 'replica' bind configured (REPLICA_DATABASE_URL), reads inside
+read_only routes and service methods go to the replica. Writes, flushes
+and locking reads always use the primary. After a user's request wrote
+to the database, that user's reads stay on the primary for a short
+window so just-created jobs are visible despite replication lag. If the
+replica cannot be reached, reads fall back to the primary for
+REPLICA_RETRY_SECONDS.
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import g, has_app_context, has_request_context, session as user_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+logger = logging.getLogger('app')
+
+REPLICA_BIND = 'replica'
+_PRIMARY_UNTIL_KEY = 'db_primary_until'
+
+# Per process: reads stay on the primary until then after a replica connection error
+_replica_down_until = 0.0
+_retry_seconds = 30
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica inside read_only regions"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _replica_active() and REPLICA_BIND in self._db.engines:
+            is_write = isinstance(clause, sa.UpdateBase) or getattr(clause, '_for_update_arg', None) is not None
+            if not is_write and self._replica_reachable():
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_reachable(self):
+        """Whether the replica is usable; connects once per session to find out"""
+        if not replica_available():
+            return False
+        if self.info.get('replica_checked'):
+            return True
+        try:
+            with self._db.engines[REPLICA_BIND].connect():
+                pass
+        except sa.exc.DBAPIError as e:
+            _mark_replica_down(e)
+            return False
+        self.info['replica_checked'] = True
+        return True
+
+
+def replica_available():
+    """Whether reads may use the replica (no recent connection error in this process)"""
+    return time.time() >= _replica_down_until
+
+
+def _mark_replica_down(error):
+    global _replica_down_until
+    if replica_available():
+        logger.warning(f"Read replica unavailable, reading from the primary for {_retry_seconds}s: {error}")
+    _replica_down_until = time.time() + _retry_seconds
+
+
+def _replica_active():
+    return has_app_context() and g.get('db_replica', False)
+
+
+def _recent_write():
+    """Whether the current user wrote within the read-your-writes window"""
+    if not has_request_context():
+        return False
+    return g.get('db_wrote', False) or user_session.get(_PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+@contextmanager
+def use_replica():
+    """Route reads of this block to the replica (unless the user just wrote or use_primary is active)"""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('db_replica', False)
+    g.db_replica = not _recent_write() and not g.get('db_primary', False)
+    try:
+        yield
+    finally:
+        g.db_replica = previous
+
+
+@contextmanager
+def use_primary():
+    """Route reads of this block to the primary, including nested read_only calls"""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('db_replica', False), g.get('db_primary', False)
+    g.db_replica, g.db_primary = False, True
+    try:
+        yield
+    finally:
+        g.db_replica, g.db_primary = previous
+
+
+def read_only(func):
+    """
+    Decorator for routes and service methods that only read from the database
+    A replica connection error during the call repeats it on the primary
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            try:
+                return func(*args, **kwargs)
+            except sa.exc.DBAPIError:
+                if not (has_app_context() and g.pop('db_replica_failed', False)):
+                    raise
+
+        from extensions import db
+        db.session.rollback()
+        with use_primary():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _handle_replica_error(context):
+    """Mark the replica down when connecting fails or the connection was lost"""
+    if context.is_disconnect or context.connection is None:
+        _mark_replica_down(context.original_exception)
+        if has_app_context():
+            g.db_replica_failed = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush(session, flush_context):
+    session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_write_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_write(session):
+    if session.info.pop('db_wrote', False) and has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _forget_write(session, previous_transaction):
+    session.info.pop('db_wrote', None)
+
+
+def init_db_routing(app):
+    """
+    Keep users on the primary for REPLICA_READ_YOUR_WRITES_SECONDS after
+    a request of theirs committed a write
+
+    Args:
+        app: Flask application
+    """
+    global _retry_seconds
+
+    window = app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10)
+    enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+    _retry_seconds = app.config.get('REPLICA_RETRY_SECONDS', 30)
+
+    @app.after_request
+    def remember_recent_write(response):
+        if enabled and g.get('db_wrote'):
+            user_session[_PRIMARY_UNTIL_KEY] = time.time() + window
+        return response
+
+    if enabled:
+        from extensions import db
+        with app.app_context():
+            event.listen(db.engines[REPLICA_BIND], 'handle_error', _handle_replica_error)
+        logger.info(f"Read replica routing enabled (read-your-writes window {window}s)")
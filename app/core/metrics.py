@@ -0,0 +1,118 @@
+# core/metrics.py
+"""
+In-process metrics registry
+Counters, gauges and summaries exported as JSON via /api/metrics
+"""
+
+import threading
+from collections import deque
+
+SUMMARY_WINDOW = 1000  # observations kept per summary for percentiles
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Summary:
+    """Count, sum, max and a sliding window for percentiles"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+        self.window = deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+        self.window.append(value)
+
+    def snapshot(self):
+        values = sorted(self.window)
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else None,
+            'max': self.max,
+            'p50': _percentile(values, 0.5),
+            'p95': _percentile(values, 0.95),
+            'p99': _percentile(values, 0.99)
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named metrics with optional labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+
+    def increment(self, name, value=1, **labels):
+        """Increase a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to the current value"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Record an observation (e.g. a duration in seconds)"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            summary = series.get(key)
+            if summary is None:
+                summary = series[key] = _Summary()
+            summary.observe(value)
+
+    def get_summary(self, name, **labels):
+        """Get snapshot of one summary or None"""
+        with self._lock:
+            summary = self._summaries.get(name, {}).get(_label_key(labels))
+            return summary.snapshot() if summary else None
+
+    def snapshot(self):
+        """
+        Export all metrics
+
+        Returns:
+            Dict with counters, gauges and summaries; each metric is a
+            list of {"labels": {...}, "value": ...} entries
+        """
+        def export(metrics, convert):
+            return {
+                name: [{'labels': dict(key), 'value': convert(value)} for key, value in series.items()]
+                for name, series in sorted(metrics.items())
+            }
+
+        with self._lock:
+            return {
+                'counters': export(self._counters, lambda v: v),
+                'gauges': export(self._gauges, lambda v: v),
+                'summaries': export(self._summaries, lambda v: v.snapshot())
+            }
+
+    def reset(self):
+        """Remove all metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,309 @@
+# core/scheduler.py
+"""
+Periodic maintenance scheduler
+Runs registered tasks at configurable intervals in a background thread.
+Shared tasks hold a lease row in the database so only one worker process
+runs them; local tasks (e.g. in-process cache pruning) run in every process.
+The thread is started lazily by the first request of each process, so with
+a preloading server every forked worker runs its own scheduler and scripts
+that only import the app run none.
+"""
+
+import os
+import time
+import socket
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import MaintenanceTask
+from .metrics import metrics
+
+logger = logging.getLogger('app')
+
+
+class ScheduledTask:
+    """Registered maintenance task and its in-process run state"""
+
+    def __init__(self, name, func, interval, shared=True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.shared = shared
+        self.running = False
+        self.next_check = 0.0  # monotonic time of the next due check
+        self.last_run = None  # state of the last run in this process
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'interval_seconds': self.interval,
+            'shared': self.shared,
+            'running': self.running,
+            'last_run': self.last_run
+        }
+
+
+class MaintenanceScheduler:
+    """
+    Interval scheduler for maintenance tasks
+
+    A shared task is due when its last start (of any process) is older than
+    its interval. Processes claim it with a conditional UPDATE of the lease
+    row; a lease held by a crashed process expires after lease_seconds.
+    """
+
+    def __init__(self, tick=30, lease_seconds=1800):
+        self.tick = tick
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._app = None
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def init_app(self, app):
+        """
+        Start the scheduler with the first request of every process
+
+        Args:
+            app: Flask application (for the app context)
+        """
+        self._app = app
+        app.before_request(self.ensure_started)
+
+    def register(self, name, func, interval, shared=True):
+        """
+        Register a maintenance task
+
+        Args:
+            name: Unique task name
+            func: Callable without arguments (runs in an app context); its
+                  JSON-serializable return value is recorded
+            interval: Seconds between runs (0 disables the task)
+            shared: Run in only one worker process (database lease)
+        """
+        with self._lock:
+            self._tasks[name] = ScheduledTask(name, func, interval, shared)
+
+    @property
+    def tasks(self):
+        with self._lock:
+            return list(self._tasks.values())
+
+    def ensure_started(self):
+        """Start the scheduler thread (again after a fork, threads do not survive it)"""
+        if self._app is None:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self.start(self._app)
+
+    def start(self, app):
+        """
+        Start the scheduler thread in this process
+
+        Args:
+            app: Flask application (for the app context)
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            # Lease owner of this process (forked workers inherit the parent's)
+            self._pid = os.getpid()
+            self.owner = f"{socket.gethostname()}:{self._pid}"
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(app,), name='maintenance-scheduler', daemon=True)
+            self._thread.start()
+        logger.info(f"Maintenance scheduler started ({len(self._tasks)} tasks, owner {self.owner})")
+
+    def stop(self):
+        """Stop the scheduler thread after the current tick"""
+        self._stop.set()
+
+    def _loop(self, app):
+        # First tick after a delay so startup (and workers forking) is not slowed down
+        while not self._stop.wait(self.tick):
+            with app.app_context():
+                try:
+                    self.run_pending()
+                except Exception as e:
+                    logger.error(f"Maintenance scheduler tick failed: {e}")
+                finally:
+                    db.session.remove()
+
+    def run_pending(self):
+        """
+        Run all due tasks (requires an application context)
+
+        Returns:
+            Names of the tasks run by this process
+        """
+        executed = []
+        now = time.monotonic()
+        for task in self.tasks:
+            if task.interval <= 0 or task.running or now < task.next_check:
+                continue
+            if self.run_task(task.name):
+                executed.append(task.name)
+        return executed
+
+    def run_task(self, name, force=False):
+        """
+        Run a task now if it is due (requires an application context)
+
+        Args:
+            name: Task name
+            force: Ignore the interval (an active lease is still respected)
+
+        Returns:
+            True if this process ran the task
+
+        Raises:
+            KeyError: If the task is not registered
+        """
+        task = self._tasks[name]
+        with self._lock:
+            if task.running:
+                return False
+            task.running = True
+
+        try:
+            started_at = datetime.now(timezone.utc)
+            if task.shared and not self._acquire(task, started_at, force):
+                task.next_check = time.monotonic() + min(task.interval, self.tick * 10)
+                return False
+            task.next_check = time.monotonic() + task.interval
+
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = task.func()
+            except Exception as e:
+                db.session.rollback()
+                error = str(e)
+                logger.error(f"Maintenance task {name} failed: {e}")
+            duration = time.perf_counter() - started
+
+            task.last_run = {
+                'started_at': started_at.isoformat(),
+                'duration': round(duration, 3),
+                'status': 'failed' if error else 'ok',
+                'error': error,
+                'result': result
+            }
+            metrics.observe('maintenance_task_seconds', duration, task=name)
+            if error:
+                metrics.increment('maintenance_task_failures', task=name)
+            else:
+                logger.info(f"Maintenance task {name} finished in {duration:.2f}s: {result}")
+
+            if task.shared:
+                self._release(task, duration, error, result)
+            return True
+        finally:
+            task.running = False
+
+    def _ensure_row(self, task):
+        if db.session.get(MaintenanceTask, task.name) is not None:
+            return
+        try:
+            db.session.add(MaintenanceTask(name=task.name, interval_seconds=task.interval))
+            db.session.commit()
+        except IntegrityError:
+            # Created by another worker in the meantime
+            db.session.rollback()
+
+    def _acquire(self, task, now, force):
+        """Claim the lease of a due shared task"""
+        try:
+            self._ensure_row(task)
+
+            conditions = [
+                MaintenanceTask.name == task.name,
+                or_(MaintenanceTask.lease_until.is_(None), MaintenanceTask.lease_until < now)
+            ]
+            if not force:
+                conditions.append(or_(
+                    MaintenanceTask.last_started_at.is_(None),
+                    MaintenanceTask.last_started_at <= now - timedelta(seconds=task.interval)
+                ))
+
+            result = db.session.execute(
+                update(MaintenanceTask).where(*conditions).values(
+                    lease_owner=self.owner,
+                    lease_until=now + timedelta(seconds=self.lease_seconds),
+                    last_started_at=now,
+                    interval_seconds=task.interval
+                )
+            )
+            db.session.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Could not acquire lease for maintenance task {task.name}: {e}")
+            return False
+
+    def _release(self, task, duration, error, result):
+        """Record the run and release the lease"""
+        try:
+            db.session.execute(
+                update(MaintenanceTask).where(
+                    MaintenanceTask.name == task.name,
+                    MaintenanceTask.lease_owner == self.owner
+                ).values(
+                    lease_owner=None,
+                    lease_until=None,
+                    last_finished_at=datetime.now(timezone.utc),
+                    last_duration=duration,
+                    last_status='failed' if error else 'ok',
+                    last_error=error,
+                    last_result=result,
+                    run_count=MaintenanceTask.run_count + 1
+                )
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Could not record run of maintenance task {task.name}: {e}")
+
+    def status(self):
+        """
+        Registered tasks with their local state and the shared run records
+
+        Returns:
+            List of task dictionaries
+        """
+        rows = {
+            row.name: row for row in db.session.query(MaintenanceTask).filter(
+                MaintenanceTask.name.in_([task.name for task in self.tasks])
+            )
+        }
+
+        tasks = []
+        for task in self.tasks:
+            entry = task.to_dict()
+            row = rows.get(task.name)
+            if row is not None:
+                entry['shared_state'] = {
+                    'lease_owner': row.lease_owner,
+                    'lease_until': row.lease_until.isoformat() if row.lease_until else None,
+                    'last_started_at': row.last_started_at.isoformat() if row.last_started_at else None,
+                    'last_finished_at': row.last_finished_at.isoformat() if row.last_finished_at else None,
+                    'last_duration': row.last_duration,
+                    'last_status': row.last_status,
+                    'last_error': row.last_error,
+                    'last_result': row.last_result,
+                    'run_count': row.run_count
+                }
+            tasks.append(entry)
+        return tasks
+
+
+scheduler = MaintenanceScheduler()
@@ -0,0 +1,146 @@
+# core/sql_stats.py
+"""
+Per-request SQL instrumentation
+Counts statements and database time per request via SQLAlchemy engine
+events and flags repeated statement shapes (N+1 patterns)
+"""
+
+import re
+import time
+import heapq
+import logging
+from collections import Counter
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import metrics
+
+logger = logging.getLogger('app')
+
+# Expanded IN lists and VALUES rows differ only in their number of parameters
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_installed = False
+
+
+def statement_shape(statement):
+    """
+    Normalize a statement so repetitions with other parameters compare equal
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Normalized statement
+    """
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    return _PARAM_LIST.sub('(?)', shape)
+
+
+class RequestSQLStats:
+    """Statements executed during one request"""
+
+    def __init__(self, slowest=5):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+        self._slowest = []  # min-heap of (duration, statement)
+        self._keep = slowest
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+
+        item = (duration, shape[:300])
+        if len(self._slowest) < self._keep:
+            heapq.heappush(self._slowest, item)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self):
+        """Slowest statements, slowest first"""
+        return sorted(self._slowest, reverse=True)
+
+    def repeated(self, threshold):
+        """Statement shapes executed more than threshold times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+
+    stats = g.get('sql_stats')
+    if stats is None:
+        stats = g.sql_stats = RequestSQLStats()
+    stats.record(statement, duration)
+
+
+def init_sql_instrumentation(app):
+    """
+    Record SQL statistics per request
+
+    Adds an X-SQL-Stats response header in debug/testing mode (or with
+    SQL_STATS_HEADER) and exports per-endpoint counters to the metrics
+    registry.
+
+    Args:
+        app: Flask application
+    """
+    global _installed
+    if not _installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _installed = True
+
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 10)
+    slow_seconds = app.config.get('SQL_SLOW_QUERY_MS', 500) / 1000.0
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        metrics.observe('sql_queries_per_request', stats.count, endpoint=endpoint)
+        metrics.observe('sql_time_per_request_seconds', stats.total_time, endpoint=endpoint)
+
+        slow = [item for item in stats.slowest if item[0] >= slow_seconds]
+        if slow:
+            metrics.increment('sql_slow_queries', len(slow), endpoint=endpoint)
+            logger.warning(f"Slow SQL in {endpoint}: {slow[0][0] * 1000:.0f} ms {slow[0][1]}")
+
+        repeated = stats.repeated(threshold)
+        if repeated:
+            metrics.increment('sql_n_plus_one', endpoint=endpoint)
+            shape, count = repeated[0]
+            logger.warning(f"Possible N+1 in {endpoint}: statement executed {count} times: {shape[:200]}")
+
+        if app.debug or app.testing or app.config.get('SQL_STATS_HEADER', False):
+            response.headers['X-SQL-Stats'] = (
+                f"queries={stats.count}; time_ms={stats.total_time * 1000:.1f}; "
+                f"max_repeat={stats.shapes.most_common(1)[0][1] if stats.shapes else 0}; "
+                f"n_plus_one={'yes' if repeated else 'no'}"
+            )
+            if stats.slowest:
+                duration, statement = stats.slowest[0]
+                response.headers['X-SQL-Slowest'] = f"{duration * 1000:.1f}ms {statement[:200]}"
+
+        return response
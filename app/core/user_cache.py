@@ -0,0 +1,129 @@
+# core/user_cache.py
+"""
+Cached user identity for Flask-Login
+Keeps id, name, email and role per user, so authenticated requests
+(e.g. status polling) only read the user's auth_version instead of
+loading user and role. Every change of a user increments auth_version,
+so deletions, role changes and password changes apply in all worker
+processes with the next request.
+"""
+
+import time
+import logging
+import threading
+
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import joinedload, object_session
+
+from extensions import db
+from models import User
+
+logger = logging.getLogger('auth')
+
+
+class CachedRole:
+    """Detached role of a cached user"""
+
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+
+    def __repr__(self):
+        return f'<CachedRole {self.name}>'
+
+
+class CachedUser(UserMixin):
+    """
+    Read-only identity of a logged-in user
+
+    Mirrors the User attributes used by routes and templates. Code that
+    changes a user must load the User model itself.
+    """
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role_id = user.role_id
+        self.role = CachedRole(user.role.id, user.role.name) if user.role else None
+        self.created_at = user.created_at
+        self.auth_version = user.auth_version
+
+    @property
+    def is_admin(self):
+        """Check if user has admin role"""
+        return self.role is not None and self.role.name == 'admin'
+
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+
+
+class UserCache:
+    """
+    TTL cache of CachedUser keyed by user id
+
+    An entry is only used while its auth_version matches the database row,
+    which is read on every lookup (a primary key lookup of one column).
+    invalidate() drops entries of this process right away.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entries = {}  # user_id -> (CachedUser, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Get a user identity, loading it from the database when it changed
+
+        Args:
+            user_id: User id
+
+        Returns:
+            CachedUser or None if the user does not exist
+        """
+        auth_version = db.session.scalar(select(User.auth_version).where(User.id == user_id))
+        if auth_version is None:
+            self.invalidate(user_id)
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0].auth_version == auth_version and entry[1] > now:
+                return entry[0]
+
+        user = db.session.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+        if user is None:
+            return None
+
+        cached = CachedUser(user)
+        with self._lock:
+            self._entries[user_id] = (cached, now + self.ttl)
+        return cached
+
+    def invalidate(self, user_id=None):
+        """
+        Drop cached identities of this process after a user was changed
+        (other processes notice the new auth_version)
+
+        Args:
+            user_id: Changed user (None = all users)
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+        logger.debug(f"Invalidated cached user {user_id if user_id is not None else '(all)'}")
+
+
+@event.listens_for(User, 'before_update')
+def _increment_auth_version(mapper, connection, target):
+    # Only real column changes (the role is changed through role_id)
+    if object_session(target).is_modified(target, include_collections=False):
+        target.auth_version = (target.auth_version or 0) + 1
+
+
+user_cache = UserCache()
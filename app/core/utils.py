@@ -4,10 +4,14 @@ Core utility functions shared across the application
 """
 
 import os
+import json
+import base64
 import logging
 from datetime import datetime, timedelta
 from werkzeug.exceptions import BadRequest, Forbidden
 
+from config import Config
+
 logger = logging.getLogger('core')
 
 # Constants
@@ -16,7 +20,12 @@ ANALYSIS_BASE_PATHS = {
     'species': '/animalSpecies'
 }
 
+# Compute host per analysis type (WGS_HOST / SPECIES_HOST, see config.py)
+ANALYSIS_HOSTS = Config.ANALYSIS_HOSTS
+
 SUPPORTED_REPORT_EXTENSIONS = ('.html', '.pdf', '.txt', '.csv', '.json')
+JOB_STATUSES = ('queued', 'running', 'finished', 'failed')
+JOB_TERMINAL_STATUSES = ('finished', 'failed')
 MAX_LOG_SIZE = 1024 * 1024  # 1MB
 MAX_RECURSIVE_DEPTH = 5
 
@@ -77,20 +86,21 @@ def validate_path(path, analysis_type=None):
     return resolved_path
 
 
-def generate_job_code(job_type, job_count_today):
+def generate_job_code(job_type, job_number, day=None):
     """
     Generate a human-readable job code
     
     Args:
         job_type: Type of analysis (wgs, species, etc.)
-        job_count_today: Number of jobs of this type today
+        job_number: Number of the job of this type on that day
+        day: Date of the code (defaults to today)
         
     Returns:
         Job code string (e.g., 'wgs241009_01')
     """
-    now = datetime.now()
-    logger.info(f"Generating job code for type: {job_type}, count today: {job_count_today}")
-    return f"{job_type}{now.strftime('%y%m%d')}_{job_count_today:02d}"
+    day = day or datetime.now().date()
+    logger.info(f"Generating job code for type: {job_type}, day: {day}, number: {job_number}")
+    return f"{job_type}{day.strftime('%y%m%d')}_{job_number:02d}"
 
 
 def cleanup_old_cache(cache_dict, max_age_seconds=300):
@@ -162,4 +172,54 @@ def is_valid_report_file(filename):
     Returns:
         True if valid report file, False otherwise
     """
-    return any(filename.lower().endswith(ext) for ext in SUPPORTED_REPORT_EXTENSIONS)
\ No newline at end of file
+    return any(filename.lower().endswith(ext) for ext in SUPPORTED_REPORT_EXTENSIONS)
+
+
+def escape_like(value):
+    """
+    Escape LIKE wildcards in a literal value (use with escape='\\')
+    
+    Args:
+        value: Literal search string
+        
+    Returns:
+        Escaped string
+    """
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def encode_cursor(*values):
+    """
+    Encode keyset pagination values as an opaque URL-safe cursor
+    
+    Args:
+        values: Sort key values of the last returned row (datetimes allowed)
+        
+    Returns:
+        Cursor string
+    """
+    plain = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by encode_cursor
+    
+    Args:
+        cursor: Cursor string
+        
+    Returns:
+        List of sort key values (datetimes as ISO strings)
+        
+    Raises:
+        BadRequest: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor is not a list")
+        return values
+    except (ValueError, TypeError) as e:
+        raise BadRequest(f"Ungültiger Cursor: {e}")
@@ -0,0 +1,89 @@
+# history/archive.py
+"""
+Job archive
+Terminal jobs older than the retention window are moved in batches from
+analysis_jobs to analysis_jobs_archive, so the hot table and its indexes
+only grow with recent activity
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, delete, func, literal
+
+from extensions import db
+from models import AnalysisJob, AnalysisJobArchive
+from app.core.utils import JOB_TERMINAL_STATUSES
+
+logger = logging.getLogger('history')
+
+# Columns copied unchanged from analysis_jobs
+ARCHIVED_COLUMNS = (
+    'id', 'user_id', 'job_type', 'job_code', 'run_name', 'parameters',
+    'status', 'progress', 'created_at', 'updated_at'
+)
+
+
+def archive_jobs(retention_days, batch_size=500, max_batches=20):
+    """
+    Move terminal jobs older than retention_days into the archive
+    Each batch is copied and deleted in its own transaction
+
+    Args:
+        retention_days: Jobs created before now - retention_days are archived
+        batch_size: Jobs per transaction
+        max_batches: Batches per call (bounds the runtime of one call)
+
+    Returns:
+        Number of archived jobs
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=retention_days)
+    archived = 0
+
+    for _ in range(max_batches):
+        job_ids = db.session.scalars(
+            select(AnalysisJob.id).where(
+                AnalysisJob.status.in_(JOB_TERMINAL_STATUSES),
+                AnalysisJob.created_at < cutoff
+            ).order_by(AnalysisJob.created_at, AnalysisJob.id).limit(batch_size)
+        ).all()
+        if not job_ids:
+            break
+
+        try:
+            db.session.execute(
+                insert(AnalysisJobArchive).from_select(
+                    [*ARCHIVED_COLUMNS, 'archived_at'],
+                    select(
+                        *(getattr(AnalysisJob, column) for column in ARCHIVED_COLUMNS),
+                        literal(now, AnalysisJobArchive.archived_at.type)
+                    ).where(AnalysisJob.id.in_(job_ids))
+                )
+            )
+            db.session.execute(
+                delete(AnalysisJob).where(AnalysisJob.id.in_(job_ids)),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(job_ids)
+        if len(job_ids) < batch_size:
+            break
+
+    if archived:
+        logger.info(f"Archived {archived} jobs created before {cutoff:%Y-%m-%d}")
+    return archived
+
+
+def newest_archived_at():
+    """
+    Creation time of the newest archived job (index-only lookup)
+
+    Returns:
+        datetime or None if the archive is empty
+    """
+    return db.session.scalar(select(func.max(AnalysisJobArchive.created_at)))
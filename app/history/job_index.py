@@ -0,0 +1,200 @@
+# history/job_index.py
+"""
+Job parameter index
+Input path, sample count and sample names of every job are copied from the
+parameters JSON into indexed tables, so "which jobs processed sample X"
+is answered without parsing JSON of all jobs. Archived jobs keep their
+index rows; jobs deleted through the ORM (e.g. with their user) lose them
+in the same transaction.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, insert, delete, event, inspect, tuple_
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import AnalysisJob, AnalysisJobArchive, JobInput, JobSample, User
+from app.core.utils import escape_like, encode_cursor, decode_cursor
+from app.core.db_routing import read_only
+
+logger = logging.getLogger('history')
+
+
+def _job_values(job):
+    """Input path and distinct sample names from the job parameters"""
+    params = job.parameters if isinstance(job.parameters, dict) else {}
+    samples = params.get("samples") or []
+    if not isinstance(samples, list):
+        samples = []
+    names = sorted({str(sample).strip()[:255] for sample in samples if str(sample).strip()})
+    return params.get("input_path"), names
+
+
+def index_job_parameters(jobs):
+    """
+    Write the parameter index of jobs with an id (caller commits)
+
+    Args:
+        jobs: AnalysisJob or AnalysisJobArchive instances (or rows with the same attributes)
+
+    Returns:
+        Number of indexed jobs
+    """
+    inputs = []
+    samples = []
+    for job in jobs:
+        input_path, names = _job_values(job)
+        inputs.append({
+            'job_id': job.id,
+            'job_type': job.job_type,
+            'input_path': input_path,
+            'sample_count': len(names),
+            'created_at': job.created_at
+        })
+        samples.extend({'job_id': job.id, 'sample': name} for name in names)
+
+    if inputs:
+        db.session.execute(insert(JobInput), inputs)
+    if samples:
+        db.session.execute(insert(JobSample), samples)
+    return len(inputs)
+
+
+def deleted_job_ids(session):
+    """Ids of AnalysisJob instances the session is deleting (no attribute loads)"""
+    return [
+        inspect(obj).identity[0] for obj in session.deleted
+        if isinstance(obj, AnalysisJob) and inspect(obj).identity
+    ]
+
+
+@event.listens_for(Session, 'after_flush')
+def _delete_index_of_deleted_jobs(session, flush_context):
+    job_ids = deleted_job_ids(session)
+    if not job_ids:
+        return
+    session.execute(delete(JobSample).where(JobSample.job_id.in_(job_ids)))
+    session.execute(delete(JobInput).where(JobInput.job_id.in_(job_ids)))
+    logger.debug(f"Removed parameter index of {len(job_ids)} deleted jobs")
+
+
+def backfill_job_index(batch_size=500, max_batches=20):
+    """
+    Index jobs that are not in the parameter index yet (hot and archived)
+
+    Args:
+        batch_size: Jobs per transaction
+        max_batches: Batches per call
+
+    Returns:
+        Number of indexed jobs
+    """
+    indexed = 0
+    for model in (AnalysisJob, AnalysisJobArchive):
+        for _ in range(max_batches):
+            jobs = db.session.execute(
+                select(model.id, model.job_type, model.parameters, model.created_at).where(
+                    ~select(JobInput.job_id).where(JobInput.job_id == model.id).exists()
+                ).order_by(model.id).limit(batch_size)
+            ).all()
+            if not jobs:
+                break
+
+            try:
+                indexed += index_job_parameters(jobs)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            if len(jobs) < batch_size:
+                break
+
+    if indexed:
+        logger.info(f"Indexed parameters of {indexed} jobs")
+    return indexed
+
+
+@read_only
+def search_jobs(sample=None, sample_prefix=False, input_path=None, min_samples=None, max_samples=None,
+                job_type=None, limit=50, cursor=None):
+    """
+    Find jobs by sample name, input path prefix and sample count, newest first
+
+    Args:
+        sample: Sample name
+        sample_prefix: Match sample names starting with sample
+        input_path: Input path prefix
+        min_samples: Minimum number of samples
+        max_samples: Maximum number of samples
+        job_type: Job type
+        limit: Page size
+        cursor: Cursor from the previous page
+
+    Returns:
+        Tuple of (jobs, next_cursor); jobs are dictionaries
+    """
+    query = select(JobInput)
+    if sample:
+        if sample_prefix:
+            condition = JobSample.sample.like(f"{escape_like(sample)}%", escape='\\')
+        else:
+            condition = JobSample.sample == sample
+        query = query.where(JobInput.job_id.in_(select(JobSample.job_id).where(condition)))
+    if input_path:
+        query = query.where(JobInput.input_path.like(f"{escape_like(input_path)}%", escape='\\'))
+    if min_samples is not None:
+        query = query.where(JobInput.sample_count >= min_samples)
+    if max_samples is not None:
+        query = query.where(JobInput.sample_count <= max_samples)
+    if job_type:
+        query = query.where(JobInput.job_type == job_type)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            position = (datetime.fromisoformat(values[0]), int(values[1]))
+        except (IndexError, TypeError, ValueError):
+            raise ValueError("Ungültiger Cursor")
+        query = query.where(tuple_(JobInput.created_at, JobInput.job_id) < position)
+
+    inputs = db.session.scalars(
+        query.order_by(JobInput.created_at.desc(), JobInput.job_id.desc()).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(inputs) > limit:
+        inputs = inputs[:limit]
+        next_cursor = encode_cursor(inputs[-1].created_at, inputs[-1].job_id)
+
+    # Jobs may be in the hot table or already archived
+    job_ids = [job_input.job_id for job_input in inputs]
+    jobs = {}
+    for model in (AnalysisJob, AnalysisJobArchive):
+        missing = [job_id for job_id in job_ids if job_id not in jobs]
+        if not missing:
+            break
+        for job, username in db.session.query(model, User.username).outerjoin(
+            User, User.id == model.user_id
+        ).filter(model.id.in_(missing)):
+            jobs[job.id] = (job, username)
+
+    results = []
+    for job_input in inputs:
+        if job_input.job_id not in jobs:
+            continue
+        job, username = jobs[job_input.job_id]
+        results.append({
+            'id': job.id,
+            'job_code': job.job_code,
+            'job_type': job.job_type,
+            'run_name': job.run_name or "Unbenannt",
+            'status': job.status,
+            'username': username,
+            'created_at': job.created_at.strftime('%d.%m.%Y %H:%M'),
+            'input_path': job_input.input_path,
+            'sample_count': job_input.sample_count
+        })
+    return results, next_cursor
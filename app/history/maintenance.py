@@ -0,0 +1,38 @@
+# history/maintenance.py
+"""
+Maintenance tasks of the history module
+Registered with the maintenance scheduler at application startup
+"""
+
+from flask import current_app
+
+from .archive import archive_jobs
+from .stats import refresh_job_rollups
+from .job_index import backfill_job_index
+
+
+def archive_old_jobs():
+    """Move terminal jobs past the retention window into the archive"""
+    config = current_app.config
+    return {'archived': archive_jobs(
+        config.get('JOB_ARCHIVE_RETENTION_DAYS', 180),
+        batch_size=config.get('JOB_ARCHIVE_BATCH_SIZE', 500),
+        max_batches=config.get('JOB_ARCHIVE_MAX_BATCHES', 20)
+    )}
+
+
+def register_maintenance_tasks(scheduler, config):
+    """
+    Register the history maintenance tasks
+
+    Args:
+        scheduler: MaintenanceScheduler
+        config: Application config
+    """
+    scheduler.register('archive_jobs', archive_old_jobs,
+                       config.get('MAINTENANCE_ARCHIVE_SECONDS', 3600))
+    scheduler.register('rollup_job_stats', refresh_job_rollups,
+                       config.get('MAINTENANCE_JOB_ROLLUP_SECONDS', 300))
+    # Jobs created before the parameter index existed
+    scheduler.register('index_job_parameters', backfill_job_index,
+                       config.get('MAINTENANCE_JOB_INDEX_SECONDS', 600))
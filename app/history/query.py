@@ -0,0 +1,134 @@
+# history/query.py
+"""
+History queries
+Keyset pagination on (created_at, id) with optional filters,
+across the hot job table and the archive
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import tuple_
+
+from extensions import db
+from models import AnalysisJob, AnalysisJobArchive, ReportManifest, User
+from app.core.utils import escape_like, encode_cursor, decode_cursor
+from app.core.db_routing import read_only
+from .archive import newest_archived_at
+
+logger = logging.getLogger('history')
+
+
+def parse_date(value, name):
+    """
+    Parse a YYYY-MM-DD filter value
+
+    Args:
+        value: Date string or empty
+        name: Parameter name for the error message
+
+    Returns:
+        datetime at midnight or None
+
+    Raises:
+        ValueError: If the date is malformed
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Ungültiges Datum für {name}: {value}")
+
+
+def apply_filters(query, status=None, job_type=None, user_id=None, run_name=None, date_from=None, date_to=None,
+                  model=AnalysisJob):
+    """
+    Restrict a job query by history filters
+
+    Args:
+        query: Query selecting model
+        status: Job status
+        job_type: Job type
+        user_id: Owner of the jobs
+        run_name: Substring of the run name (case-insensitive)
+        date_from: First day (inclusive)
+        date_to: Last day (inclusive)
+        model: AnalysisJob or AnalysisJobArchive
+
+    Returns:
+        Filtered query
+    """
+    if status:
+        query = query.filter(model.status == status)
+    if job_type:
+        query = query.filter(model.job_type == job_type)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    if run_name:
+        query = query.filter(model.run_name.ilike(f"%{escape_like(run_name)}%", escape='\\'))
+    if date_from:
+        query = query.filter(model.created_at >= date_from)
+    if date_to:
+        query = query.filter(model.created_at < date_to + timedelta(days=1))
+    return query
+
+
+def _fetch_rows(model, limit, position, filters):
+    """Up to limit rows of one job table after the cursor position, newest first"""
+    query = db.session.query(model, ReportManifest, User.username).outerjoin(
+        ReportManifest, ReportManifest.job_id == model.id
+    ).outerjoin(
+        User, User.id == model.user_id
+    )
+    query = apply_filters(query, model=model, **filters)
+
+    if position:
+        # Row comparison lets the (created_at, id) indexes seek directly to the page
+        query = query.filter(tuple_(model.created_at, model.id) < position)
+
+    return query.order_by(
+        model.created_at.desc(),
+        model.id.desc()
+    ).limit(limit).all()
+
+
+@read_only
+def fetch_history_page(limit=10, cursor=None, **filters):
+    """
+    Get one page of jobs, newest first
+    Archived jobs are only queried when the page reaches past the hot table
+
+    Args:
+        limit: Page size
+        cursor: Cursor from the previous page (None = first page)
+        **filters: See apply_filters
+
+    Returns:
+        Tuple of (rows, next_cursor); rows are (job, ReportManifest, username)
+        with job being an AnalysisJob or AnalysisJobArchive
+    """
+    position = None
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            position = (datetime.fromisoformat(values[0]), int(values[1]))
+        except (IndexError, TypeError, ValueError):
+            raise ValueError("Ungültiger Cursor")
+
+    rows = _fetch_rows(AnalysisJob, limit + 1, position, filters)
+
+    # Old unfinished jobs stay in the hot table, so the archive may still
+    # hold newer rows than the last hot row of a full page
+    newest_archived = newest_archived_at()
+    if newest_archived is not None and (len(rows) <= limit or rows[-1][0].created_at <= newest_archived):
+        rows.extend(_fetch_rows(AnalysisJobArchive, limit + 1, position, filters))
+        rows.sort(key=lambda row: (row[0].created_at, row[0].id), reverse=True)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_job = rows[-1][0]
+        next_cursor = encode_cursor(last_job.created_at, last_job.id)
+
+    return rows, next_cursor
@@ -0,0 +1,175 @@
+# history/reports.py
+"""
+Report manifest index
+Report files are indexed when a job reaches a terminal state and
+refreshed in the background when the reports directory changes.
+Manifests of jobs deleted through the ORM (e.g. with their user) are
+deleted in the same transaction; archived jobs keep theirs.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, event
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import AnalysisJob, ReportManifest
+from app.core.utils import is_valid_report_file, JOB_TERMINAL_STATUSES
+from .job_index import deleted_job_ids
+
+logger = logging.getLogger('history')
+
+# job_id -> time of last mtime check
+_last_checked = {}
+_checked_lock = threading.Lock()
+
+
+def scan_reports(input_path):
+    """
+    List report files of a job input folder
+
+    Args:
+        input_path: Job input path
+
+    Returns:
+        Tuple of (reports_path, dir_mtime, reports_list); mtime is None if missing
+    """
+    reports_path = os.path.join(input_path, "reports")
+    reports = []
+
+    try:
+        dir_mtime = os.stat(reports_path).st_mtime
+        with os.scandir(reports_path) as entries:
+            for entry in entries:
+                if entry.is_file() and is_valid_report_file(entry.name):
+                    reports.append({'name': entry.name, 'path': entry.path})
+    except FileNotFoundError:
+        return reports_path, None, []
+    except (OSError, PermissionError) as e:
+        logger.error(f"Error reading reports in {reports_path}: {e}")
+        return reports_path, None, []
+
+    reports.sort(key=lambda x: x['name'].lower())
+    return reports_path, dir_mtime, reports
+
+
+def index_job_reports(job):
+    """
+    Write the report manifest of a job into the session (caller commits)
+
+    Args:
+        job: AnalysisJob instance
+
+    Returns:
+        ReportManifest instance or None if the job has no input path
+    """
+    params = job.parameters if job.parameters else {}
+    input_path = params.get("input_path") if isinstance(params, dict) else None
+    if not input_path:
+        return None
+
+    reports_path, dir_mtime, reports = scan_reports(input_path)
+
+    manifest = db.session.get(ReportManifest, job.id) or ReportManifest(job_id=job.id)
+    manifest.reports_path = reports_path
+    manifest.dir_mtime = dir_mtime
+    manifest.reports = reports
+    manifest.indexed_at = datetime.now(timezone.utc)
+    db.session.add(manifest)
+
+    with _checked_lock:
+        _last_checked[job.id] = time.monotonic()
+
+    logger.debug(f"Indexed {len(reports)} reports for job {job.job_code}")
+    return manifest
+
+
+@event.listens_for(Session, 'after_flush')
+def _delete_manifests_of_deleted_jobs(session, flush_context):
+    job_ids = deleted_job_ids(session)
+    if not job_ids:
+        return
+    session.execute(delete(ReportManifest).where(ReportManifest.job_id.in_(job_ids)))
+    with _checked_lock:
+        for job_id in job_ids:
+            _last_checked.pop(job_id, None)
+    logger.debug(f"Removed report manifests of {len(job_ids)} deleted jobs")
+
+
+def _due_for_check(job_ids, recheck_seconds):
+    """Filter job ids whose manifest was not checked recently"""
+    now = time.monotonic()
+    with _checked_lock:
+        due = [job_id for job_id in job_ids if now - _last_checked.get(job_id, 0) > recheck_seconds]
+        for job_id in due:
+            _last_checked[job_id] = now
+    return due
+
+
+def refresh_manifests(job_ids):
+    """
+    Re-index manifests whose reports directory changed since indexing
+    Requires an application context
+
+    Args:
+        job_ids: Ids of terminal jobs to check
+
+    Returns:
+        Number of refreshed manifests
+    """
+    if not job_ids:
+        return 0
+
+    refreshed = 0
+    try:
+        rows = db.session.query(AnalysisJob, ReportManifest).outerjoin(
+            ReportManifest, ReportManifest.job_id == AnalysisJob.id
+        ).filter(
+            AnalysisJob.id.in_(job_ids),
+            AnalysisJob.status.in_(JOB_TERMINAL_STATUSES)
+        ).all()
+
+        for job, manifest in rows:
+            if manifest is not None and manifest.reports_path:
+                try:
+                    dir_mtime = os.stat(manifest.reports_path).st_mtime
+                except OSError:
+                    dir_mtime = None
+                if dir_mtime == manifest.dir_mtime:
+                    continue
+
+            if index_job_reports(job) is not None:
+                refreshed += 1
+
+        if refreshed:
+            db.session.commit()
+            logger.info(f"Refreshed {refreshed} report manifests")
+    except Exception as e:
+        logger.error(f"Error refreshing report manifests: {e}")
+        db.session.rollback()
+
+    return refreshed
+
+
+def refresh_manifests_async(app, job_ids, recheck_seconds=60):
+    """
+    Check manifests for changed report directories in a background thread
+
+    Args:
+        app: Flask application (for the app context)
+        job_ids: Ids of terminal jobs to check
+        recheck_seconds: Minimum time between checks of the same job
+    """
+    due = _due_for_check(job_ids, recheck_seconds)
+    if not due:
+        return
+
+    def worker():
+        with app.app_context():
+            refresh_manifests(due)
+
+    threading.Thread(target=worker, name='report-manifest-refresh', daemon=True).start()
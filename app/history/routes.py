@@ -3,15 +3,20 @@
 Routes for history
 """
 
-import os
-import json
 import logging
-from flask import Blueprint, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required
+from werkzeug.exceptions import BadRequest
 
-from extensions import db
-from models import AnalysisJob
-from app.core.utils import SUPPORTED_REPORT_EXTENSIONS
+from models import User
+from app.core.utils import ANALYSIS_BASE_PATHS, JOB_STATUSES, JOB_TERMINAL_STATUSES
+from app.core.db_routing import read_only
+from app.core.auth import require_admin
+from .reports import refresh_manifests_async
+from .query import fetch_history_page, parse_date
+from .stats import get_job_stats, GROUP_BY
+from .job_index import search_jobs
 
 logger = logging.getLogger('history')
 
@@ -20,39 +25,63 @@ history_bp = Blueprint('history', __name__)
 
 @history_bp.route('/api/analysis_history')
 @login_required
+@read_only
 def api_analysis_history():
-    """API endpoint for analysis history with optimized queries"""
+    """
+    API endpoint for analysis history, newest first
+    
+    Query parameters: limit, cursor (from next_cursor of the previous page),
+    status, job_type, user (username), run_name (substring),
+    date_from and date_to (YYYY-MM-DD, inclusive)
+    """
+    config = current_app.config
+    
     try:
-        # Use eager loading to reduce DB queries
-        jobs = db.session.query(AnalysisJob).order_by(
-            AnalysisJob.created_at.desc()
-        ).limit(10).all()
+        limit = request.args.get('limit', config.get('HISTORY_PAGE_SIZE', 10), type=int)
+        limit = max(1, min(limit, config.get('HISTORY_MAX_PAGE_SIZE', 100)))
+        
+        status = request.args.get('status', '').strip() or None
+        if status and status not in JOB_STATUSES:
+            raise ValueError(f"Ungültiger Status: {status}")
+        
+        job_type = request.args.get('job_type', '').strip() or None
+        if job_type and job_type not in ANALYSIS_BASE_PATHS:
+            raise ValueError(f"Ungültiger Analyse-Typ: {job_type}")
+        
+        user_id = None
+        username = request.args.get('user', '').strip()
+        if username:
+            user = User.query.filter_by(username=username).first()
+            if user is None:
+                return jsonify({'jobs': [], 'next_cursor': None})
+            user_id = user.id
+        
+        filters = {
+            'status': status,
+            'job_type': job_type,
+            'user_id': user_id,
+            'run_name': request.args.get('run_name', '').strip() or None,
+            'date_from': parse_date(request.args.get('date_from', '').strip(), 'date_from'),
+            'date_to': parse_date(request.args.get('date_to', '').strip(), 'date_to')
+        }
+        cursor = request.args.get('cursor', '').strip() or None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # Jobs and their report manifests in one query - no filesystem access here
+        rows, next_cursor = fetch_history_page(limit, cursor, **filters)
         
         jobs_data = []
+        terminal_job_ids = []
         
-        for job in jobs:
-            try:
-                params = job.parameters if job.parameters else {}
-                input_path = params.get("input_path", "")
-            except (json.JSONDecodeError, TypeError) as e:
-                input_path = ""
-                logger.warning(f"Failed to parse parameters for job {job.id}: {e}")
-            
-            # Find reports efficiently - only for completed jobs
+        for job, manifest, owner in rows:
+            # Reports only for completed jobs
             reports = []
-            if input_path and job.status in ['finished', 'failed']:
-                reports_path = os.path.join(input_path, "reports")
-                if os.path.exists(reports_path) and os.path.isdir(reports_path):
-                    try:
-                        for file in os.listdir(reports_path):
-                            if any(file.lower().endswith(ext) for ext in SUPPORTED_REPORT_EXTENSIONS):
-                                reports.append({
-                                    'name': file,
-                                    'path': os.path.join(reports_path, file)
-                                })
-                        logger.debug(f"Found {len(reports)} reports for job {job.job_code}")
-                    except (OSError, PermissionError) as e:
-                        logger.error(f"Error reading reports for job {job.id}: {e}")
+            if job.status in JOB_TERMINAL_STATUSES:
+                terminal_job_ids.append(job.id)
+                if manifest and manifest.reports:
+                    reports = manifest.reports
             
             # Format job data
             job_data = {
@@ -61,13 +90,120 @@ def api_analysis_history():
                 'job_type': job.job_type,
                 'run_name': job.run_name or "Unbenannt",
                 'status': job.status,
+                'username': owner,
                 'created_at': job.created_at.strftime('%d.%m.%Y %H:%M'),
-                'reports': sorted(reports, key=lambda x: x['name'].lower()) if reports else []
+                'reports': reports
             }
             jobs_data.append(job_data)
         
-        return jsonify({'jobs': jobs_data})
+        # Pick up reports written after indexing, off the request path
+        refresh_manifests_async(
+            current_app._get_current_object(),
+            terminal_job_ids,
+            recheck_seconds=current_app.config.get('REPORT_MANIFEST_RECHECK_SECONDS', 60)
+        )
         
+        return jsonify({'jobs': jobs_data, 'next_cursor': next_cursor})
+        
+    except (ValueError, BadRequest) as e:
+        return jsonify({'error': getattr(e, 'description', None) or str(e)}), 400
     except Exception as e:
         logger.error(f"Error in api_analysis_history: {e}")
-        return jsonify({'error': 'Fehler beim Laden der Historie'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Fehler beim Laden der Historie'}), 500
+
+
+@history_bp.route('/api/job_stats')
+@login_required
+@require_admin
+@read_only
+def api_job_stats():
+    """
+    API endpoint for job statistics (throughput, durations, failure rates)
+    Served from the daily rollups refreshed by the maintenance scheduler
+    
+    Query parameters: date_from and date_to (YYYY-MM-DD, inclusive, default
+    the last JOB_STATS_DEFAULT_DAYS days), group_by (day, week, month, total),
+    job_type
+    """
+    config = current_app.config
+    
+    try:
+        date_to = parse_date(request.args.get('date_to', '').strip(), 'date_to') or datetime.now()
+        date_from = parse_date(request.args.get('date_from', '').strip(), 'date_from') or (
+            date_to - timedelta(days=config.get('JOB_STATS_DEFAULT_DAYS', 84) - 1)
+        )
+        if date_from > date_to:
+            raise ValueError("date_from liegt nach date_to")
+        if (date_to - date_from).days >= config.get('JOB_STATS_MAX_DAYS', 1100):
+            raise ValueError(f"Zeitraum ist auf {config.get('JOB_STATS_MAX_DAYS', 1100)} Tage begrenzt")
+        
+        group_by = request.args.get('group_by', 'week').strip()
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Ungültige Gruppierung: {group_by}")
+        
+        job_type = request.args.get('job_type', '').strip() or None
+        if job_type and job_type not in ANALYSIS_BASE_PATHS:
+            raise ValueError(f"Ungültiger Analyse-Typ: {job_type}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        return jsonify(get_job_stats(date_from.date(), date_to.date(), group_by, job_type))
+    except Exception as e:
+        logger.error(f"Error in api_job_stats: {e}")
+        return jsonify({'error': 'Fehler beim Laden der Statistik'}), 500
+
+
+@history_bp.route('/api/job_search')
+@login_required
+@read_only
+def api_job_search():
+    """
+    API endpoint to find jobs by their parameters, newest first
+    
+    Query parameters: sample (sample name), sample_prefix (true = names
+    starting with sample), input_path (path prefix), min_samples,
+    max_samples, job_type, limit, cursor
+    """
+    config = current_app.config
+    
+    try:
+        limit = request.args.get('limit', config.get('JOB_SEARCH_PAGE_SIZE', 50), type=int)
+        limit = max(1, min(limit, config.get('JOB_SEARCH_MAX_PAGE_SIZE', 200)))
+        
+        sample = request.args.get('sample', '').strip() or None
+        input_path = request.args.get('input_path', '').strip() or None
+        try:
+            min_samples, max_samples = (
+                int(value) if value else None
+                for value in (request.args.get('min_samples', '').strip(), request.args.get('max_samples', '').strip())
+            )
+        except ValueError:
+            raise ValueError("Ungültige Probenanzahl")
+        
+        if not (sample or input_path or min_samples is not None or max_samples is not None):
+            raise ValueError("Mindestens ein Suchkriterium erforderlich (sample, input_path, min_samples, max_samples)")
+        
+        job_type = request.args.get('job_type', '').strip() or None
+        if job_type and job_type not in ANALYSIS_BASE_PATHS:
+            raise ValueError(f"Ungültiger Analyse-Typ: {job_type}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        jobs, next_cursor = search_jobs(
+            sample=sample,
+            sample_prefix=request.args.get('sample_prefix', 'false').lower() == 'true',
+            input_path=input_path,
+            min_samples=min_samples,
+            max_samples=max_samples,
+            job_type=job_type,
+            limit=limit,
+            cursor=request.args.get('cursor', '').strip() or None
+        )
+        return jsonify({'jobs': jobs, 'next_cursor': next_cursor})
+    except (ValueError, BadRequest) as e:
+        return jsonify({'error': getattr(e, 'description', None) or str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in api_job_search: {e}")
+        return jsonify({'error': 'Fehler bei der Jobsuche'}), 500
@@ -0,0 +1,319 @@
+# history/stats.py
+"""
+Job statistics
+Daily rollups per job type and status with duration histograms, refreshed
+incrementally by the maintenance scheduler. The stats API only reads the
+rollups, so its cost depends on the date range, not on the job history.
+Days of jobs deleted through the ORM (e.g. with their user) are recomputed
+in the deleting transaction.
+"""
+
+import bisect
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, delete, event, func, or_, and_
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import AnalysisJob, AnalysisJobArchive, JobStatsDaily
+from app.core.utils import ANALYSIS_HOSTS, JOB_TERMINAL_STATUSES
+from app.core.db_routing import read_only
+
+logger = logging.getLogger('history')
+
+# Upper bounds of the duration histogram buckets in seconds (30 s doubling up to ~34 h);
+# one more bucket counts longer durations
+DURATION_BUCKETS = tuple(30 * 2 ** i for i in range(13))
+
+GROUP_BY = ('day', 'week', 'month', 'total')
+
+
+class _Rollup:
+    """Aggregate of one (day, job type, status)"""
+
+    def __init__(self):
+        self.job_count = 0
+        self.duration_count = 0
+        self.duration_sum = 0.0
+        self.duration_max = None
+        self.duration_buckets = [0] * (len(DURATION_BUCKETS) + 1)
+
+    def add_job(self, status, created_at, updated_at):
+        self.job_count += 1
+        if status not in JOB_TERMINAL_STATUSES or not created_at or not updated_at:
+            return
+        duration = max(0.0, (updated_at - created_at).total_seconds())
+        self.duration_count += 1
+        self.duration_sum += duration
+        self.duration_max = duration if self.duration_max is None else max(self.duration_max, duration)
+        self.duration_buckets[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+
+    def merge(self, row):
+        """Add a JobStatsDaily row or another _Rollup"""
+        self.job_count += row.job_count
+        self.duration_count += row.duration_count
+        self.duration_sum += row.duration_sum
+        if row.duration_max is not None:
+            self.duration_max = row.duration_max if self.duration_max is None else max(self.duration_max, row.duration_max)
+        for index, count in enumerate(row.duration_buckets or []):
+            self.duration_buckets[index] += count
+
+
+def _aggregate(rows, rollups):
+    for created_at, updated_at, job_type, status in rows:
+        key = (created_at.date(), job_type, status)
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = _Rollup()
+        rollup.add_job(status, created_at, updated_at)
+
+
+def _job_rows(session, condition=None):
+    """(created_at, updated_at, job_type, status) of hot and archived jobs"""
+    for model in (AnalysisJob, AnalysisJobArchive):
+        query = select(model.created_at, model.updated_at, model.job_type, model.status).where(
+            model.created_at.isnot(None)
+        )
+        if condition is not None:
+            query = query.where(condition(model))
+        yield from session.execute(query.execution_options(yield_per=1000))
+
+
+def _write_rollups(session, days, refreshed_at):
+    """
+    Recompute and replace the rollups of days (caller commits)
+
+    Args:
+        session: Session to read and write with
+        days: Set of dates, None for all days
+        refreshed_at: refreshed_at of the written rows
+
+    Returns:
+        Tuple of (recomputed days, written rows)
+    """
+    rollups = {}
+    if days is None:
+        _aggregate(_job_rows(session), rollups)
+    else:
+        day_ranges = [
+            (datetime.combine(day, datetime.min.time()), datetime.combine(day + timedelta(days=1), datetime.min.time()))
+            for day in sorted(days)
+        ]
+        _aggregate(_job_rows(session, lambda model: or_(*(
+            and_(model.created_at >= start, model.created_at < end) for start, end in day_ranges
+        ))), rollups)
+
+    if days is None:
+        session.execute(delete(JobStatsDaily))
+    else:
+        session.execute(delete(JobStatsDaily).where(JobStatsDaily.day.in_(days)))
+    if rollups:
+        session.execute(insert(JobStatsDaily), [
+            {
+                'day': day,
+                'job_type': job_type,
+                'status': status,
+                'job_count': rollup.job_count,
+                'duration_count': rollup.duration_count,
+                'duration_sum': rollup.duration_sum,
+                'duration_max': rollup.duration_max,
+                'duration_buckets': rollup.duration_buckets,
+                'refreshed_at': refreshed_at
+            }
+            for (day, job_type, status), rollup in rollups.items()
+        ])
+
+    recomputed = len({key[0] for key in rollups}) if days is None else len(days)
+    return recomputed, len(rollups)
+
+
+def refresh_job_rollups(overlap_seconds=300):
+    """
+    Recompute the rollups of all days with jobs changed since the last refresh
+    A full rebuild is done when no rollups exist yet
+
+    Args:
+        overlap_seconds: Re-check jobs changed shortly before the last refresh
+                         (transactions committed after it was taken)
+
+    Returns:
+        Dict with the number of recomputed days and written rows
+    """
+    started = datetime.now(timezone.utc)
+    watermark = db.session.scalar(select(func.max(JobStatsDaily.refreshed_at)))
+
+    if watermark is None:
+        days = None
+    else:
+        since = watermark - timedelta(seconds=overlap_seconds)
+        days = {
+            created_at.date() for created_at in db.session.scalars(
+                select(AnalysisJob.created_at).where(
+                    AnalysisJob.updated_at >= since,
+                    AnalysisJob.created_at.isnot(None)
+                )
+            )
+        }
+        if not days:
+            return {'days': 0, 'rows': 0}
+
+    try:
+        recomputed, rows = _write_rollups(db.session, days, started)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Job statistics refreshed: {recomputed} days, {rows} rows")
+    return {'days': recomputed, 'rows': rows}
+
+
+_DELETED_DAYS_KEY = 'deleted_job_days'
+
+
+@event.listens_for(Session, 'before_flush')
+def _remember_days_of_deleted_jobs(session, flush_context, instances):
+    days = {
+        obj.created_at.date() for obj in session.deleted
+        if isinstance(obj, AnalysisJob) and obj.created_at is not None
+    }
+    if days:
+        session.info.setdefault(_DELETED_DAYS_KEY, set()).update(days)
+
+
+@event.listens_for(Session, 'after_flush')
+def _recompute_days_of_deleted_jobs(session, flush_context):
+    days = session.info.pop(_DELETED_DAYS_KEY, None)
+    if not days:
+        return
+    # Without rollups the next refresh rebuilds everything; keeping the watermark
+    # makes sure it still picks up jobs changed since then
+    watermark = session.scalar(select(func.max(JobStatsDaily.refreshed_at)))
+    if watermark is None:
+        return
+    recomputed, rows = _write_rollups(session, days, watermark)
+    logger.debug(f"Job statistics of {recomputed} days recomputed after deleting jobs")
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_deleted_days(session, previous_transaction):
+    session.info.pop(_DELETED_DAYS_KEY, None)
+
+
+def duration_percentile(buckets, fraction):
+    """
+    Estimate a duration percentile from histogram bucket counts
+    (linear interpolation inside the bucket)
+
+    Args:
+        buckets: Counts per DURATION_BUCKETS bound plus overflow
+        fraction: Percentile as fraction (0.5 = median)
+
+    Returns:
+        Duration in seconds or None without durations
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            lower = DURATION_BUCKETS[index - 1] if index > 0 else 0
+            upper = DURATION_BUCKETS[index] if index < len(DURATION_BUCKETS) else DURATION_BUCKETS[-1] * 2
+            return round(lower + (upper - lower) * max(0.0, rank - seen) / count, 1)
+        seen += count
+    return float(DURATION_BUCKETS[-1])
+
+
+def _period(day, group_by):
+    if group_by == 'day':
+        return day.isoformat()
+    if group_by == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if group_by == 'month':
+        return day.strftime('%Y-%m')
+    return 'total'
+
+
+def _export(rollups_by_status):
+    """Counts, failure rate and duration summary of grouped rollups"""
+    counts = {status: rollup.job_count for status, rollup in rollups_by_status.items()}
+    durations = _Rollup()
+    for status in JOB_TERMINAL_STATUSES:
+        if status in rollups_by_status:
+            durations.merge(rollups_by_status[status])
+
+    terminal = sum(counts.get(status, 0) for status in JOB_TERMINAL_STATUSES)
+
+    def percentile(fraction):
+        # Interpolated bucket estimates never exceed the observed maximum
+        value = duration_percentile(durations.duration_buckets, fraction)
+        return min(value, durations.duration_max) if value is not None else None
+
+    return {
+        'total': sum(counts.values()),
+        'by_status': counts,
+        'failure_rate': round(counts.get('failed', 0) / terminal, 4) if terminal else None,
+        'duration': {
+            'count': durations.duration_count,
+            'mean': round(durations.duration_sum / durations.duration_count, 1) if durations.duration_count else None,
+            'p50': percentile(0.5),
+            'p90': percentile(0.9),
+            'p95': percentile(0.95),
+            'max': durations.duration_max
+        }
+    }
+
+
+@read_only
+def get_job_stats(date_from, date_to, group_by='week', job_type=None):
+    """
+    Job statistics from the daily rollups
+
+    Args:
+        date_from: First day (date, inclusive)
+        date_to: Last day (date, inclusive)
+        group_by: day, week, month or total
+        job_type: Restrict to one job type
+
+    Returns:
+        Dict with periods (per period and job type) and hosts (per compute host)
+    """
+    query = db.session.query(JobStatsDaily).filter(
+        JobStatsDaily.day >= date_from,
+        JobStatsDaily.day <= date_to
+    )
+    if job_type:
+        query = query.filter(JobStatsDaily.job_type == job_type)
+
+    periods = {}
+    hosts = {}
+    for row in query.order_by(JobStatsDaily.day):
+        host = ANALYSIS_HOSTS.get(row.job_type, 'unknown')
+        period_key = (_period(row.day, group_by), row.job_type)
+        periods.setdefault(period_key, {}).setdefault(row.status, _Rollup()).merge(row)
+        hosts.setdefault(host, {}).setdefault(row.status, _Rollup()).merge(row)
+
+    return {
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'group_by': group_by,
+        'periods': [
+            {'period': period, 'job_type': job_type, 'host': ANALYSIS_HOSTS.get(job_type, 'unknown'), **_export(by_status)}
+            for (period, job_type), by_status in periods.items()
+        ],
+        'hosts': [
+            {'host': host, **_export(by_status)}
+            for host, by_status in sorted(hosts.items())
+        ],
+        'refreshed_at': _refreshed_at()
+    }
+
+
+def _refreshed_at():
+    refreshed_at = db.session.scalar(select(func.max(JobStatsDaily.refreshed_at)))
+    return refreshed_at.isoformat() if refreshed_at else None
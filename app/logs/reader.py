@@ -0,0 +1,187 @@
+# logs/reader.py
+"""
+Log tail reader
+Reads the newest lines of a log by seeking backwards from the end in
+blocks, so the cost depends on the number of returned lines, not on the
+file size. Cursors point at (inode, offset) and continue into the rotated
+backups (.1 - .10); renaming during rotation keeps the inode, so a cursor
+stays valid until its file is deleted.
+"""
+
+import os
+import logging
+
+from flask import current_app
+
+from app.core.utils import encode_cursor, decode_cursor
+
+logger = logging.getLogger('logs')
+
+LOG_FILES = {
+    'analysis': 'analysis.log',
+    'auth': 'auth.log',
+    'ssh': 'ssh_wrapper.log',
+    'app': 'app.log',
+    'core': 'core.log',
+    'history': 'history.log',
+    'users': 'users.log',
+    'logs': 'logs.log'
+}
+
+# RotatingFileHandler backupCount in setup_logging
+MAX_BACKUPS = 10
+
+BLOCK_SIZE = 64 * 1024
+
+
+class LogCursorExpired(ValueError):
+    """The file of a cursor was rotated away"""
+
+
+def log_dir():
+    """Directory of the log files (set by setup_logging)"""
+    return current_app.config.get('LOG_DIR', '/var/log/ngs_webinterface')
+
+
+def log_chain(log_type):
+    """
+    Existing files of a log, newest first
+
+    Args:
+        log_type: Key of LOG_FILES
+
+    Returns:
+        List of (path, os.stat_result)
+    """
+    base = os.path.join(log_dir(), LOG_FILES[log_type])
+    chain = []
+    for path in [base] + [f"{base}.{index}" for index in range(1, MAX_BACKUPS + 1)]:
+        try:
+            chain.append((path, os.stat(path)))
+        except FileNotFoundError:
+            continue
+    return chain
+
+
+def _tail_block(f, end, max_lines, max_bytes, block_size=BLOCK_SIZE):
+    """
+    Read up to max_lines complete lines ending at offset end
+
+    Args:
+        f: File opened in binary mode
+        end: Offset after the last byte to return
+        max_lines: Maximum number of lines
+        max_bytes: Maximum number of bytes to read
+
+    Returns:
+        Tuple of (start offset, lines); start is 0 when the file start was reached
+    """
+    position = end
+    chunks = []
+    line_starts = 0  # newlines before end - 1, each one starts a line
+    while position > 0 and end - position < max_bytes and line_starts < max_lines:
+        size = min(block_size, position, max_bytes - (end - position))
+        position -= size
+        f.seek(position)
+        block = f.read(size)
+        chunks.append(block)
+        line_starts += block.count(b'\n', 0, size - 1 if position + size == end else size)
+
+    data = b''.join(reversed(chunks))
+    if not data:
+        return position, []
+
+    lines = data.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()
+    # Without reaching the file start the first piece is the tail of an older line
+    if position > 0 and len(lines) > 1:
+        skipped = lines.pop(0)
+        position += len(skipped) + 1
+    if len(lines) > max_lines:
+        for line in lines[:len(lines) - max_lines]:
+            position += len(line) + 1
+        lines = lines[len(lines) - max_lines:]
+
+    return position, [line.decode('utf-8', errors='replace') for line in lines]
+
+
+def _find_inode(chain, inode):
+    for index, (path, stat) in enumerate(chain):
+        if stat.st_ino == inode:
+            return index
+    return None
+
+
+def read_log_page(log_type, lines=1000, cursor=None, max_bytes=4 * 1024 * 1024):
+    """
+    Read lines of a log backwards from the end or from a cursor
+
+    Args:
+        log_type: Key of LOG_FILES
+        lines: Maximum number of lines
+        cursor: next_cursor of the previous page (None = newest lines)
+        max_bytes: Maximum number of bytes to read
+
+    Returns:
+        Dict with content (oldest line first), lines, files and next_cursor
+        (None when the oldest backup was read completely)
+
+    Raises:
+        LogCursorExpired: If the cursor's file no longer exists
+        BadRequest: If the cursor is malformed
+    """
+    chain = log_chain(log_type)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            inode, offset = int(values[0]), int(values[1])
+        except (IndexError, TypeError, ValueError):
+            raise ValueError("Ungültiger Cursor")
+        index = _find_inode(chain, inode)
+        if index is None:
+            raise LogCursorExpired("Log-Position nicht mehr verfügbar (Datei wurde rotiert)")
+    else:
+        index = 0
+        offset = chain[0][1].st_size if chain else 0
+
+    collected = []
+    files = []
+    next_cursor = None
+    budget = max_bytes
+
+    while index < len(chain) and len(collected) < lines and budget > 0:
+        path, stat = chain[index]
+        with open(path, 'rb') as f:
+            # Rotation between listing and opening moves files to the next suffix
+            if os.fstat(f.fileno()).st_ino != stat.st_ino:
+                chain = log_chain(log_type)
+                index = _find_inode(chain, stat.st_ino)
+                if index is None:
+                    raise LogCursorExpired("Log-Position nicht mehr verfügbar (Datei wurde rotiert)")
+                continue
+            end = min(offset, os.fstat(f.fileno()).st_size)
+            start, page = _tail_block(f, end, lines - len(collected), budget)
+
+        budget -= end - start
+        collected[:0] = page
+        files.append(os.path.basename(path))
+
+        if start > 0:
+            next_cursor = encode_cursor(stat.st_ino, start)
+            break
+
+        index += 1
+        if index < len(chain):
+            offset = chain[index][1].st_size
+            next_cursor = encode_cursor(chain[index][1].st_ino, offset)
+        else:
+            next_cursor = None
+
+    return {
+        'content': '\n'.join(collected) + ('\n' if collected else ''),
+        'lines': len(collected),
+        'files': files,
+        'next_cursor': next_cursor
+    }
@@ -3,62 +3,125 @@
 Routes for log file management
 """
 
-import os
+import re
+import json
 import logging
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 from flask_login import login_required, current_user
+from werkzeug.exceptions import BadRequest
+
+from app.core.auth import require_admin
+from .reader import LOG_FILES, LogCursorExpired, log_chain, read_log_page
+from .search import LEVELS, parse_log_time, search_logs
 
 logger = logging.getLogger('logs')
 
 logs_bp = Blueprint('logs', __name__)
 
 
-def require_admin(func):
-    """Decorator to require admin role"""
-    def wrapper(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
-            logger.warning(f"Non-admin user {current_user.username if current_user.is_authenticated else 'anonymous'} attempted admin action")
-            return jsonify({'error': 'Keine Berechtigung'}), 403
-        return func(*args, **kwargs)
-    wrapper.__name__ = func.__name__
-    return wrapper
+@logs_bp.route('/api/logs/search')
+@login_required
+@require_admin
+def api_search_logs():
+    """
+    API endpoint to search the logs, including rotated files
+    
+    Query parameters: logs (comma-separated log types, default all),
+    q (regular expression), level (minimum level), module,
+    date_from and date_to (YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS]), limit
+    
+    Streams NDJSON: one object per matching entry (oldest first per log),
+    then a summary object with done=true
+    """
+    config = current_app.config
+    
+    try:
+        log_types = [name.strip() for name in request.args.get('logs', '').split(',') if name.strip()] or None
+        for log_type in log_types or []:
+            if log_type not in LOG_FILES:
+                raise ValueError(f"Ungültiger Log-Typ: {log_type}")
+        
+        pattern = None
+        query = request.args.get('q', '')
+        if query:
+            if len(query) > config.get('LOG_SEARCH_MAX_PATTERN', 500):
+                raise ValueError("Suchmuster zu lang")
+            try:
+                pattern = re.compile(query, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Ungültiger regulärer Ausdruck: {e}")
+        
+        min_level = request.args.get('level', '').strip().upper() or None
+        if min_level and min_level not in LEVELS:
+            raise ValueError(f"Ungültiges Level: {min_level}")
+        
+        limit = request.args.get('limit', config.get('LOG_SEARCH_DEFAULT_RESULTS', 1000), type=int)
+        limit = max(1, min(limit, config.get('LOG_SEARCH_MAX_RESULTS', 10000)))
+        
+        filters = {
+            'log_types': log_types,
+            'pattern': pattern,
+            'min_level': min_level,
+            'module': request.args.get('module', '').strip() or None,
+            'time_from': parse_log_time(request.args.get('date_from', '').strip(), 'date_from'),
+            'time_to': parse_log_time(request.args.get('date_to', '').strip(), 'date_to', end_of_day=True),
+            'limit': limit
+        }
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    logger.info(f"Admin {current_user.username} searched logs ({request.query_string.decode(errors='replace')})")
+    
+    def generate():
+        try:
+            for result in search_logs(**filters):
+                yield json.dumps(result) + '\n'
+        except Exception as e:
+            logger.error(f"Error searching logs: {e}")
+            yield json.dumps({'done': True, 'error': 'Fehler bei der Log-Suche'}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 
 @logs_bp.route('/api/logs/<log_type>')
 @login_required
 @require_admin
 def api_logs(log_type):
-    """API endpoint to fetch log files with proper authorization"""
-    log_files = {
-        'analysis': 'analysis.log',
-        'auth': 'auth.log',
-        'ssh': 'ssh_wrapper.log',
-        'app': 'app.log',
-        'core': 'core.log',
-        'history': 'history.log',
-        'users': 'users.log',
-        'logs': 'logs.log'
-    }
-
-    if log_type not in log_files:
+    """
+    API endpoint to fetch log files with proper authorization
+    
+    Returns the newest lines; older lines (also from the rotated backups)
+    are paged with cursor (from next_cursor of the previous page).
+    Query parameters: lines, cursor
+    """
+    if log_type not in LOG_FILES:
         logger.warning(f"Invalid log type requested: {log_type}")
         return jsonify({'error': 'Ungültiger Log-Typ'}), 400
 
+    config = current_app.config
+
     try:
-        log_path = os.path.join('/var/log/ngs_webinterface', log_files[log_type])
-        
-        if not os.path.exists(log_path):
-            logger.warning(f"Log file not found: {log_path}")
-            return jsonify({'content': f'Log-Datei {log_type} nicht gefunden'})
+        if not log_chain(log_type):
+            logger.warning(f"Log file not found: {LOG_FILES[log_type]}")
+            return jsonify({'content': f'Log-Datei {log_type} nicht gefunden', 'next_cursor': None})
+
+        lines = request.args.get('lines', config.get('LOG_TAIL_LINES', 1000), type=int)
+        lines = max(1, min(lines, config.get('LOG_TAIL_MAX_LINES', 5000)))
 
-        # Read last 1000 lines
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            content = ''.join(lines[-1000:])
+        result = read_log_page(
+            log_type,
+            lines=lines,
+            cursor=request.args.get('cursor', '').strip() or None,
+            max_bytes=config.get('LOG_TAIL_MAX_BYTES', 4 * 1024 * 1024)
+        )
 
         logger.info(f"Admin {current_user.username} accessed {log_type} log")
-        return jsonify({'content': content})
+        return jsonify(result)
 
+    except LogCursorExpired as e:
+        return jsonify({'error': str(e)}), 410
+    except (ValueError, BadRequest) as e:
+        return jsonify({'error': getattr(e, 'description', None) or str(e)}), 400
     except (OSError, PermissionError) as e:
         logger.error(f"Error reading log file {log_type}: {e}")
         return jsonify({'error': 'Fehler beim Lesen der Log-Datei'}), 500
@@ -0,0 +1,266 @@
+# logs/search.py
+"""
+Log search
+Every log file gets a sparse index of byte offsets with the time range of
+the entries behind them (one block per ~64 KB), kept per process and
+extended incrementally as the file grows. Rotated files keep their inode
+and therefore their index. Time-bounded searches read only the blocks
+that can contain matching entries.
+"""
+
+import os
+import re
+import logging
+import threading
+from datetime import datetime
+
+from .reader import LOG_FILES, log_chain
+
+logger = logging.getLogger('logs')
+
+# Bytes per index block
+INDEX_INTERVAL = 64 * 1024
+
+# '[%(asctime)s] %(levelname)s in %(module)s: %(message)s' from setup_logging
+_ENTRY_RE = re.compile(rb'^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (\w+) in ([^:\s]+): ?')
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+def _entry_time(line):
+    """Timestamp (as bytes, sortable) of an entry's first line, None for continuation lines"""
+    if not line.startswith(b'['):
+        return None
+    match = _ENTRY_RE.match(line)
+    return match.group(1) if match else None
+
+
+class _FileIndex:
+    """Sparse index of one file: blocks of [offset, min time, max time]"""
+
+    def __init__(self, inode):
+        self.inode = inode
+        self.indexed_upto = 0
+        self.blocks = []
+
+    def update(self, f, size):
+        """Index complete lines added since the last update"""
+        if size == self.indexed_upto:
+            return
+        f.seek(self.indexed_upto)
+        offset = self.indexed_upto
+        for line in f:
+            # Lines written after stat() or still being written are indexed with the next update
+            if offset + len(line) > size or not line.endswith(b'\n'):
+                break
+            timestamp = _entry_time(line)
+            if timestamp is not None:
+                # Blocks start at entries, so every block offset is a valid seek target
+                if not self.blocks or offset - self.blocks[-1][0] >= INDEX_INTERVAL:
+                    self.blocks.append([offset, timestamp, timestamp])
+                else:
+                    block = self.blocks[-1]
+                    if timestamp < block[1]:
+                        block[1] = timestamp
+                    if timestamp > block[2]:
+                        block[2] = timestamp
+            offset += len(line)
+        self.indexed_upto = offset
+
+    def byte_range(self, time_from=None, time_to=None):
+        """
+        Offsets that contain all entries in the time range
+
+        Returns:
+            Tuple of (start, end) or None when no entry can match
+        """
+        blocks = self.blocks
+        if not blocks:
+            return None
+
+        first = 0
+        if time_from is not None:
+            while first < len(blocks) and blocks[first][2] < time_from:
+                first += 1
+        last = len(blocks) - 1
+        if time_to is not None:
+            while last >= first and blocks[last][1] > time_to:
+                last -= 1
+        if first > last:
+            return None
+
+        end = blocks[last + 1][0] if last + 1 < len(blocks) else self.indexed_upto
+        return blocks[first][0], end
+
+
+class LogIndex:
+    """Sparse indexes of all log files of this process, keyed by inode"""
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, stat):
+        """
+        Index of a file, extended to its current size
+
+        Args:
+            path: File path
+            stat: os.stat_result of the file
+
+        Returns:
+            _FileIndex
+        """
+        with self._lock:
+            index = self._indexes.get(stat.st_ino)
+            # Truncated or replaced file: start over
+            if index is None or stat.st_size < index.indexed_upto:
+                index = self._indexes[stat.st_ino] = _FileIndex(stat.st_ino)
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_ino == stat.st_ino:
+                    index.update(f, stat.st_size)
+            return index
+
+    def prune(self, inodes):
+        """Drop indexes of files that no longer exist"""
+        with self._lock:
+            for inode in set(self._indexes) - set(inodes):
+                del self._indexes[inode]
+
+    def stats(self):
+        """Number of indexed files and blocks"""
+        with self._lock:
+            return {
+                'files': len(self._indexes),
+                'blocks': sum(len(index.blocks) for index in self._indexes.values())
+            }
+
+
+def _read_entries(path, start, end):
+    """Entries (offset, lines) between two offsets; an entry is a header line plus continuation lines"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        entry_offset = None
+        lines = []
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            if _entry_time(line) is not None:
+                if lines:
+                    yield entry_offset, lines
+                entry_offset, lines = offset, [line]
+            elif lines:
+                lines.append(line)
+            offset += len(line)
+        if lines:
+            yield entry_offset, lines
+
+
+def parse_log_time(value, name, end_of_day=False):
+    """
+    Parse a time filter (YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS])
+
+    Args:
+        value: Time string or empty
+        name: Parameter name for the error message
+        end_of_day: Date-only values mean the end of the day
+
+    Returns:
+        Timestamp as bytes in the log format or None
+
+    Raises:
+        ValueError: If the value is malformed
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Ungültige Zeitangabe für {name}: {value}")
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S').encode()
+
+
+def search_logs(log_types=None, pattern=None, min_level=None, module=None, time_from=None, time_to=None,
+                limit=1000):
+    """
+    Search entries of the logs, oldest first per log
+
+    Args:
+        log_types: Keys of LOG_FILES (None = all)
+        pattern: Compiled regular expression matched against the whole entry
+        min_level: Minimum level name (e.g. WARNING)
+        module: Module name of the entries
+        time_from: Earliest timestamp (bytes from parse_log_time)
+        time_to: Latest timestamp (bytes from parse_log_time)
+        limit: Maximum number of matches
+
+    Yields:
+        One dict per matching entry, then a summary dict with done=True
+    """
+    levels = set(LEVELS[LEVELS.index(min_level):]) if min_level else None
+    module_bytes = module.encode() if module else None
+
+    matches = 0
+    scanned = 0
+    truncated = False
+    inodes = []
+
+    for log_type in log_types or LOG_FILES:
+        chain = log_chain(log_type)
+        inodes.extend(stat.st_ino for _, stat in chain)
+
+        # Oldest backup first
+        for path, stat in reversed(chain):
+            byte_range = log_index.get(path, stat).byte_range(time_from, time_to)
+            if byte_range is None:
+                continue
+
+            start, end = byte_range
+            scanned += end - start
+            for offset, lines in _read_entries(path, start, end):
+                header = _ENTRY_RE.match(lines[0])
+                timestamp, level, entry_module = header.group(1), header.group(2), header.group(3)
+                if time_from is not None and timestamp < time_from:
+                    continue
+                if time_to is not None and timestamp > time_to:
+                    continue
+                if levels is not None and level.decode() not in levels:
+                    continue
+                if module_bytes is not None and entry_module != module_bytes:
+                    continue
+
+                text = b''.join(lines).decode('utf-8', errors='replace').rstrip('\n')
+                if pattern is not None and not pattern.search(text):
+                    continue
+
+                if matches >= limit:
+                    truncated = True
+                    break
+                matches += 1
+                yield {
+                    'log': log_type,
+                    'file': os.path.basename(path),
+                    'offset': offset,
+                    'time': timestamp.decode(),
+                    'level': level.decode(),
+                    'module': entry_module.decode(),
+                    'message': text[header.end():]
+                }
+            if truncated:
+                break
+
+        if truncated:
+            break
+
+    if log_types is None and not truncated:
+        log_index.prune(inodes)
+
+    yield {'done': True, 'matches': matches, 'truncated': truncated, 'scanned_bytes': scanned, 'index': log_index.stats()}
+
+
+# Global instance
+log_index = LogIndex()
@@ -0,0 +1,9 @@
+# metrics/__init__.py
+"""
+Metrics module initialization
+Exports the metrics blueprint
+"""
+
+from .routes import metrics_bp
+
+__all__ = ['metrics_bp']
\ No newline at end of file
@@ -0,0 +1,155 @@
+# metrics/query_plans.py
+"""
+Query plan checks
+Runs the hot read paths of the job tables, captures the SELECT statements
+they send to the database and checks their EXPLAIN plans for full table
+scans. On Postgres sequential scans are disabled for the check, so a scan
+in the plan means no index can serve the query, independent of table size.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from extensions import db
+from app.core.utils import encode_cursor
+from app.core.db_routing import use_primary
+
+logger = logging.getLogger('app')
+
+# Tables that must be accessed through an index
+CHECKED_TABLES = (
+    'analysis_jobs', 'analysis_jobs_archive', 'job_inputs', 'job_samples', 'job_events'
+)
+
+
+def _hot_queries(user_id):
+    """Name -> callable running one hot read path"""
+    from app.analysis.services import AnalysisService
+    from app.history.query import fetch_history_page
+    from app.history.job_index import search_jobs
+
+    cursor = encode_cursor(datetime.now(timezone.utc), 2 ** 31 - 1)
+    return {
+        'running_job': lambda: AnalysisService.get_running_job(user_id),
+        'stuck_jobs': lambda: AnalysisService.stuck_jobs_query().all(),
+        'history_page': lambda: fetch_history_page(10),
+        'history_next_page': lambda: fetch_history_page(10, cursor),
+        'history_by_status': lambda: fetch_history_page(10, status='failed'),
+        'history_by_job_type': lambda: fetch_history_page(10, job_type='wgs'),
+        'history_by_user': lambda: fetch_history_page(10, user_id=user_id),
+        'history_by_date': lambda: fetch_history_page(10, date_from=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)),
+        'job_search_sample': lambda: search_jobs(sample='PLAN-CHECK', limit=10),
+        'job_search_input_path': lambda: search_jobs(input_path='/bacteria/', limit=10),
+    }
+
+
+def _capture_selects(func):
+    """Run func and return the SELECT statements it executed with their parameters"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    # read_only helpers may still pick the replica; its schema is the same
+    engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        func()
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', capture)
+        db.session.rollback()
+    return statements
+
+
+def _walk_pg_plan(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk_pg_plan(child)
+
+
+def _explain(statement, parameters):
+    """
+    Plan of one statement
+
+    Returns:
+        Tuple of (plan lines, full scans of checked tables)
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    if dialect == 'postgresql':
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = result if isinstance(result, list) else json.loads(result)
+        lines, scans = [], []
+        for node in _walk_pg_plan(plan[0]['Plan']):
+            relation = node.get('Relation Name')
+            index = node.get('Index Name')
+            lines.append(f"{node['Node Type']}" + (f" on {relation}" if relation else "") + (f" using {index}" if index else ""))
+            if node['Node Type'] == 'Seq Scan' and relation in CHECKED_TABLES:
+                scans.append(relation)
+        return lines, scans
+
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        lines = [row[3] for row in rows]
+        scans = []
+        for line in lines:
+            words = line.split()
+            # "SCAN table" reads every row, "SCAN table USING INDEX" walks an index in order
+            if len(words) >= 2 and words[0] == 'SCAN' and 'USING' not in words:
+                table = words[1].split('.')[-1]
+                if table in CHECKED_TABLES:
+                    scans.append(table)
+        return lines, scans
+
+    raise NotImplementedError(f"Query plan checks are not supported on {dialect}")
+
+
+def check_query_plans(user_id=1):
+    """
+    Check the plans of all hot queries (requires an application context)
+
+    Args:
+        user_id: User id used as filter value
+
+    Returns:
+        Dict with ok flag and per-query statements, plans and full scans
+    """
+    results = []
+    for name, func in _hot_queries(user_id).items():
+        try:
+            # Plans are checked on the primary, where the statements are captured
+            with use_primary():
+                statements = _capture_selects(func)
+            for statement, parameters in statements:
+                plan, scans = _explain(statement, parameters)
+                results.append({
+                    'query': name,
+                    'statement': ' '.join(statement.split())[:500],
+                    'plan': plan,
+                    'full_scans': scans,
+                    'ok': not scans
+                })
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            logger.error(f"Query plan check {name} failed: {e}")
+            results.append({'query': name, 'error': str(e), 'ok': False})
+        finally:
+            db.session.rollback()
+
+    failed = [result['query'] for result in results if not result['ok']]
+    if failed:
+        logger.warning(f"Query plan check found full scans or errors in: {', '.join(sorted(set(failed)))}")
+    return {
+        'ok': not failed,
+        'dialect': db.engine.dialect.name,
+        'queries': results
+    }
@@ -0,0 +1,108 @@
+# metrics/routes.py
+"""
+Routes for application metrics
+"""
+
+import logging
+from flask import Blueprint, jsonify, request, current_app
+from flask_login import login_required, current_user
+from werkzeug.exceptions import BadRequest
+
+from models import User
+from app.core.metrics import metrics
+from app.core.scheduler import scheduler
+from app.core.audit import query_audit_events
+from app.core.db_routing import read_only
+from app.core.auth import require_admin
+from app.history.query import parse_date
+
+logger = logging.getLogger('app')
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/api/metrics')
+@login_required
+@require_admin
+def api_metrics():
+    """API endpoint exporting in-process metrics of this worker"""
+    return jsonify(metrics.snapshot())
+
+
+@metrics_bp.route('/api/maintenance')
+@login_required
+@require_admin
+def api_maintenance():
+    """API endpoint for the state and run timings of the maintenance tasks"""
+    try:
+        return jsonify({'owner': scheduler.owner, 'tasks': scheduler.status()})
+    except Exception as e:
+        logger.error(f"Error reading maintenance status: {e}")
+        return jsonify({'error': 'Fehler beim Laden des Wartungsstatus'}), 500
+
+
+@metrics_bp.route('/api/maintenance/<name>/run', methods=['POST'])
+@login_required
+@require_admin
+def api_run_maintenance(name):
+    """API endpoint to run a maintenance task immediately"""
+    try:
+        executed = scheduler.run_task(name, force=True)
+    except KeyError:
+        return jsonify({'error': 'Unbekannte Wartungsaufgabe'}), 404
+
+    if not executed:
+        return jsonify({'error': 'Wartungsaufgabe läuft bereits'}), 409
+
+    task = next(task for task in scheduler.tasks if task.name == name)
+    logger.info(f"Maintenance task {name} run manually by {current_user.username}")
+    return jsonify(task.to_dict())
+
+
+@metrics_bp.route('/api/audit')
+@login_required
+@require_admin
+@read_only
+def api_audit():
+    """
+    API endpoint for the audit trail, newest first
+    
+    Query parameters: limit, cursor (from next_cursor of the previous page),
+    action (name or prefix ending in '.', e.g. user.), actor (username),
+    target_type, target_id, date_from and date_to (YYYY-MM-DD, inclusive)
+    """
+    config = current_app.config
+    
+    try:
+        limit = request.args.get('limit', config.get('AUDIT_PAGE_SIZE', 50), type=int)
+        limit = max(1, min(limit, config.get('AUDIT_MAX_PAGE_SIZE', 500)))
+        
+        actor_id = None
+        actor = request.args.get('actor', '').strip()
+        if actor:
+            user = User.query.filter_by(username=actor).first()
+            if user is None:
+                return jsonify({'events': [], 'next_cursor': None})
+            actor_id = user.id
+        
+        target_type = request.args.get('target_type', '').strip() or None
+        target_id = request.args.get('target_id', '').strip() or None
+        if target_id and not target_type:
+            raise ValueError("target_id erfordert target_type")
+        
+        events, next_cursor = query_audit_events(
+            limit=limit,
+            cursor=request.args.get('cursor', '').strip() or None,
+            action=request.args.get('action', '').strip() or None,
+            actor_id=actor_id,
+            target_type=target_type,
+            target_id=target_id,
+            date_from=parse_date(request.args.get('date_from', '').strip(), 'date_from'),
+            date_to=parse_date(request.args.get('date_to', '').strip(), 'date_to')
+        )
+        return jsonify({'events': events, 'next_cursor': next_cursor})
+    except (ValueError, BadRequest) as e:
+        return jsonify({'error': getattr(e, 'description', None) or str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in api_audit: {e}")
+        return jsonify({'error': 'Fehler beim Laden des Audit-Protokolls'}), 500
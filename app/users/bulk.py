@@ -0,0 +1,187 @@
+# users/bulk.py
+"""
+Bulk user import
+Validates a whole batch with set-based queries and inserts it in one transaction
+"""
+
+import io
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+
+logger = logging.getLogger('users')
+
+MIN_PASSWORD_LENGTH = 6
+
+
+def parse_csv_rows(text):
+    """
+    Parse CSV user rows (header: username,email,password[,role])
+
+    Args:
+        text: CSV content (comma or semicolon separated)
+
+    Returns:
+        List of row dictionaries
+    """
+    text = text.lstrip('\ufeff')
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    return [
+        {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+        for row in reader
+    ]
+
+
+def validate_rows(rows):
+    """
+    Validate import rows against each other and against existing users
+
+    Args:
+        rows: List of row dictionaries
+
+    Returns:
+        List of per-row results; valid rows have status 'valid' and the
+        normalized fields, invalid rows status 'error' and an error message
+    """
+    results = []
+    seen_usernames = set()
+    seen_emails = set()
+
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            results.append({'row': index, 'status': 'error', 'error': 'Ungültiger Eintrag'})
+            continue
+
+        username = str(row.get('username') or '').strip()
+        email = str(row.get('email') or '').strip() or None
+        password = str(row.get('password') or '')
+        role = str(row.get('role') or 'user').strip().lower()
+
+        result = {'row': index, 'username': username, 'email': email, 'role': role}
+        error = None
+
+        if not username:
+            error = 'Benutzername darf nicht leer sein'
+        elif len(password) < MIN_PASSWORD_LENGTH:
+            error = f'Passwort muss mindestens {MIN_PASSWORD_LENGTH} Zeichen lang sein'
+        elif role not in ('admin', 'user'):
+            error = f'Unbekannte Rolle: {role}'
+        elif username in seen_usernames:
+            error = 'Benutzername mehrfach in der Importdatei'
+        elif email and email in seen_emails:
+            error = 'E-Mail mehrfach in der Importdatei'
+
+        if error:
+            result.update(status='error', error=error)
+        else:
+            result.update(status='valid', password=password)
+            seen_usernames.add(username)
+            if email:
+                seen_emails.add(email)
+        results.append(result)
+
+    # One query for all uniqueness checks against the database
+    if seen_usernames or seen_emails:
+        conditions = []
+        if seen_usernames:
+            conditions.append(User.username.in_(seen_usernames))
+        if seen_emails:
+            conditions.append(User.email.in_(seen_emails))
+        existing = db.session.query(User.username, User.email).filter(or_(*conditions)).all()
+
+        taken_usernames = {username for username, _ in existing}
+        taken_emails = {email for _, email in existing if email}
+
+        for result in results:
+            if result['status'] != 'valid':
+                continue
+            if result['username'] in taken_usernames:
+                result.update(status='error', error='Benutzername bereits vergeben')
+            elif result['email'] and result['email'] in taken_emails:
+                result.update(status='error', error='E-Mail bereits vergeben')
+            if result['status'] == 'error':
+                result.pop('password', None)
+
+    return results
+
+
+def import_users(rows, atomic=False, dry_run=False, max_workers=4):
+    """
+    Create users from import rows in a single transaction
+
+    Args:
+        rows: List of row dictionaries (username, email, password, role)
+        atomic: Import nothing if any row is invalid
+        dry_run: Only validate
+        max_workers: Threads used for password hashing
+
+    Returns:
+        Dict with counts and per-row results (passwords are never returned)
+    """
+    results = validate_rows(rows)
+    valid = [result for result in results if result['status'] == 'valid']
+    has_errors = len(valid) < len(results)
+
+    if dry_run or not valid or (atomic and has_errors):
+        for result in valid:
+            result.pop('password')
+            result['status'] = 'valid' if dry_run else 'skipped'
+        return _summary(results)
+
+    # Password hashing dominates the import time; hashlib releases the GIL
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = list(executor.map(generate_password_hash, [result.pop('password') for result in valid]))
+
+    users = [
+        User(
+            username=result['username'],
+            email=result['email'],
+            password_hash=password_hash,
+            role_id=1 if result['role'] == 'admin' else 2
+        )
+        for result, password_hash in zip(valid, hashes)
+    ]
+
+    try:
+        db.session.add_all(users)
+        db.session.flush()
+        # Read the sequence-assigned ids before commit expires the instances
+        user_ids = [user.id for user in users]
+        db.session.commit()
+    except IntegrityError as e:
+        # A concurrent request created one of the users in the meantime
+        db.session.rollback()
+        logger.warning(f"Bulk import conflicted with concurrent changes: {e}")
+        for result in valid:
+            result.update(status='error', error='Konflikt mit gleichzeitiger Änderung, bitte erneut importieren')
+        return _summary(results)
+
+    for result, user_id in zip(valid, user_ids):
+        result.update(status='created', user_id=user_id)
+
+    return _summary(results)
+
+
+def _summary(results):
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return {
+        'created': counts.get('created', 0),
+        'failed': counts.get('error', 0),
+        'skipped': counts.get('skipped', 0),
+        'valid': counts.get('valid', 0),
+        'results': results
+    }
@@ -0,0 +1,83 @@
+# users/query.py
+"""
+User list queries
+Search, role filter, sorting and keyset pagination in SQL, with the role
+loaded in the same query
+"""
+
+import logging
+
+from sqlalchemy import select, func, or_, tuple_
+from sqlalchemy.orm import contains_eager
+
+from extensions import db
+from models import User, Role
+from app.core.utils import escape_like, encode_cursor, decode_cursor
+from app.core.db_routing import read_only
+
+logger = logging.getLogger('users')
+
+# Sort name -> columns before the id tie-breaker
+SORT_COLUMNS = {
+    'username': lambda: (func.lower(User.username),),
+    'role': lambda: (Role.name, func.lower(User.username)),
+    'id': lambda: (),
+}
+
+
+def _sort_values(user, sort):
+    """Cursor values of a user for the sort order"""
+    if sort == 'username':
+        return (user.username.lower(), user.id)
+    if sort == 'role':
+        return (user.role.name, user.username.lower(), user.id)
+    return (user.id,)
+
+
+@read_only
+def fetch_users_page(limit=50, cursor=None, search=None, role=None, sort='username', descending=False):
+    """
+    Get one page of users
+
+    Args:
+        limit: Page size
+        cursor: Cursor from the previous page (None = first page)
+        search: Prefix of username or email (case-insensitive)
+        role: Role name
+        sort: username, role or id
+        descending: Reverse the sort order
+
+    Returns:
+        Tuple of (users, next_cursor); users have their role loaded
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Ungültige Sortierung: {sort}")
+
+    columns = SORT_COLUMNS[sort]() + (User.id,)
+
+    query = select(User).join(User.role).options(contains_eager(User.role))
+    if search:
+        prefix = f"{escape_like(search.lower())}%"
+        query = query.where(or_(
+            func.lower(User.username).like(prefix, escape='\\'),
+            func.lower(User.email).like(prefix, escape='\\')
+        ))
+    if role:
+        query = query.where(Role.name == role)
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns) or not isinstance(values[-1], int):
+            raise ValueError("Ungültiger Cursor")
+        position = tuple_(*columns)
+        query = query.where(position < tuple_(*values) if descending else position > tuple_(*values))
+
+    query = query.order_by(*(column.desc() if descending else column for column in columns))
+    users = db.session.scalars(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(*_sort_values(users[-1], sort))
+
+    return users, next_cursor
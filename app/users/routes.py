@@ -4,55 +4,73 @@ Routes for user management
 """
 
 import logging
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
+from werkzeug.exceptions import BadRequest
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from extensions import db
 from models import User, AnalysisJob
+from app.core.user_cache import user_cache
+from app.core.audit import audit_log
+from app.core.db_routing import read_only
+from app.core.auth import require_admin
+from .bulk import parse_csv_rows, import_users
+from .query import fetch_users_page
 
 logger = logging.getLogger('users')
 
 users_bp = Blueprint('users', __name__)
 
 
-def require_admin(func):
-    """Decorator to require admin role"""
-    def wrapper(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
-            logger.warning(f"Non-admin user {current_user.username if current_user.is_authenticated else 'anonymous'} attempted admin action")
-            return jsonify({'error': 'Keine Berechtigung'}), 403
-        return func(*args, **kwargs)
-    wrapper.__name__ = func.__name__
-    return wrapper
-
-
 @users_bp.route('/api/users')
 @login_required
 @require_admin
+@read_only
 def api_users():
-    """API endpoint for user management with proper authorization"""
+    """
+    API endpoint for user management with proper authorization
+    
+    Query parameters: search (username or email prefix), role (role name),
+    sort (username, role, id), order (asc, desc), limit,
+    cursor (from next_cursor of the previous page)
+    """
+    config = current_app.config
+    
+    try:
+        limit = request.args.get('limit', config.get('USERS_PAGE_SIZE', 50), type=int)
+        limit = max(1, min(limit, config.get('USERS_MAX_PAGE_SIZE', 200)))
+        
+        order = request.args.get('order', 'asc').strip().lower()
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Ungültige Reihenfolge: {order}")
+        
+        users, next_cursor = fetch_users_page(
+            limit=limit,
+            cursor=request.args.get('cursor', '').strip() or None,
+            search=request.args.get('search', '').strip() or None,
+            role=request.args.get('role', '').strip() or None,
+            sort=request.args.get('sort', 'username').strip() or 'username',
+            descending=order == 'desc'
+        )
+    except (ValueError, BadRequest) as e:
+        return jsonify({'error': getattr(e, 'description', None) or str(e)}), 400
+    
     try:
-        # Get all users with their roles
-        users = db.session.query(User).all()
-        
         users_data = []
         for user in users:
             user_data = {
                 'id': user.id,
                 'username': user.username,
-                'email': user.email if hasattr(user, 'email') else None,
+                'email': user.email,
                 'role': user.role.name if user.role else None,
                 'is_current_user': user.id == current_user.id,
-                'created_at': user.created_at.strftime('%d.%m.%Y %H:%M') if hasattr(user, 'created_at') and user.created_at else 'Unbekannt'
+                'created_at': user.created_at.strftime('%d.%m.%Y %H:%M') if user.created_at else 'Unbekannt'
             }
             users_data.append(user_data)
         
-        # Sort by username
-        users_data.sort(key=lambda x: x['username'].lower())
-        
         logger.info(f"Admin {current_user.username} fetched user list ({len(users_data)} users)")
-        return jsonify({'users': users_data})
+        return jsonify({'users': users_data, 'next_cursor': next_cursor})
         
     except Exception as e:
         logger.error(f"Error in api_users: {e}")
@@ -62,6 +80,7 @@ def api_users():
 @users_bp.route('/api/users/<int:user_id>', methods=['GET'])
 @login_required
 @require_admin
+@read_only
 def api_get_user(user_id):
     """API endpoint to get a single user with validation"""
     try:
@@ -106,13 +125,8 @@ def api_create_user():
         if data.get('email') and User.query.filter_by(email=data['email']).first():
             return jsonify({'error': 'E-Mail bereits vergeben'}), 400
 
-        # Get next available ID
-        last_user = User.query.order_by(User.id.desc()).first()
-        next_id = (last_user.id + 1) if last_user else 1
-        
-        # Create new user
+        # Create new user (id from the database sequence)
         new_user = User(
-            id=next_id,
             username=data['username'].strip(),
             email=data['email'].strip() if data.get('email') else None,
             password_hash=generate_password_hash(data['password']),
@@ -122,10 +136,15 @@ def api_create_user():
         db.session.add(new_user)
         db.session.commit()
         
-        logger.info(f"Admin {current_user.username} created new user {new_user.username} with ID {next_id}")
+        logger.info(f"Admin {current_user.username} created new user {new_user.username} with ID {new_user.id}")
+        audit_log.record('user.create', 'user', new_user.id, detail={
+            'username': new_user.username,
+            'email': new_user.email,
+            'role': 'admin' if new_user.role_id == 1 else 'user'
+        })
         return jsonify({
             'message': 'Benutzer erfolgreich angelegt',
-            'user_id': next_id
+            'user_id': new_user.id
         }), 201
         
     except Exception as e:
@@ -134,6 +153,70 @@ def api_create_user():
         return jsonify({'error': 'Fehler beim Anlegen des Benutzers'}), 500
 
 
+@users_bp.route('/api/users/bulk', methods=['POST'])
+@login_required
+@require_admin
+def api_bulk_create_users():
+    """
+    API endpoint to import many users in one transaction
+    
+    Accepts JSON ({"users": [...], "atomic": bool, "dry_run": bool} or a list)
+    or CSV (text/csv body or uploaded file "file") with the columns
+    username, email, password and optional role
+    """
+    try:
+        atomic = request.args.get('atomic', 'false').lower() == 'true'
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+        
+        if request.is_json:
+            data = request.get_json()
+            if isinstance(data, dict):
+                rows = data.get('users')
+                atomic = bool(data.get('atomic', atomic))
+                dry_run = bool(data.get('dry_run', dry_run))
+            else:
+                rows = data
+        elif 'file' in request.files:
+            rows = parse_csv_rows(request.files['file'].read().decode('utf-8', errors='replace'))
+        else:
+            rows = parse_csv_rows(request.get_data(as_text=True))
+        
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'Keine Benutzer zum Import gefunden'}), 400
+        
+        max_rows = current_app.config.get('USER_IMPORT_MAX_ROWS', 500)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'Maximal {max_rows} Benutzer pro Import'}), 400
+        
+        result = import_users(
+            rows,
+            atomic=atomic,
+            dry_run=dry_run,
+            max_workers=current_app.config.get('USER_IMPORT_HASH_WORKERS', 4)
+        )
+        
+        logger.info(
+            f"Admin {current_user.username} bulk-imported users: {result['created']} created, "
+            f"{result['failed']} failed{' (dry run)' if dry_run else ''}"
+        )
+        for row in result['results']:
+            if row['status'] == 'created':
+                audit_log.record('user.create', 'user', row['user_id'], detail={
+                    'username': row['username'],
+                    'email': row['email'],
+                    'role': row['role'],
+                    'bulk': True
+                })
+        if result['created']:
+            return jsonify(result), 201
+        return jsonify(result), 400 if result['failed'] else 200
+        
+    except Exception as e:
+        logger.error(f"Error in bulk user import: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Fehler beim Import der Benutzer'}), 500
+
+
 @users_bp.route('/api/users/<int:user_id>', methods=['PUT'])
 @login_required
 @require_admin
@@ -153,6 +236,19 @@ def api_update_user(user_id):
             if User.query.filter_by(email=data['email']).first():
                 return jsonify({'error': 'E-Mail bereits vergeben'}), 400
         
+        # Changed fields for the audit trail (never the password itself)
+        changes = {}
+        if data.get('username') and data['username'].strip() != user.username:
+            changes['username'] = [user.username, data['username'].strip()]
+        if data.get('email') is not None and (data['email'].strip() if data['email'] else None) != user.email:
+            changes['email'] = [user.email, data['email'].strip() if data['email'] else None]
+        if data.get('password'):
+            changes['password'] = True
+        if data.get('role'):
+            old_role, new_role = ('admin' if user.role_id == 1 else 'user'), ('admin' if data['role'] == 'admin' else 'user')
+            if old_role != new_role:
+                changes['role'] = [old_role, new_role]
+        
         # Update fields
         if data.get('username'):
             user.username = data['username'].strip()
@@ -168,7 +264,9 @@ def api_update_user(user_id):
             user.role_id = 1 if data['role'] == 'admin' else 2
         
         db.session.commit()
+        user_cache.invalidate(user_id)
         logger.info(f"Admin {current_user.username} updated user {user.username}")
+        audit_log.record('user.update', 'user', user_id, detail={'username': user.username, 'changes': changes})
         return jsonify({'message': 'Benutzer erfolgreich aktualisiert'})
         
     except Exception as e:
@@ -203,8 +301,10 @@ def api_delete_user(user_id):
         # Delete user
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         
         logger.info(f"Admin {current_user.username} deleted user {username} (ID: {user_id})")
+        audit_log.record('user.delete', 'user', user_id, detail={'username': username})
         return jsonify({'message': f'Benutzer {username} wurde gelöscht'})
         
     except Exception as e:
@@ -224,9 +324,14 @@ def api_change_password():
         if not all(key in data for key in ['current_password', 'new_password', 'confirm_password']):
             return jsonify({'error': 'Fehlende Pflichtfelder'}), 400
         
+        # current_user is a cached identity without the password hash
+        user = db.session.get(User, current_user.id)
+        
         # Validate current password
-        if not check_password_hash(current_user.password_hash, data['current_password']):
+        if not check_password_hash(user.password_hash, data['current_password']):
             logger.warning(f"User {current_user.username} provided wrong current password")
+            audit_log.record('user.change_password', 'user', current_user.id, success=False,
+                             detail={'error': 'wrong current password'})
             return jsonify({'error': 'Aktuelles Passwort ist falsch'}), 400
         
         # Validate new password match
@@ -238,10 +343,12 @@ def api_change_password():
             return jsonify({'error': 'Passwort muss mindestens 6 Zeichen lang sein'}), 400
         
         # Update password
-        current_user.password_hash = generate_password_hash(data['new_password'])
+        user.password_hash = generate_password_hash(data['new_password'])
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         logger.info(f"User {current_user.username} changed their password")
+        audit_log.record('user.change_password', 'user', current_user.id)
         return jsonify({'message': 'Passwort erfolgreich geändert'})
         
     except Exception as e:
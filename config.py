@@ -24,6 +24,118 @@ class Config:
                 f.write(SECRET_KEY)
             print(f"[INFO] Neuer SECRET_KEY erzeugt und in {SECRET_FILE} gespeichert")
 
+    # --- Compute Hosts ---
+    # Host per analysis type; ssh_command passes them to scripts/ssh_wrapper.sh
+    ANALYSIS_HOSTS = {
+        "wgs": os.getenv("WGS_HOST", "10.20.30.216"),
+        "species": os.getenv("SPECIES_HOST", "10.20.30.217")
+    }
+
     # --- Database Configuration ---
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional streaming replica for read_only routes
+    SQLALCHEMY_BINDS = {"replica": os.getenv("REPLICA_DATABASE_URL")} if os.getenv("REPLICA_DATABASE_URL") else {}
+    REPLICA_READ_YOUR_WRITES_SECONDS = int(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", 10))  # > typical replication lag
+    REPLICA_RETRY_SECONDS = int(os.getenv("REPLICA_RETRY_SECONDS", 30))  # primary-only reads after a replica connection error
+
+    # --- Authentication ---
+    USER_CACHE_SECONDS = int(os.getenv("USER_CACHE_SECONDS", 30))  # lifetime of cached identities (changes apply at once via auth_version)
+
+    # --- SQL Instrumentation ---
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 10))  # same statement per request
+    SQL_SLOW_QUERY_MS = int(os.getenv("SQL_SLOW_QUERY_MS", 500))
+    SQL_STATS_HEADER = os.getenv("SQL_STATS_HEADER", "false").lower() == "true"
+
+    # --- Folder Browser ---
+    BROWSE_CACHE_SECONDS = int(os.getenv("BROWSE_CACHE_SECONDS", 300))
+    BROWSE_MAX_LEVELS = int(os.getenv("BROWSE_MAX_LEVELS", 3))
+    BROWSE_PREFETCH_DEPTH = int(os.getenv("BROWSE_PREFETCH_DEPTH", 2))
+    BROWSE_PREFETCH_BUDGET = int(os.getenv("BROWSE_PREFETCH_BUDGET", 200))
+
+    # --- Disk Usage ---
+    DISK_USAGE_CACHE_SECONDS = int(os.getenv("DISK_USAGE_CACHE_SECONDS", 900))
+
+    # --- FASTQ Checks (shared process pool) ---
+    FASTQ_WORKERS = int(os.getenv("FASTQ_WORKERS", 4))
+    PREFLIGHT_ENABLED = os.getenv("PREFLIGHT_ENABLED", "true").lower() == "true"
+    FASTQ_STATS_MAX_READS = int(os.getenv("FASTQ_STATS_MAX_READS", 0))  # 0 = whole file
+
+    # --- Sample Catalog ---
+    CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", 3600))
+    CATALOG_SEARCH_MAX_RESULTS = int(os.getenv("CATALOG_SEARCH_MAX_RESULTS", 500))
+
+    # --- Run Metadata (SampleSheet.csv, RunInfo.xml, IonTorrent run files) ---
+    RUN_METADATA_SEARCH_LEVELS = int(os.getenv("RUN_METADATA_SEARCH_LEVELS", 4))  # parents searched above FASTQ folders
+
+    # --- Report Manifests ---
+    REPORT_MANIFEST_RECHECK_SECONDS = int(os.getenv("REPORT_MANIFEST_RECHECK_SECONDS", 60))
+
+    # --- User Import ---
+    USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", 500))
+    USER_IMPORT_HASH_WORKERS = int(os.getenv("USER_IMPORT_HASH_WORKERS", 4))
+
+    # --- User Administration ---
+    USERS_PAGE_SIZE = int(os.getenv("USERS_PAGE_SIZE", 50))
+    USERS_MAX_PAGE_SIZE = int(os.getenv("USERS_MAX_PAGE_SIZE", 200))
+
+    # --- Audit Trail ---
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))  # entries waiting for the writer thread
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+    AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 2))  # max. delay before a batch is written
+    AUDIT_PAGE_SIZE = int(os.getenv("AUDIT_PAGE_SIZE", 50))
+    AUDIT_MAX_PAGE_SIZE = int(os.getenv("AUDIT_MAX_PAGE_SIZE", 500))
+
+    # --- Log Viewer ---
+    LOG_TAIL_LINES = int(os.getenv("LOG_TAIL_LINES", 1000))
+    LOG_TAIL_MAX_LINES = int(os.getenv("LOG_TAIL_MAX_LINES", 5000))
+    LOG_TAIL_MAX_BYTES = int(os.getenv("LOG_TAIL_MAX_BYTES", 4 * 1024 * 1024))  # read per request
+    LOG_SEARCH_DEFAULT_RESULTS = int(os.getenv("LOG_SEARCH_DEFAULT_RESULTS", 1000))
+    LOG_SEARCH_MAX_RESULTS = int(os.getenv("LOG_SEARCH_MAX_RESULTS", 10000))
+    LOG_SEARCH_MAX_PATTERN = int(os.getenv("LOG_SEARCH_MAX_PATTERN", 500))
+
+    # --- History ---
+    HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 10))
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 100))
+
+    # --- Job Archive ---
+    JOB_ARCHIVE_RETENTION_DAYS = int(os.getenv("JOB_ARCHIVE_RETENTION_DAYS", 180))  # finished jobs older than this are archived
+    JOB_ARCHIVE_BATCH_SIZE = int(os.getenv("JOB_ARCHIVE_BATCH_SIZE", 500))  # jobs per transaction
+    JOB_ARCHIVE_MAX_BATCHES = int(os.getenv("JOB_ARCHIVE_MAX_BATCHES", 20))  # batches per run
+
+    # --- Job Search ---
+    JOB_SEARCH_PAGE_SIZE = int(os.getenv("JOB_SEARCH_PAGE_SIZE", 50))
+    JOB_SEARCH_MAX_PAGE_SIZE = int(os.getenv("JOB_SEARCH_MAX_PAGE_SIZE", 200))
+
+    # --- Job Statistics ---
+    JOB_STATS_DEFAULT_DAYS = int(os.getenv("JOB_STATS_DEFAULT_DAYS", 84))
+    JOB_STATS_MAX_DAYS = int(os.getenv("JOB_STATS_MAX_DAYS", 1100))
+
+    # --- Scan Admission Control ---
+    # Concurrency limits hold across all worker processes (slot leases in the database)
+    SCAN_MAX_CONCURRENT = int(os.getenv("SCAN_MAX_CONCURRENT", 4))
+    SCAN_MAX_PER_USER = int(os.getenv("SCAN_MAX_PER_USER", 2))
+    SCAN_MAX_QUEUE = int(os.getenv("SCAN_MAX_QUEUE", 16))  # waiting scans per worker process
+    SCAN_QUEUE_TIMEOUT = int(os.getenv("SCAN_QUEUE_TIMEOUT", 30))
+    SCAN_RETRY_AFTER = int(os.getenv("SCAN_RETRY_AFTER", 5))
+    SCAN_SLOT_LEASE_SECONDS = int(os.getenv("SCAN_SLOT_LEASE_SECONDS", 60))  # slots of a crashed worker free up after this
+
+    # --- Background Scan Tasks ---
+    SCAN_TASK_WORKERS = int(os.getenv("SCAN_TASK_WORKERS", 4))
+    SCAN_TASK_RESULT_SECONDS = int(os.getenv("SCAN_TASK_RESULT_SECONDS", 300))  # reuse finished results
+    SCAN_TASK_TTL_SECONDS = int(os.getenv("SCAN_TASK_TTL_SECONDS", 3600))  # forget finished tasks
+    SCAN_TASK_SAVE_SECONDS = float(os.getenv("SCAN_TASK_SAVE_SECONDS", 1.0))  # progress written to the database
+    SCAN_TASK_STALE_SECONDS = int(os.getenv("SCAN_TASK_STALE_SECONDS", 120))  # running task without heartbeat = worker gone
+
+    # --- Maintenance Scheduler ---
+    MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "true").lower() == "true"
+    MAINTENANCE_TICK_SECONDS = int(os.getenv("MAINTENANCE_TICK_SECONDS", 30))
+    MAINTENANCE_LEASE_SECONDS = int(os.getenv("MAINTENANCE_LEASE_SECONDS", 1800))  # lease of a crashed worker expires
+    MAINTENANCE_STUCK_JOBS_SECONDS = int(os.getenv("MAINTENANCE_STUCK_JOBS_SECONDS", 300))
+    MAINTENANCE_CATALOG_SECONDS = int(os.getenv("MAINTENANCE_CATALOG_SECONDS", 3600))
+    MAINTENANCE_CACHE_PRUNE_SECONDS = int(os.getenv("MAINTENANCE_CACHE_PRUNE_SECONDS", 600))
+    MAINTENANCE_JOB_STATS_SECONDS = int(os.getenv("MAINTENANCE_JOB_STATS_SECONDS", 300))
+    MAINTENANCE_ARCHIVE_SECONDS = int(os.getenv("MAINTENANCE_ARCHIVE_SECONDS", 3600))
+    MAINTENANCE_JOB_ROLLUP_SECONDS = int(os.getenv("MAINTENANCE_JOB_ROLLUP_SECONDS", 300))
+    MAINTENANCE_JOB_INDEX_SECONDS = int(os.getenv("MAINTENANCE_JOB_INDEX_SECONDS", 600))
+    JOB_TIMEOUT_HOURS = int(os.getenv("JOB_TIMEOUT_HOURS", 1))  # running jobs older than this are failed
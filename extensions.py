@@ -7,8 +7,10 @@ Prevents circular imports by creating extension instances here
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from app.core.db_routing import RoutingSession
+
 # Initialize extensions (but don't bind to app yet)
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 
 # Configure login manager
@@ -35,6 +35,8 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role_id = db.Column(db.Integer, db.ForeignKey('ngs.roles.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Incremented on every change; cached identities in all workers are checked against it
+    auth_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     role = db.relationship('Role', back_populates='users')
@@ -49,10 +51,38 @@ class User(UserMixin, db.Model):
         return self.role and self.role.name == 'admin'
 
 
+# User administration: case-insensitive sorting/keyset pagination and prefix search
+db.Index('ix_users_username_lower_id', db.func.lower(User.username), User.id)
+db.Index(
+    'ix_users_username_lower_prefix', db.func.lower(User.username).label('username_lower'),
+    postgresql_ops={'username_lower': 'varchar_pattern_ops'}
+)
+db.Index(
+    'ix_users_email_lower_prefix', db.func.lower(User.email).label('email_lower'),
+    postgresql_ops={'email_lower': 'varchar_pattern_ops'}
+)
+db.Index('ix_users_role_id', User.role_id)
+
+
 class AnalysisJob(db.Model):
     """Analysis job model for tracking NGS analysis runs"""
     __tablename__ = 'analysis_jobs'
-    __table_args__ = {'schema': 'ngs'}
+    __table_args__ = (
+        # Keyset pagination of the history on (created_at, id), optionally filtered
+        db.Index('ix_analysis_jobs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_job_type_created_at_id', 'job_type', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Changed jobs since the last statistics rollup
+        db.Index('ix_analysis_jobs_updated_at', 'updated_at'),
+        # Running jobs per user (page loads, submission, cancel/reset): few rows, stays small
+        db.Index(
+            'ix_analysis_jobs_running_user_id_created_at', 'user_id', 'created_at',
+            postgresql_where=db.text("status = 'running'"),
+            sqlite_where=db.text("status = 'running'")
+        ),
+        {'schema': 'ngs'}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('ngs.users.id'), nullable=False, index=True)
@@ -82,12 +112,296 @@ class AnalysisJob(db.Model):
         return self.status in ['finished', 'failed']
 
 
+class AnalysisJobArchive(db.Model):
+    """Terminal jobs moved out of analysis_jobs after the retention window (same columns, no user FK)"""
+    __tablename__ = 'analysis_jobs_archive'
+    __table_args__ = (
+        db.Index('ix_analysis_jobs_archive_created_at_id', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_archive_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_archive_job_type_created_at_id', 'job_type', 'created_at', 'id'),
+        db.Index('ix_analysis_jobs_archive_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        {'schema': 'ngs'}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    job_type = db.Column(db.String(50), nullable=False)
+    job_code = db.Column(db.String(50), unique=True, nullable=False)
+    run_name = db.Column(db.String(255))
+    parameters = db.Column(db.JSON)
+    status = db.Column(db.String(20))
+    progress = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<AnalysisJobArchive {self.job_code} ({self.status})>'
+
+
+class JobInput(db.Model):
+    """Input folder and sample count of a job, derived from its parameters for indexed search"""
+    __tablename__ = 'job_inputs'
+    __table_args__ = (
+        db.Index('ix_job_inputs_created_at_job_id', 'created_at', 'job_id'),
+        # Prefix searches (LIKE 'path%') independent of the database collation
+        db.Index('ix_job_inputs_input_path', 'input_path', postgresql_ops={'input_path': 'varchar_pattern_ops'}),
+        {'schema': 'ngs'}
+    )
+    
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    job_type = db.Column(db.String(50))
+    input_path = db.Column(db.String(1024))
+    sample_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    created_at = db.Column(db.DateTime)  # of the job
+    indexed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<JobInput job={self.job_id} {self.input_path} ({self.sample_count} samples)>'
+
+
+class JobSample(db.Model):
+    """One sample of a job (job parameters are searchable by sample name)"""
+    __tablename__ = 'job_samples'
+    __table_args__ = (
+        db.Index('ix_job_samples_sample_job_id', 'sample', 'job_id', postgresql_ops={'sample': 'varchar_pattern_ops'}),
+        {'schema': 'ngs'}
+    )
+    
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sample = db.Column(db.String(255), primary_key=True)
+    
+    def __repr__(self):
+        return f'<JobSample job={self.job_id} {self.sample}>'
+
+
+class JobEvent(db.Model):
+    """Append-only log of job status transitions (no FK, events outlive archived jobs)"""
+    __tablename__ = 'job_events'
+    __table_args__ = (
+        db.Index('ix_job_events_job_id_created_at', 'job_id', 'created_at'),
+        {'schema': 'ngs'}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    job_code = db.Column(db.String(50))
+    job_type = db.Column(db.String(50))
+    from_status = db.Column(db.String(20))  # None for the creation event
+    to_status = db.Column(db.String(20), nullable=False)
+    cause = db.Column(db.String(50))  # created, started, start_failed, cancelled, force_reset, stuck, callback, log
+    host = db.Column(db.String(100))
+    user_id = db.Column(db.Integer)  # user who caused the transition, if any
+    detail = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+    
+    def __repr__(self):
+        return f'<JobEvent job={self.job_id} {self.from_status}->{self.to_status} ({self.cause})>'
+
+
+class AuditEvent(db.Model):
+    """Append-only audit trail of admin and job actions (no FKs, entries outlive users and jobs)"""
+    __tablename__ = 'audit_events'
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally filtered
+        db.Index('ix_audit_events_created_at_id', 'created_at', 'id'),
+        db.Index('ix_audit_events_actor_id_created_at_id', 'actor_id', 'created_at', 'id'),
+        db.Index('ix_audit_events_action_created_at_id', 'action', 'created_at', 'id'),
+        db.Index('ix_audit_events_target_created_at_id', 'target_type', 'target_id', 'created_at', 'id'),
+        {'schema': 'ngs'}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    actor_id = db.Column(db.Integer)
+    actor_name = db.Column(db.String(80))
+    action = db.Column(db.String(50), nullable=False)  # e.g. user.create, user.delete, job.cancel, job.force_reset
+    target_type = db.Column(db.String(20))  # user, job
+    target_id = db.Column(db.String(50))
+    success = db.Column(db.Boolean, nullable=False, default=True)
+    detail = db.Column(db.JSON)
+    remote_addr = db.Column(db.String(45))
+    
+    def __repr__(self):
+        return f'<AuditEvent {self.action} by {self.actor_name} on {self.target_type}:{self.target_id}>'
+
+
+class JobStatsDaily(db.Model):
+    """Job counts and duration histogram per UTC day, job type and status (rollup of analysis_jobs and archive)"""
+    __tablename__ = 'job_stats_daily'
+    __table_args__ = {'schema': 'ngs'}
+    
+    day = db.Column(db.Date, primary_key=True)
+    job_type = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    job_count = db.Column(db.Integer, nullable=False, default=0)
+    duration_count = db.Column(db.Integer, nullable=False, default=0)  # terminal jobs with a duration
+    duration_sum = db.Column(db.Float, nullable=False, default=0.0)  # seconds
+    duration_max = db.Column(db.Float)
+    duration_buckets = db.Column(db.JSON)  # counts per DURATION_BUCKETS upper bound (+ overflow)
+    refreshed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<JobStatsDaily {self.day} {self.job_type} {self.status}: {self.job_count}>'
+
+
+class JobCodeSequence(db.Model):
+    """Per-day job number counter of a job type (one row per job_type and day)"""
+    __tablename__ = 'job_code_sequences'
+    __table_args__ = {'schema': 'ngs'}
+    
+    job_type = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<JobCodeSequence {self.job_type} {self.day}: {self.last_value}>'
+
+
+class MaintenanceTask(db.Model):
+    """Run state and cross-worker lease of a scheduled maintenance task"""
+    __tablename__ = 'maintenance_tasks'
+    __table_args__ = {'schema': 'ngs'}
+    
+    name = db.Column(db.String(50), primary_key=True)
+    interval_seconds = db.Column(db.Integer, nullable=False)
+    lease_owner = db.Column(db.String(100))
+    lease_until = db.Column(db.DateTime)
+    last_started_at = db.Column(db.DateTime)
+    last_finished_at = db.Column(db.DateTime)
+    last_duration = db.Column(db.Float)  # seconds
+    last_status = db.Column(db.String(20))  # ok, failed
+    last_error = db.Column(db.Text)
+    last_result = db.Column(db.JSON)
+    run_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<MaintenanceTask {self.name} ({self.last_status})>'
+
+
+class ScanSlot(db.Model):
+    """Cross-worker lease of one scan slot (global or per user)"""
+    __tablename__ = 'scan_slots'
+    __table_args__ = {'schema': 'ngs'}
+
+    name = db.Column(db.String(50), primary_key=True)  # global:<n> or user:<id>:<n>
+    lease_owner = db.Column(db.String(100))
+    lease_until = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<ScanSlot {self.name} ({self.lease_owner})>'
+
+
+class ScanTaskState(db.Model):
+    """Progress and results of a background sample scan, readable by every worker process"""
+    __tablename__ = 'scan_tasks'
+    __table_args__ = (
+        # Reuse of running or recent scans of the same folder
+        db.Index('ix_scan_tasks_folder_path_recursive_created_at', 'folder_path', 'recursive', 'created_at'),
+        db.Index('ix_scan_tasks_updated_at', 'updated_at'),
+        {'schema': 'ngs'}
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    folder_path = db.Column(db.String(1024), nullable=False)
+    recursive = db.Column(db.Boolean, nullable=False, default=False)
+    user_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False)  # queued, running, finished, failed
+    error = db.Column(db.Text)
+    dirs_visited = db.Column(db.Integer, nullable=False, default=0)
+    files_matched = db.Column(db.Integer, nullable=False, default=0)
+    sample_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    samples = db.Column(db.JSON)  # final sample dictionaries in traversal order (partial results: ScanTaskChunk)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))  # heartbeat of the running worker
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<ScanTaskState {self.id} {self.folder_path} ({self.status})>'
+
+
+class ScanTaskChunk(db.Model):
+    """Samples a running scan task found between two saves (appended, so saves do not grow with the result)"""
+    __tablename__ = 'scan_task_chunks'
+    __table_args__ = {'schema': 'ngs'}
+    
+    task_id = db.Column(db.String(32), db.ForeignKey('ngs.scan_tasks.id', ondelete='CASCADE'), primary_key=True)
+    start = db.Column(db.Integer, primary_key=True)  # index of the first sample in the task's sample list
+    sample_count = db.Column(db.Integer, nullable=False)
+    samples = db.Column(db.JSON, nullable=False)
+    
+    def __repr__(self):
+        return f'<ScanTaskChunk {self.task_id}[{self.start}:{self.start + self.sample_count}]>'
+
+
+
+class ReportManifest(db.Model):
+    """Report files of a finished job, indexed so the history never lists directories"""
+    __tablename__ = 'report_manifests'
+    __table_args__ = {'schema': 'ngs'}
+    
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    reports_path = db.Column(db.String(1024))
+    dir_mtime = db.Column(db.Float)  # mtime of reports_path when indexed, None if missing
+    reports = db.Column(db.JSON)  # list of {"name", "path"} sorted by name
+    indexed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<ReportManifest job={self.job_id} ({len(self.reports or [])} reports)>'
+
+
+class SampleCatalogEntry(db.Model):
+    """Parsed FASTQ sample keys of all scanned run folders for cross-run search"""
+    __tablename__ = 'sample_catalog'
+    __table_args__ = (
+        db.Index('ix_sample_catalog_sample_key', 'sample_key', postgresql_ops={'sample_key': 'text_pattern_ops'}),
+        db.Index('ix_sample_catalog_folder_path', 'folder_path', postgresql_ops={'folder_path': 'text_pattern_ops'}),
+        {'schema': 'ngs'}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sample_key = db.Column(db.String(255), nullable=False)  # lowercase probennummer for lookups
+    probennummer = db.Column(db.String(255), nullable=False)
+    source = db.Column(db.String(50))
+    run_date = db.Column(db.String(20))
+    analysis_type = db.Column(db.String(50))
+    folder_path = db.Column(db.String(1024), nullable=False)  # directory containing the FASTQ files
+    files = db.Column(db.JSON)
+    scanned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<SampleCatalogEntry {self.probennummer} in {self.folder_path}>'
+
+
+class RunMetadata(db.Model):
+    """Run metadata parsed from SampleSheet.csv/RunInfo.xml or IonTorrent run files"""
+    __tablename__ = 'run_metadata'
+    __table_args__ = {'schema': 'ngs'}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_path = db.Column(db.String(1024), unique=True, nullable=False)
+    platform = db.Column(db.String(20))  # illumina, iontorrent
+    run_id = db.Column(db.String(255))
+    instrument = db.Column(db.String(255))
+    flowcell = db.Column(db.String(255))
+    run_date = db.Column(db.String(20))  # YYYY-MM-DD
+    experiment_name = db.Column(db.String(255))
+    samples = db.Column(db.JSON)  # lowercase sample id -> sample details
+    source_files = db.Column(db.JSON)  # file name -> mtime_ns when parsed
+    parsed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<RunMetadata {self.run_id or self.run_path}>'
+
+
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID for Flask-Login"""
+    """Load user by ID for Flask-Login (cached identity, see app.core.user_cache)"""
+    from app.core.user_cache import user_cache
     try:
-        return User.query.get(int(user_id))
+        return user_cache.get(int(user_id))
     except Exception as e:
         import logging
         logging.getLogger('auth').error(f"Error loading user {user_id}: {e}")
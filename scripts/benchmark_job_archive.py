@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# scripts/benchmark_job_archive.py
+"""
+Benchmark of the job archive
+
+Grows the job history in steps with synthetic finished jobs and measures
+the latency of the hot-table queries (history first page, jobs of today,
+running job lookup) before and after archiving. With the archive the
+latencies should stay flat while the history grows.
+
+Only run this against a scratch database: synthetic jobs (job_type
+'bench') are inserted into analysis_jobs and removed again at the end.
+
+Usage:
+    python scripts/benchmark_job_archive.py --database-url postgresql://.../ngs_bench
+        [--steps 10000,50000,100000] [--recent 2000] [--repeat 20] [--keep]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import importlib.util
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(database_url):
+    """Create the Flask app from app.py (the app package shadows the module name)"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['MAINTENANCE_ENABLED'] = 'false'
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location('ngs_app', os.path.join(ROOT, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def insert_jobs(db, AnalysisJob, user_id, count, start, end, offset, status='finished'):
+    """Insert synthetic jobs with creation times spread between start and end"""
+    span = (end - start).total_seconds()
+    samples = [f"BENCH-{i:05d}" for i in range(200)]
+    rows = []
+    for number in range(offset, offset + count):
+        created_at = start + timedelta(seconds=random.random() * span)
+        rows.append({
+            'user_id': user_id,
+            'job_type': 'bench',
+            'job_code': f"bench_{number:09d}",
+            'run_name': f"Benchmark {number}",
+            'parameters': {'input_path': f"/tmp/bench/{number}", 'samples': samples},
+            'status': status,
+            'progress': 100,
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+        if len(rows) == 5000:
+            db.session.execute(db.insert(AnalysisJob), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(AnalysisJob), rows)
+    db.session.commit()
+
+
+def restore_archived(db, AnalysisJob, AnalysisJobArchive, columns):
+    """Move synthetic jobs back from the archive (history without archiving)"""
+    db.session.execute(db.insert(AnalysisJob).from_select(
+        list(columns),
+        db.select(*(getattr(AnalysisJobArchive, column) for column in columns)).where(
+            AnalysisJobArchive.job_type == 'bench')
+    ))
+    db.session.query(AnalysisJobArchive).filter(AnalysisJobArchive.job_type == 'bench').delete(synchronize_session=False)
+    db.session.commit()
+
+
+def measure(func, repeat):
+    """Median latency of func in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True, help='Scratch database (never production)')
+    parser.add_argument('--steps', default='10000,50000,100000', help='Total synthetic history sizes')
+    parser.add_argument('--recent', type=int, default=2000, help='Jobs within the retention window')
+    parser.add_argument('--retention-days', type=int, default=180)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='Keep the synthetic jobs')
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+
+    from sqlalchemy import func
+    from extensions import db
+    from models import AnalysisJob, AnalysisJobArchive, User
+    from app.history.archive import archive_jobs, ARCHIVED_COLUMNS
+    from app.history.query import fetch_history_page
+
+    with app.app_context():
+        user = db.session.query(User).order_by(User.id).first()
+        if user is None:
+            sys.exit("Die Datenbank enthält keinen Benutzer")
+
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=args.retention_days)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        queries = {
+            'history_page': lambda: fetch_history_page(10),
+            'history_page_bench': lambda: fetch_history_page(10, job_type='bench'),
+            'jobs_today': lambda: db.session.query(func.count(AnalysisJob.id)).filter(
+                AnalysisJob.created_at >= today).scalar(),
+            'running_job': lambda: db.session.query(AnalysisJob).filter(
+                AnalysisJob.user_id == user.id, AnalysisJob.status == 'running').first()
+        }
+
+        insert_jobs(db, AnalysisJob, user.id, args.recent, cutoff + timedelta(days=1), now, 0)
+        inserted = args.recent
+
+        print(f"{'history':>10} {'hot rows':>10} {'phase':>8} " + ' '.join(f"{name:>20}" for name in queries))
+        try:
+            for total in (int(step) for step in args.steps.split(',')):
+                restore_archived(db, AnalysisJob, AnalysisJobArchive, ARCHIVED_COLUMNS)
+                if total > inserted:
+                    old = total - inserted
+                    insert_jobs(db, AnalysisJob, user.id, old, cutoff - timedelta(days=3 * 365), cutoff - timedelta(days=1), inserted)
+                    inserted += old
+
+                for phase in ('before', 'after'):
+                    if phase == 'after':
+                        while archive_jobs(args.retention_days, batch_size=5000, max_batches=100):
+                            pass
+                    db.session.expire_all()
+                    hot_rows = db.session.query(func.count(AnalysisJob.id)).scalar()
+                    latencies = [measure(query, args.repeat) for query in queries.values()]
+                    print(f"{total:>10} {hot_rows:>10} {phase:>8} " + ' '.join(f"{ms:>17.2f} ms" for ms in latencies))
+        finally:
+            if not args.keep:
+                db.session.query(AnalysisJob).filter(AnalysisJob.job_type == 'bench').delete(synchronize_session=False)
+                db.session.query(AnalysisJobArchive).filter(AnalysisJobArchive.job_type == 'bench').delete(synchronize_session=False)
+                db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
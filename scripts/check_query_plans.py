@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# scripts/check_query_plans.py
+"""
+Query plan regression check
+
+Runs the hot job queries against a database and fails (exit code 1) if
+one of them reads analysis_jobs, the archive or the job index tables with
+a full scan. Suitable for CI against a scratch Postgres or SQLite database;
+missing tables are created on startup. On SQLite the ngs schema of the
+models is attached as a second database file next to the main one
+(<file>-ngs, in memory for in-memory databases).
+
+Usage:
+    python scripts/check_query_plans.py --database-url postgresql://.../ngs_test [--verbose]
+    python scripts/check_query_plans.py --database-url sqlite:////tmp/ngs_plans.db
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def attach_ngs_schema(dbapi_connection, connection_record):
+    """Attach the ngs schema to new SQLite connections (Postgres has it as a real schema)"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    main = next(row[2] for row in dbapi_connection.execute("PRAGMA database_list") if row[1] == 'main')
+    dbapi_connection.execute("ATTACH DATABASE ? AS ngs", (f"{main}-ngs" if main else ':memory:',))
+
+
+def load_app(database_url):
+    """Create the Flask app from app.py (the app package shadows the module name)"""
+    if database_url.startswith('sqlite'):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        # Before the app is loaded, it creates the tables on startup
+        event.listen(Engine, 'connect', attach_ngs_schema)
+
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['MAINTENANCE_ENABLED'] = 'false'
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location('ngs_app', os.path.join(ROOT, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--verbose', action='store_true', help='Print the plans of all statements')
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+    from app.metrics.query_plans import check_query_plans
+
+    with app.app_context():
+        result = check_query_plans()
+
+    for query in result['queries']:
+        status = 'OK  ' if query['ok'] else 'FAIL'
+        if 'error' in query:
+            print(f"{status} {query['query']}: {query['error']}")
+            continue
+        detail = f" full scan of {', '.join(query['full_scans'])}" if query['full_scans'] else ''
+        print(f"{status} {query['query']}{detail}")
+        if args.verbose or not query['ok']:
+            print(f"     {query['statement']}")
+            for line in query['plan']:
+                print(f"       {line}")
+
+    print(f"{len(result['queries'])} statements checked on {result['dialect']}: {'ok' if result['ok'] else 'regressions found'}")
+    sys.exit(0 if result['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
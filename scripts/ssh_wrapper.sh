@@ -5,8 +5,16 @@ set -euo pipefail
 
 # Configuration
 REMOTE_USER="odin"
-MUBAC_HOST="10.20.30.216"
-SPECDIFF_HOST="10.20.30.217"
+ENV_FILE="/opt/ngs_webinterface/.env"
+
+# Compute hosts come from the app config (WGS_HOST / SPECIES_HOST, set by
+# ssh_command); manual calls read them from the .env file
+if { [ -z "${WGS_HOST:-}" ] || [ -z "${SPECIES_HOST:-}" ]; } && [ -f "$ENV_FILE" ]; then
+    WGS_HOST="${WGS_HOST:-$(sed -n 's/^WGS_HOST=//p' "$ENV_FILE" | tail -n 1)}"
+    SPECIES_HOST="${SPECIES_HOST:-$(sed -n 's/^SPECIES_HOST=//p' "$ENV_FILE" | tail -n 1)}"
+fi
+MUBAC_HOST="${WGS_HOST:?WGS_HOST not set (config.py / .env)}"
+SPECDIFF_HOST="${SPECIES_HOST:?SPECIES_HOST not set (config.py / .env)}"
 REMOTE_HOST="$MUBAC_HOST"  # Default host; can be changed based on analysis
 KEY="/opt/ngs_webinterface/.ssh/.sshKey"
 TIMEOUT=30
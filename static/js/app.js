@@ -58,7 +58,15 @@ const CONFIG = {
   LOG_UPDATE_INTERVAL: 2000,
   STATUS_CHECK_INTERVAL: 3000,
   TOAST_DURATION: 5000,
-  DOUBLE_CLICK_TIMEOUT: 300
+  DOUBLE_CLICK_TIMEOUT: 300,
+  SEARCH_DEBOUNCE: 300,
+  SEARCH_MIN_LENGTH: 2,
+  BROWSE_LEVELS: 2,
+  SCAN_POLL_INTERVAL: 1000,
+  SIZE_POLL_INTERVAL: 2000,
+  SIZE_POLL_ATTEMPTS: 15,
+  PREFLIGHT_POLL_INTERVAL: 2000,
+  STATS_POLL_INTERVAL: 5000
 };
 
 // ============================================================================
@@ -143,6 +151,12 @@ class NGSInterface {
       selectedRunFolder: null,
       runFolderModalSelected: null,
       selectedAnalysisType: null,
+      preflightPassed: false,
+      folderCache: new Map(),
+      scanToken: 0,
+      historyCursor: null,
+      usersCursor: null,
+      logCursor: null,
       intervals: []
     };
     
@@ -175,18 +189,23 @@ class NGSInterface {
       'selectedRunFolder',
       'sampleSection',
       'sampleTable',
+      'scanProgress',
       'runFolderModal',
       'runFolderList',
       'runCurrentPath',
+      'sampleSearchInput',
       'folderLoading',
       'historyTableBody',
       'historyLoading',
+      'historyLoadMoreBtn',
       'usersTableBody',
       'usersLoading',
+      'usersLoadMoreBtn',
       'logOutput',
       'progressBar',
       'analysisBanner',
       'logContent',
+      'logOlderBtn',
       'logFileSelect'
     ];
 
@@ -209,6 +228,26 @@ class NGSInterface {
       openRunFolderBtn.addEventListener('click', () => this.openRunFolderBrowser());
     }
 
+    // Cross-run sample search
+    if (this.elements.sampleSearchInput) {
+      let searchTimeout;
+      this.elements.sampleSearchInput.addEventListener('input', () => {
+        clearTimeout(searchTimeout);
+        searchTimeout = setTimeout(() => this.searchSamples(), CONFIG.SEARCH_DEBOUNCE);
+      });
+    }
+
+    // Sample statistics button
+    const loadSampleStatsBtn = document.getElementById('loadSampleStatsBtn');
+    if (loadSampleStatsBtn) {
+      loadSampleStatsBtn.addEventListener('click', () => {
+        if (this.state.selectedRunFolder) {
+          Utils.showToast('Berechne Read-Statistiken...', 'info');
+          this.loadSamples(this.state.selectedRunFolder, true);
+        }
+      });
+    }
+
     // Confirm run folder button
     const confirmRunFolderBtn = document.getElementById('confirmRunFolderBtn');
     if (confirmRunFolderBtn) {
@@ -220,6 +259,13 @@ class NGSInterface {
       this.elements.analysisForm.addEventListener('submit', (e) => {
         if (!this.validateAnalysisForm()) {
           e.preventDefault();
+          return;
+        }
+
+        // Check inputs locally before the job occupies a pipeline slot
+        if (!this.state.preflightPassed) {
+          e.preventDefault();
+          this.runPreflight();
         }
       });
     }
@@ -236,6 +282,30 @@ class NGSInterface {
       refreshHistoryBtn.addEventListener('click', () => this.loadAnalysisHistory());
     }
 
+    // History filters and paging
+    let historyFilterTimeout;
+    ['historyRunName', 'historyUser'].forEach(id => {
+      const input = document.getElementById(id);
+      if (input) {
+        input.addEventListener('input', () => {
+          clearTimeout(historyFilterTimeout);
+          historyFilterTimeout = setTimeout(() => this.loadAnalysisHistory(), CONFIG.SEARCH_DEBOUNCE);
+        });
+      }
+    });
+
+    ['historyStatus', 'historyJobType', 'historyDateFrom', 'historyDateTo', 'historyCount'].forEach(id => {
+      const input = document.getElementById(id);
+      if (input) {
+        input.addEventListener('change', () => this.loadAnalysisHistory());
+      }
+    });
+
+    const historyLoadMoreBtn = document.getElementById('historyLoadMoreBtn');
+    if (historyLoadMoreBtn) {
+      historyLoadMoreBtn.addEventListener('click', () => this.loadAnalysisHistory(true));
+    }
+
     // Users tab
     const usersTab = document.getElementById('users-tab');
     if (usersTab) {
@@ -248,6 +318,28 @@ class NGSInterface {
       refreshUsersBtn.addEventListener('click', () => this.loadUsers());
     }
 
+    // User filters and paging
+    let usersSearchTimeout;
+    const usersSearch = document.getElementById('usersSearch');
+    if (usersSearch) {
+      usersSearch.addEventListener('input', () => {
+        clearTimeout(usersSearchTimeout);
+        usersSearchTimeout = setTimeout(() => this.loadUsers(), CONFIG.SEARCH_DEBOUNCE);
+      });
+    }
+
+    ['usersRole', 'usersSort'].forEach(id => {
+      const input = document.getElementById(id);
+      if (input) {
+        input.addEventListener('change', () => this.loadUsers());
+      }
+    });
+
+    const usersLoadMoreBtn = document.getElementById('usersLoadMoreBtn');
+    if (usersLoadMoreBtn) {
+      usersLoadMoreBtn.addEventListener('click', () => this.loadUsers(true));
+    }
+
     // Create user button
     const createUserBtn = document.getElementById('createUserBtn');
     if (createUserBtn) {
@@ -285,6 +377,11 @@ class NGSInterface {
       });
     }
 
+    // Older log lines (also from rotated files)
+    if (this.elements.logOlderBtn) {
+      this.elements.logOlderBtn.addEventListener('click', () => this.loadOlderLogLines());
+    }
+
     // Confirm buttons with data-confirm attribute
     document.querySelectorAll('[data-confirm]').forEach(btn => {
       btn.addEventListener('click', (e) => {
@@ -380,6 +477,9 @@ class NGSInterface {
       this.elements.selectedRunFolderInput.value = '';
     }
     
+    // Stop polling a scan of the previous folder
+    this.state.scanToken++;
+    
     if (this.elements.sampleSection) {
       this.elements.sampleSection.style.display = 'none';
     }
@@ -396,6 +496,11 @@ class NGSInterface {
     }
     
     this.state.runFolderModalSelected = null;
+    this.state.folderCache.clear();
+
+    if (this.elements.sampleSearchInput) {
+      this.elements.sampleSearchInput.value = '';
+    }
     
     if (this.modalInstances.runFolderModal) {
       this.modalInstances.runFolderModal.show();
@@ -411,10 +516,17 @@ class NGSInterface {
     }
 
     try {
-      this.elements.folderLoading.style.display = 'block';
       this.elements.runFolderList.innerHTML = '';
 
-      const data = await Utils.fetchJSON(`/browse_folder?path=${encodeURIComponent(path)}`);
+      // Nested listings from earlier responses allow navigation without a round-trip
+      let data = this.state.folderCache.get(path);
+      if (!data) {
+        this.elements.folderLoading.style.display = 'block';
+        data = await Utils.fetchJSON(
+          `/browse_folder?path=${encodeURIComponent(path)}&levels=${CONFIG.BROWSE_LEVELS}&counts=true`
+        );
+        this.cacheFolderListing(data.current, data.folders);
+      }
       
       if (this.elements.runCurrentPath) {
         this.elements.runCurrentPath.textContent = data.current;
@@ -431,10 +543,12 @@ class NGSInterface {
 
       // Folders
       data.folders.forEach(folder => {
-        const item = this.createFolderItem(folder.name, folder.path, 'fas fa-folder text-transparent');
+        const item = this.createFolderItem(folder.name, folder.path, 'fas fa-folder text-transparent', false, folder.child_count);
         this.elements.runFolderList.appendChild(item);
       });
 
+      this.loadFolderSizes(data.current);
+
     } catch (error) {
       console.error('Fehler beim Laden der Ordner:', error);
       this.elements.runFolderList.innerHTML = `
@@ -447,7 +561,78 @@ class NGSInterface {
     }
   }
 
-  createFolderItem(name, path, iconClass, isBack = false) {
+  async loadFolderSizes(path, attempt = 0) {
+    // Sizes are computed in the background; poll until all are known
+    try {
+      const data = await Utils.fetchJSON(`/browse_folder?path=${encodeURIComponent(path)}&sizes=true`);
+
+      if (!this.elements.runCurrentPath || this.elements.runCurrentPath.textContent !== data.current) {
+        return;
+      }
+
+      data.folders.forEach(folder => {
+        const item = this.elements.runFolderList.querySelector(`li[data-path="${CSS.escape(folder.path)}"]`);
+        const sizeLabel = item && item.querySelector('.folder-size');
+        if (sizeLabel) {
+          sizeLabel.textContent = folder.size_pending ? '…' : folder.size;
+          sizeLabel.title = folder.size_pending ? 'Größe wird berechnet' : `${folder.file_count.toLocaleString('de-DE')} Dateien`;
+        }
+      });
+
+      if (data.sizes_pending && attempt < CONFIG.SIZE_POLL_ATTEMPTS) {
+        setTimeout(() => this.loadFolderSizes(path, attempt + 1), CONFIG.SIZE_POLL_INTERVAL);
+      }
+    } catch (error) {
+      console.error('Fehler beim Laden der Ordnergrößen:', error);
+    }
+  }
+
+  async searchSamples() {
+    const query = this.elements.sampleSearchInput.value.trim();
+    const basePath = CONFIG.ANALYSIS_TYPES[this.state.selectedAnalysisType].basePath;
+
+    if (query.length < CONFIG.SEARCH_MIN_LENGTH) {
+      await this.fetchRunFolder(this.elements.runCurrentPath.textContent || basePath);
+      return;
+    }
+
+    try {
+      const params = new URLSearchParams({ q: query, analysis_type: this.state.selectedAnalysisType });
+      const data = await Utils.fetchJSON(`/api/samples/search?${params}`);
+
+      this.elements.runFolderList.innerHTML = '';
+
+      if (!data.results.length) {
+        this.elements.runFolderList.innerHTML = `
+          <li class="list-group-item text-muted">Keine Proben gefunden</li>
+        `;
+        return;
+      }
+
+      data.results.forEach(result => {
+        const label = `${result.probennummer} – ${result.folder_path}`;
+        const item = this.createFolderItem(label, result.folder_path, 'fas fa-vial text-transparent');
+        this.elements.runFolderList.appendChild(item);
+      });
+
+    } catch (error) {
+      console.error('Fehler bei der Probensuche:', error);
+      Utils.showToast(`Fehler bei der Probensuche: ${error.message}`, 'danger');
+    }
+  }
+
+  cacheFolderListing(path, folders) {
+    this.state.folderCache.set(path, { current: path, folders });
+
+    // Only nested levels are complete listings of their parent
+    folders.forEach(folder => {
+      if (Array.isArray(folder.children)) {
+        this.cacheFolderListing(folder.path, folder.children);
+      }
+    });
+  }
+
+  createFolderItem(name, path, iconClass, isBack = false, childCount = undefined) {
     const li = document.createElement('li');
     li.className = 'list-group-item list-group-item-action d-flex align-items-center';
     
@@ -460,6 +645,21 @@ class NGSInterface {
     li.appendChild(icon);
     li.appendChild(span);
 
+    if (!isBack) {
+      li.dataset.path = path;
+
+      const sizeLabel = document.createElement('small');
+      sizeLabel.className = 'folder-size text-muted ms-auto';
+      li.appendChild(sizeLabel);
+    }
+
+    if (childCount !== undefined) {
+      const badge = document.createElement('span');
+      badge.className = 'badge bg-light text-muted ms-2';
+      badge.textContent = childCount;
+      li.appendChild(badge);
+    }
+
     if (this.state.runFolderModalSelected === path && !isBack) {
       li.classList.add('selected');
     }
@@ -522,12 +722,19 @@ class NGSInterface {
   // SAMPLE LOADING
   // --------------------------------------------------------------------------
 
-  async loadSamples(path) {
+  async loadSamples(path, withStats = false) {
+    if (!withStats) {
+      return this.scanSamples(path);
+    }
+
+    // A newer scan or stats request (or folder reset) stops polling for this one
+    const token = ++this.state.scanToken;
+
     try {
       const response = await fetch('/get_samples', {
         method: 'POST',
         headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
-        body: `folder_path=${encodeURIComponent(path)}&recursive=true`
+        body: `folder_path=${encodeURIComponent(path)}&recursive=true&stats=${withStats}`
       });
 
       if (!response.ok) {
@@ -545,12 +752,26 @@ class NGSInterface {
         return;
       }
 
+      if (token !== this.state.scanToken) {
+        return;
+      }
+
       this.renderSampleTable(data.samples);
       
       if (this.elements.sampleSection) {
         this.elements.sampleSection.style.display = 'block';
       }
       
+      // Statistics are computed in the background; ask again until all are done
+      if (data.stats_pending) {
+        setTimeout(() => {
+          if (token === this.state.scanToken) {
+            this.loadSamples(path, true);
+          }
+        }, CONFIG.STATS_POLL_INTERVAL);
+        return;
+      }
+
       Utils.showToast(`${data.samples.length} Proben gefunden`, 'success');
 
     } catch (error) {
@@ -563,6 +784,99 @@ class NGSInterface {
     }
   }
 
+  async scanSamples(path) {
+    // A newer scan (or folder reset) invalidates this one
+    const token = ++this.state.scanToken;
+    const samples = [];
+
+    try {
+      let response = await fetch('/api/scan_tasks', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
+        body: `folder_path=${encodeURIComponent(path)}&recursive=true`
+      });
+      let data = await response.json();
+
+      if (!response.ok) {
+        throw new Error(data.error || `HTTP ${response.status}`);
+      }
+
+      while (token === this.state.scanToken) {
+        if (data.samples.length > 0) {
+          samples.push(...data.samples);
+          this.renderSampleTable(samples);
+          if (this.elements.sampleSection) {
+            this.elements.sampleSection.style.display = 'block';
+          }
+        }
+        this.updateScanProgress(data);
+
+        if (data.status === 'failed') {
+          throw new Error(data.error || 'Suche fehlgeschlagen');
+        }
+        if (data.status === 'finished') {
+          break;
+        }
+
+        await new Promise(resolve => setTimeout(resolve, CONFIG.SCAN_POLL_INTERVAL));
+        if (token !== this.state.scanToken) {
+          return;
+        }
+
+        response = await fetch(`/api/scan_tasks/${data.task_id}?offset=${samples.length}`);
+        data = await response.json();
+
+        if (!response.ok) {
+          throw new Error(data.error || `HTTP ${response.status}`);
+        }
+      }
+
+      if (token !== this.state.scanToken) {
+        return;
+      }
+
+      if (samples.length === 0) {
+        Utils.showToast('Keine FASTQ-Dateien in diesem Ordner (und Unterordnern) gefunden', 'warning');
+        if (this.elements.sampleSection) {
+          this.elements.sampleSection.style.display = 'none';
+        }
+        return;
+      }
+
+      Utils.showToast(`${samples.length} Proben gefunden`, 'success');
+
+    } catch (error) {
+      if (token !== this.state.scanToken) {
+        return;
+      }
+      console.error('Fehler beim Laden der Proben:', error);
+      Utils.showToast(`Fehler beim Laden der Proben: ${error.message}`, 'danger');
+      this.updateScanProgress(null);
+
+      if (this.elements.sampleSection && samples.length === 0) {
+        this.elements.sampleSection.style.display = 'none';
+      }
+    }
+  }
+
+  updateScanProgress(task) {
+    const progress = this.elements.scanProgress;
+    if (!progress) {
+      return;
+    }
+
+    if (!task || task.status === 'finished') {
+      progress.textContent = '';
+      return;
+    }
+
+    progress.innerHTML = `
+      <i class="fas fa-spinner fa-spin me-1"></i>
+      ${task.dirs_visited.toLocaleString('de-DE')} Ordner durchsucht,
+      ${task.files_matched.toLocaleString('de-DE')} FASTQ-Dateien
+    `;
+  }
+
   renderSampleTable(samples) {
     if (!this.elements.sampleTable) {
       return;
@@ -573,6 +887,9 @@ class NGSInterface {
       return;
     }
 
+    const withStats = samples.some(sample => sample.stats);
+    this.elements.sampleTable.classList.toggle('show-stats', withStats);
+
     tbody.innerHTML = samples.map((sample, index) => {
       const icon = CONFIG.SOURCE_ICONS[sample.source] || '<i class="fas fa-question-circle"></i>';
       
@@ -585,12 +902,34 @@ class NGSInterface {
             </span>
           </td>
           <td><code>${Utils.escapeHtml(sample.probennummer)}</code></td>
+          ${withStats ? this.createSampleStatsCells(sample.stats) : ''}
           <input type="hidden" name="selected_samples" value="${Utils.escapeHtml(sample.probennummer)}">
         </tr>
       `;
     }).join('');
   }
 
+  createSampleStatsCells(stats) {
+    if (stats && stats.pending) {
+      return `<td colspan="4" class="text-muted"><small>Wird berechnet (${stats.done}/${stats.files} Dateien)...</small></td>`;
+    }
+
+    if (!stats || stats.errors) {
+      const message = stats && stats.errors ? stats.errors.join('; ') : 'Keine Statistik';
+      return `<td colspan="4" class="text-danger"><small>${Utils.escapeHtml(message)}</small></td>`;
+    }
+
+    const number = value => value === null ? '-' : value.toLocaleString('de-DE');
+    const prefix = stats.sampled ? '≥ ' : '';
+
+    return `
+      <td>${prefix}${number(stats.read_count)}</td>
+      <td>${prefix}${number(stats.total_bases)}</td>
+      <td>${number(stats.mean_length)}</td>
+      <td>${number(stats.mean_quality)}</td>
+    `;
+  }
+
   // --------------------------------------------------------------------------
   // FORM VALIDATION
   // --------------------------------------------------------------------------
@@ -609,16 +948,96 @@ class NGSInterface {
     return true;
   }
 
+  async runPreflight() {
+    const form = this.elements.analysisForm;
+    const submitBtn = form.querySelector('[type="submit"]');
+
+    try {
+      if (submitBtn) {
+        submitBtn.disabled = true;
+      }
+      Utils.showToast('Prüfe FASTQ-Dateien...', 'info');
+
+      let data;
+      while (true) {
+        const response = await fetch('/api/preflight', {
+          method: 'POST',
+          body: new URLSearchParams(new FormData(form))
+        });
+        data = await response.json();
+
+        if (!response.ok) {
+          throw new Error(data.error || `HTTP ${response.status}`);
+        }
+
+        // gzip integrity is checked in the background; ask again until all files are done
+        if (!data.ok || !data.pending_files) {
+          break;
+        }
+        Utils.showToast(`Prüfe gzip-Integrität (${data.pending_files} Dateien ausstehend)...`, 'info');
+        await new Promise(resolve => setTimeout(resolve, CONFIG.PREFLIGHT_POLL_INTERVAL));
+      }
+
+      if (!data.ok) {
+        const shown = data.errors.slice(0, 5).join('; ');
+        const more = data.errors.length > 5 ? ` (+${data.errors.length - 5} weitere)` : '';
+        Utils.showToast(`Eingabeprüfung fehlgeschlagen: ${shown}${more}`, 'danger');
+        return;
+      }
+
+      this.state.preflightPassed = true;
+      form.submit();
+
+    } catch (error) {
+      console.error('Fehler bei der Eingabeprüfung:', error);
+      Utils.showToast(`Fehler bei der Eingabeprüfung: ${error.message}`, 'danger');
+    } finally {
+      if (submitBtn) {
+        submitBtn.disabled = false;
+      }
+    }
+  }
+
   // --------------------------------------------------------------------------
   // ANALYSIS HISTORY
   // --------------------------------------------------------------------------
 
-  async loadAnalysisHistory() {
+  getHistoryParams(append) {
+    const params = new URLSearchParams();
+    const value = id => (document.getElementById(id)?.value || '').trim();
+
+    const limit = parseInt(value('historyCount'), 10);
+    if (limit > 0) {
+      params.set('limit', limit);
+    }
+
+    [
+      ['run_name', 'historyRunName'],
+      ['status', 'historyStatus'],
+      ['job_type', 'historyJobType'],
+      ['user', 'historyUser'],
+      ['date_from', 'historyDateFrom'],
+      ['date_to', 'historyDateTo']
+    ].forEach(([name, id]) => {
+      if (value(id)) {
+        params.set(name, value(id));
+      }
+    });
+
+    if (append && this.state.historyCursor) {
+      params.set('cursor', this.state.historyCursor);
+    }
+
+    return params;
+  }
+
+  async loadAnalysisHistory(append = false) {
     if (!this.elements.historyLoading || !this.elements.historyTableBody) {
       return;
     }
 
     const refreshBtn = document.getElementById('refreshHistoryBtn');
+    const loadMoreBtn = this.elements.historyLoadMoreBtn;
 
     try {
       this.elements.historyLoading.style.display = 'block';
@@ -628,17 +1047,18 @@ class NGSInterface {
         refreshBtn.innerHTML = '<div class="loading-spinner me-1"></div>Laden...';
       }
 
-      const data = await Utils.fetchJSON('/api/analysis_history');
+      const data = await Utils.fetchJSON(`/api/analysis_history?${this.getHistoryParams(append)}`);
+      const rows = (data.jobs || []).map(job => this.createHistoryRow(job)).join('');
+
+      this.state.historyCursor = data.next_cursor || null;
+      if (loadMoreBtn) {
+        loadMoreBtn.style.display = this.state.historyCursor ? 'inline-block' : 'none';
+      }
       
-      if (data.jobs && data.jobs.length > 0) {
-        this.elements.historyTableBody.innerHTML = data.jobs.map(job => 
-          this.createHistoryRow(job)
-        ).join('');
-        
-        const countBadge = document.getElementById('historyCount');
-        if (countBadge) {
-          countBadge.value = data.jobs.length;
-        }
+      if (append) {
+        this.elements.historyTableBody.insertAdjacentHTML('beforeend', rows);
+      } else if (rows) {
+        this.elements.historyTableBody.innerHTML = rows;
       } else {
         this.elements.historyTableBody.innerHTML = `
           <tr>
@@ -811,12 +1231,35 @@ class NGSInterface {
   // USER MANAGEMENT
   // --------------------------------------------------------------------------
 
-  async loadUsers() {
+  getUsersParams(append) {
+    const params = new URLSearchParams();
+    const value = id => (document.getElementById(id)?.value || '').trim();
+
+    if (value('usersSearch')) {
+      params.set('search', value('usersSearch'));
+    }
+    if (value('usersRole')) {
+      params.set('role', value('usersRole'));
+    }
+
+    const [sort, order] = (value('usersSort') || 'username:asc').split(':');
+    params.set('sort', sort);
+    params.set('order', order);
+
+    if (append && this.state.usersCursor) {
+      params.set('cursor', this.state.usersCursor);
+    }
+
+    return params;
+  }
+
+  async loadUsers(append = false) {
     if (!this.elements.usersLoading || !this.elements.usersTableBody) {
       return;
     }
 
     const refreshBtn = document.getElementById('refreshUsersBtn');
+    const loadMoreBtn = this.elements.usersLoadMoreBtn;
 
     try {
       this.elements.usersLoading.style.display = 'block';
@@ -826,12 +1269,18 @@ class NGSInterface {
         refreshBtn.innerHTML = '<div class="loading-spinner me-1"></div>Laden...';
       }
 
-      const data = await Utils.fetchJSON('/api/users');
+      const data = await Utils.fetchJSON(`/api/users?${this.getUsersParams(append)}`);
+      const rows = (data.users || []).map(user => this.createUserRow(user)).join('');
+
+      this.state.usersCursor = data.next_cursor || null;
+      if (loadMoreBtn) {
+        loadMoreBtn.style.display = this.state.usersCursor ? 'inline-block' : 'none';
+      }
       
-      if (data.users && data.users.length > 0) {
-        this.elements.usersTableBody.innerHTML = data.users.map(user => 
-          this.createUserRow(user)
-        ).join('');
+      if (append) {
+        this.elements.usersTableBody.insertAdjacentHTML('beforeend', rows);
+      } else if (rows) {
+        this.elements.usersTableBody.innerHTML = rows;
       } else {
         this.elements.usersTableBody.innerHTML = `
           <tr>
@@ -1069,6 +1518,7 @@ class NGSInterface {
     try {
       const data = await Utils.fetchJSON(`/api/logs/${logType}`);
       this.elements.logContent.textContent = data.content || '(Kein Log verfügbar)';
+      this.setLogCursor(data.next_cursor);
       
       // Scroll to bottom
       this.elements.logContent.scrollTop = this.elements.logContent.scrollHeight;
@@ -1079,6 +1529,36 @@ class NGSInterface {
     }
   }
 
+  async loadOlderLogLines() {
+    if (!this.elements.logContent || !this.elements.logFileSelect || !this.state.logCursor) {
+      return;
+    }
+
+    const logType = this.elements.logFileSelect.value;
+
+    try {
+      const data = await Utils.fetchJSON(`/api/logs/${logType}?cursor=${encodeURIComponent(this.state.logCursor)}`);
+      
+      // Keep the visible lines in place while prepending
+      const previousHeight = this.elements.logContent.scrollHeight;
+      this.elements.logContent.textContent = (data.content || '') + this.elements.logContent.textContent;
+      this.elements.logContent.scrollTop += this.elements.logContent.scrollHeight - previousHeight;
+      
+      this.setLogCursor(data.next_cursor);
+      
+    } catch (error) {
+      console.error('Fehler beim Laden älterer Log-Einträge:', error);
+      Utils.showToast(`Fehler beim Laden des Logs: ${error.message}`, 'danger');
+    }
+  }
+
+  setLogCursor(cursor) {
+    this.state.logCursor = cursor || null;
+    if (this.elements.logOlderBtn) {
+      this.elements.logOlderBtn.style.display = this.state.logCursor ? 'inline-block' : 'none';
+    }
+  }
+
   refreshLogs() {
     if (this.elements.logFileSelect) {
       this.switchLogFile(this.elements.logFileSelect.value);
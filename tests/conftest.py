@@ -0,0 +1,119 @@
+# tests/conftest.py
+"""
+Test fixtures
+The app runs on SQLite files. The models live in the Postgres schema
+'ngs', which SQLite provides as an attached database next to each file.
+A second pair of files serves as the read replica bind.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import importlib.util
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = tempfile.mkdtemp(prefix='ngs-tests-')
+
+# Before anything imports config.py (test modules import app modules at collection)
+os.environ['DATABASE_URL'] = f"sqlite:///{DB_DIR}/primary.db"
+os.environ['REPLICA_DATABASE_URL'] = f"sqlite:///{DB_DIR}/replica.db"
+os.environ['MAINTENANCE_ENABLED'] = 'false'
+
+
+@event.listens_for(Engine, 'connect')
+def attach_ngs_schema(dbapi_connection, connection_record):
+    """Attach <file>-ngs as schema ngs to every SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    main = next(row[2] for row in dbapi_connection.execute("PRAGMA database_list") if row[1] == 'main')
+    dbapi_connection.execute("ATTACH DATABASE ? AS ngs", (f"{main}-ngs" if main else ':memory:',))
+
+
+def _load_app():
+    """Create the Flask app from app.py (the app package shadows the module name)"""
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location('ngs_app', os.path.join(ROOT, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return module.app
+
+
+@pytest.fixture(scope='session')
+def _app():
+    return _load_app()
+
+
+@pytest.fixture
+def app(_app):
+    """App with empty primary and replica databases, roles and an admin (odin/pw, id 1)"""
+    from werkzeug.security import generate_password_hash
+    from extensions import db
+    from models import Role, User
+    from app.core.audit import audit_log
+    from app.core.user_cache import user_cache
+
+    with _app.app_context():
+        audit_log.flush()
+        db.session.remove()
+        for engine in db.engines.values():
+            db.metadata.drop_all(engine)
+            db.metadata.create_all(engine)
+        db.session.add_all([Role(id=1, name='admin'), Role(id=2, name='user')])
+        db.session.add(User(id=1, username='odin', email='odin@example.org',
+                            password_hash=generate_password_hash('pw'), role_id=1))
+        db.session.commit()
+    user_cache.invalidate()
+
+    yield _app
+
+    with _app.app_context():
+        audit_log.flush()
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    """Test client logged in as the admin"""
+    client = app.test_client()
+    response = client.post('/login', data={'username': 'odin', 'password': 'pw'})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def make_job():
+    """Factory adding an analysis job (with its search index rows) in the current app context"""
+    from extensions import db
+    from models import AnalysisJob
+    from app.history.job_index import index_job_parameters
+
+    counter = iter(range(1, 1000000))
+
+    def make(user_id=1, status='finished', job_type='wgs', samples=('S1',), input_path='/data/wgs/run1',
+             created_at=None, commit=True):
+        number = next(counter)
+        job = AnalysisJob(
+            user_id=user_id,
+            job_type=job_type,
+            job_code=f"TEST_{job_type}_{number:05d}",
+            run_name=f"run{number}",
+            parameters={'samples': list(samples), 'input_path': input_path, 'sample_count': len(samples)},
+            status=status,
+            progress=100 if status == 'finished' else 0,
+            created_at=created_at or datetime.now(timezone.utc)
+        )
+        db.session.add(job)
+        db.session.flush()
+        index_job_parameters([job])
+        if commit:
+            db.session.commit()
+        return job
+
+    return make
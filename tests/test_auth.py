@@ -0,0 +1,47 @@
+# tests/test_auth.py
+"""Admin-only endpoints"""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+
+ADMIN_ENDPOINTS = [
+    ('get', '/api/users'),
+    ('delete', '/api/users/1'),
+    ('get', '/api/logs/app'),
+    ('get', '/api/metrics'),
+    ('post', '/api/maintenance/archive_jobs/run'),
+    ('get', '/api/job_stats'),
+    ('get', '/api/disk_usage')
+]
+
+
+@pytest.fixture
+def user_client(app):
+    """Test client logged in as a non-admin user"""
+    with app.app_context():
+        db.session.add(User(id=2, username='thor', email='thor@example.org',
+                            password_hash=generate_password_hash('pw'), role_id=2))
+        db.session.commit()
+    client = app.test_client()
+    assert client.post('/login', data={'username': 'thor', 'password': 'pw'}).status_code == 302
+    return client
+
+
+@pytest.mark.parametrize('method, url', ADMIN_ENDPOINTS)
+def test_admin_endpoints_reject_users(user_client, method, url):
+    response = getattr(user_client, method)(url)
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Keine Berechtigung'}
+
+
+def test_admin_passes(client):
+    assert client.get('/api/metrics').status_code == 200
+
+
+def test_endpoint_names_are_kept(app):
+    view = app.view_functions['users.api_get_user']
+    assert view.__name__ == 'api_get_user'
+    assert view.__doc__ == view.__wrapped__.__doc__
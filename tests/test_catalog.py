@@ -0,0 +1,25 @@
+# tests/test_catalog.py
+"""Cross-run sample search"""
+
+from app.analysis import catalog
+from app.analysis.catalog import update_catalog
+from app.analysis.services import AnalysisService
+
+
+def test_search_reads_the_catalog_without_scanning(app, monkeypatch):
+    def no_scan(*args, **kwargs):
+        raise AssertionError("search must not walk the base paths")
+    monkeypatch.setattr(catalog, 'extract_samples_with_details', no_scan)
+
+    with app.app_context():
+        update_catalog('/bacteria/run1', [
+            '/bacteria/run1/L-123_S1_L001_R1_001.fastq.gz',
+            '/bacteria/run1/L-123_S1_L001_R2_001.fastq.gz',
+            '/bacteria/run1/sub/L-123_S1_L001_R1_001.fastq.gz',
+        ], recursive=True)
+
+        with app.test_request_context():
+            results, error = AnalysisService.search_samples('12', exact=False)
+
+    assert error is None
+    assert sorted(result['folder_path'] for result in results) == ['/bacteria/run1', '/bacteria/run1/sub']
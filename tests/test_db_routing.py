@@ -0,0 +1,134 @@
+# tests/test_db_routing.py
+"""Read replica routing: read_only regions, read-your-writes window, locking reads and fallback"""
+
+import sqlite3
+import time
+
+import pytest
+from flask import g
+from sqlalchemy import event, select
+from sqlalchemy.exc import DBAPIError
+
+from extensions import db
+from models import Role, User
+from app.core import db_routing
+from app.core.db_routing import use_replica, use_primary, read_only
+
+
+@pytest.fixture
+def replica(app):
+    """Replica engine holding one user that the primary does not have"""
+    with app.app_context():
+        engine = db.engines['replica']
+        with engine.begin() as conn:
+            conn.execute(Role.__table__.insert(), [{'id': 1, 'name': 'admin'}, {'id': 2, 'name': 'user'}])
+            conn.execute(User.__table__.insert().values(id=2, username='replica-only', password_hash='x', role_id=2))
+    yield engine
+    db_routing._replica_down_until = 0.0
+
+
+def _usernames():
+    return db.session.scalars(select(User.username).order_by(User.id)).all()
+
+
+def test_reads_use_replica_only_inside_read_only(app, replica):
+    with app.test_request_context():
+        assert _usernames() == ['odin']
+        with use_replica():
+            assert _usernames() == ['replica-only']
+        assert read_only(_usernames)() == ['replica-only']
+
+
+def test_use_primary_covers_nested_read_only(app, replica):
+    with app.test_request_context():
+        with use_replica():
+            with use_primary():
+                assert read_only(_usernames)() == ['odin']
+            assert _usernames() == ['replica-only']
+
+
+def test_writes_and_locking_reads_use_primary(app, replica):
+    with app.test_request_context():
+        with use_replica():
+            assert db.session.scalars(select(User.username).with_for_update()).all() == ['odin']
+
+            db.session.add(User(id=3, username='new', password_hash='x', role_id=2))
+            db.session.commit()
+        assert _usernames() == ['odin', 'new']
+        with replica.connect() as conn:
+            assert conn.execute(select(User.username).order_by(User.id)).scalars().all() == ['replica-only']
+
+
+def test_read_your_writes_window(app, client, replica):
+    def listed():
+        response = client.get('/api/users')
+        assert response.status_code == 200
+        return [user['username'] for user in response.get_json()['users']]
+
+    with client.session_transaction() as session:
+        session.pop('db_primary_until', None)
+    assert listed() == ['replica-only']
+
+    response = client.post('/api/users', json={'username': 'fresh', 'email': 'fresh@example.org', 'password': 'Secret123!', 'role': 'user'})
+    assert response.status_code in (200, 201), response.get_json()
+    with client.session_transaction() as session:
+        assert session['db_primary_until'] > time.time()
+    assert 'fresh' in listed()
+
+    # Window over: back to the replica
+    with client.session_transaction() as session:
+        session['db_primary_until'] = time.time() - 1
+    assert listed() == ['replica-only']
+
+
+def test_unreachable_replica_falls_back_to_primary(app, client, replica):
+    def refuse(dialect, conn_rec, cargs, cparams):
+        raise sqlite3.OperationalError('unable to open database file')
+
+    replica.dispose()
+    event.listen(replica, 'do_connect', refuse)
+    try:
+        response = client.get('/api/users')
+        assert response.status_code == 200
+        assert [user['username'] for user in response.get_json()['users']] == ['odin']
+        assert not db_routing.replica_available()
+
+        # Reads keep using the primary without trying the replica again
+        with app.test_request_context():
+            with use_replica():
+                assert _usernames() == ['odin']
+    finally:
+        event.remove(replica, 'do_connect', refuse)
+        replica.dispose()
+
+
+def test_replica_error_during_read_only_call_is_repeated_on_primary(app, replica):
+    calls = []
+
+    @read_only
+    def usernames():
+        calls.append(g.get('db_replica'))
+        return _usernames()
+
+    def lose_connection(cursor, statement, parameters, context):
+        if len(calls) == 1:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+
+    event.listen(replica, 'do_execute', lose_connection)
+    try:
+        with app.test_request_context():
+            assert usernames() == ['odin']
+    finally:
+        event.remove(replica, 'do_execute', lose_connection)
+    assert calls == [True, False]
+
+
+def test_other_replica_errors_are_raised(app, replica):
+    @read_only
+    def broken():
+        return db.session.execute(select(User.username).where(db.text("no_such_column = 1"))).all()
+
+    with app.test_request_context():
+        with pytest.raises(DBAPIError):
+            broken()
+    assert db_routing.replica_available()
@@ -0,0 +1,30 @@
+# tests/test_disk_usage.py
+"""Disk usage cache pruning"""
+
+import time
+
+from app.analysis.disk_usage import DiskUsageCache
+
+
+def _tree(root, name):
+    run = root / name
+    (run / 'fastq' / 'lane1').mkdir(parents=True)
+    (run / 'fastq' / 'lane1' / 'S1_R1.fastq.gz').write_bytes(b'x' * 100)
+    (run / 'sample.csv').write_bytes(b'y' * 10)
+    return str(run)
+
+
+def test_prune_drops_directories_no_longer_sized(tmp_path):
+    cache = DiskUsageCache(max_workers=2)
+    kept, dropped = _tree(tmp_path, 'run1'), _tree(tmp_path, 'run2')
+    assert cache.compute(kept) == (110, 2)
+    assert cache.compute(dropped) == (110, 2)
+    assert len(cache._dirs) == 6
+
+    time.sleep(0.3)
+    cache.compute(kept)  # unchanged directories count as used
+    assert cache.prune(0.2) == 3 + 2  # run2's directories and totals (run2, run2/fastq)
+
+    assert sorted(cache._dirs) == [kept, f"{kept}/fastq", f"{kept}/fastq/lane1"]
+    assert cache.get(dropped, 3600) is None
+    assert cache.get(kept, 3600)[:2] == (110, 2)
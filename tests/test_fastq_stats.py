@@ -0,0 +1,29 @@
+# tests/test_fastq_stats.py
+"""FASTQ read statistics computed in the background"""
+
+import gzip
+import time
+
+from app.analysis.fastq_stats import get_files_stats, merge_stats, _stats_results
+
+RECORD = b'@read1\nACGTACGT\n+\nIIIIIIII\n'
+
+
+def test_stats_are_pending_then_cached(tmp_path):
+    path = tmp_path / 'L-1_S1_L001_R1_001.fastq.gz'
+    path.write_bytes(gzip.compress(RECORD * 50000))
+    files = [str(path)]
+
+    assert get_files_stats(files, max_workers=2) == {str(path): None}
+    # Asking again while the file is processed does not submit it twice
+    assert get_files_stats(files, max_workers=2) == {str(path): None}
+    assert len(_stats_results._inflight) == 1
+
+    deadline = time.monotonic() + 30
+    while (stats := get_files_stats(files, max_workers=2)[str(path)]) is None:
+        assert time.monotonic() < deadline, "stats were not computed"
+        time.sleep(0.05)
+
+    assert stats["read_count"] == 50000 and stats["mean_quality"] == 40.0
+    assert not _stats_results._inflight
+    assert merge_stats([stats, stats])["total_bases"] == 800000
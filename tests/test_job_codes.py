@@ -0,0 +1,34 @@
+# tests/test_job_codes.py
+"""Job code allocation"""
+
+from datetime import date
+
+from extensions import db
+from models import AnalysisJob
+from app.analysis.job_codes import next_job_code, reserve_job_codes
+
+DAY = date(2026, 10, 18)
+
+
+def test_new_counter_continues_after_highest_existing_code(app):
+    with app.app_context():
+        # _02 - _04 were deleted; counting the rest would hand out _03
+        for code in ('wgs261018_01', 'wgs261018_05', 'wgs261018_manual', 'species261018_09'):
+            db.session.add(AnalysisJob(user_id=1, job_type='wgs', job_code=code, status='finished'))
+        db.session.commit()
+
+        assert next_job_code('wgs', DAY) == 'wgs261018_06'
+        db.session.commit()
+        assert reserve_job_codes('wgs', 2, DAY) == ['wgs261018_07', 'wgs261018_08']
+        db.session.commit()
+        assert next_job_code('species', DAY) == 'species261018_10'
+        assert next_job_code('wgs', date(2026, 10, 19)) == 'wgs261019_01'
+
+
+def test_rollback_releases_reservation(app):
+    with app.app_context():
+        assert next_job_code('wgs', DAY) == 'wgs261018_01'
+        db.session.commit()
+        assert next_job_code('wgs', DAY) == 'wgs261018_02'
+        db.session.rollback()
+        assert next_job_code('wgs', DAY) == 'wgs261018_02'
@@ -0,0 +1,81 @@
+# tests/test_job_index.py
+"""Job parameter index: search, pagination, archive and deleted jobs"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func
+
+from extensions import db
+from models import User, JobInput, JobSample
+from app.history.archive import archive_jobs
+from app.core.db_routing import use_primary
+from app.history.job_index import search_jobs as _search_jobs, backfill_job_index
+
+
+def search_jobs(**filters):
+    # The tests write to the primary only; the replica stays empty
+    with use_primary():
+        return _search_jobs(**filters)
+
+
+def _all_pages(**filters):
+    pages, cursor = [], None
+    while True:
+        jobs, cursor = search_jobs(limit=2, cursor=cursor, **filters)
+        pages.append([job['run_name'] for job in jobs])
+        if cursor is None:
+            return pages
+
+
+def test_search_by_sample_and_input_path(app, make_job):
+    with app.app_context():
+        start = datetime.now(timezone.utc) - timedelta(hours=10)
+        make_job(samples=('L-123', 'NTC'), input_path='/data/wgs/run1', created_at=start)
+        make_job(samples=('L-124',), input_path='/data/wgs/run2', created_at=start + timedelta(hours=1))
+        make_job(samples=('L-123',), input_path='/data/species/run3', job_type='species',
+                 created_at=start + timedelta(hours=2))
+
+        assert [job['run_name'] for job in search_jobs(sample='L-123')[0]] == ['run3', 'run1']
+        assert [job['run_name'] for job in search_jobs(sample='L-12', sample_prefix=True)[0]] == ['run3', 'run2', 'run1']
+        assert [job['run_name'] for job in search_jobs(input_path='/data/wgs/')[0]] == ['run2', 'run1']
+        assert [job['run_name'] for job in search_jobs(min_samples=2)[0]] == ['run1']
+        assert [job['run_name'] for job in search_jobs(job_type='species')[0]] == ['run3']
+
+
+def test_deleting_a_user_removes_index_rows_of_their_jobs(app, make_job):
+    with app.app_context():
+        db.session.add(User(id=2, username='gone', password_hash='x', role_id=2))
+        db.session.commit()
+
+        start = datetime.now(timezone.utc) - timedelta(hours=10)
+        for hour in range(5):
+            make_job(user_id=2 if hour % 2 else 1, samples=('S1',), created_at=start + timedelta(hours=hour))
+
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+
+        assert db.session.scalar(select(func.count()).select_from(JobInput)) == 3
+        assert db.session.scalar(select(func.count()).select_from(JobSample)) == 3
+        # Full pages, no trailing cursor to an empty page
+        assert _all_pages(sample='S1') == [['run5', 'run3'], ['run1']]
+
+
+def test_archived_jobs_stay_searchable(app, make_job):
+    with app.app_context():
+        old = datetime.now(timezone.utc) - timedelta(days=400)
+        make_job(samples=('OLD',), created_at=old)
+        make_job(samples=('OLD',))
+
+        assert archive_jobs(retention_days=365) == 1
+        assert [job['run_name'] for job in search_jobs(sample='OLD')[0]] == ['run2', 'run1']
+
+
+def test_backfill_indexes_unindexed_jobs(app, make_job):
+    with app.app_context():
+        job = make_job(samples=('B1', 'B2'))
+        db.session.execute(JobSample.__table__.delete())
+        db.session.execute(JobInput.__table__.delete())
+        db.session.commit()
+
+        assert backfill_job_index() == 1
+        assert [result['id'] for result in search_jobs(sample='B2')[0]] == [job.id]
@@ -0,0 +1,53 @@
+# tests/test_preflight.py
+"""Submit preflight with background gzip integrity checks"""
+
+import gzip
+import time
+
+from app.analysis.preflight import run_preflight
+
+RECORD = b'@read1\nACGT\n+\nIIII\n'
+
+
+def _write(path, truncate=False):
+    data = gzip.compress(RECORD * 20000)
+    path.write_bytes(data[:len(data) // 2] if truncate else data)
+
+
+def _until_checked(folder, **kwargs):
+    deadline = time.monotonic() + 30
+    while True:
+        result = run_preflight(folder, max_workers=2, **kwargs)
+        if not result["pending_files"]:
+            return result
+        assert time.monotonic() < deadline, "integrity checks did not finish"
+        time.sleep(0.05)
+
+
+def test_truncated_gzip_is_found_in_the_background(tmp_path):
+    _write(tmp_path / 'L-1_S1_L001_R1_001.fastq.gz')
+    _write(tmp_path / 'L-1_S1_L001_R2_001.fastq.gz', truncate=True)
+    _write(tmp_path / 'L-2_S2_L001_R1_001.fastq.gz')
+    _write(tmp_path / 'L-2_S2_L001_R2_001.fastq.gz')
+
+    # The header of the truncated file is fine, only the full decompression fails
+    first = run_preflight(str(tmp_path), max_workers=2)
+    assert first["errors"] == [] and first["pending_files"] == 4
+
+    result = _until_checked(str(tmp_path))
+    assert result["errors"] == [
+        "1: L-1_S1_L001_R2_001.fastq.gz: Unerwartetes Dateiende (gzip-Datei abgeschnitten)"
+    ]
+
+    # Cached by signature: a repaired file is checked again
+    _write(tmp_path / 'L-1_S1_L001_R2_001.fastq.gz')
+    assert run_preflight(str(tmp_path), max_workers=2)["pending_files"] == 1
+    assert _until_checked(str(tmp_path))["ok"]
+
+
+def test_pairing_is_checked_without_integrity(tmp_path):
+    _write(tmp_path / 'L-1_S1_L001_R1_001.fastq.gz')
+
+    result = run_preflight(str(tmp_path), integrity=False)
+    assert result["errors"] == ["1: R2 fehlt für Lane L001"]
+    assert result["pending_files"] == 0
@@ -0,0 +1,33 @@
+# tests/test_query_plans.py
+"""The hot job queries must be served by indexes"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.metrics.query_plans import check_query_plans, _hot_queries
+
+
+def test_hot_queries_use_indexes(app, make_job):
+    with app.app_context():
+        start = datetime.now(timezone.utc) - timedelta(days=30)
+        for index in range(200):
+            make_job(
+                status=('finished', 'failed', 'running')[index % 3] if index % 50 else 'running',
+                job_type=('wgs', 'species')[index % 2],
+                samples=(f"S{index}", f"PLAN-CHECK-{index % 7}"),
+                input_path=f"/data/bacteria/run{index % 10}",
+                created_at=start + timedelta(hours=index),
+                commit=False
+            )
+        from extensions import db
+        db.session.commit()
+
+        result = check_query_plans(user_id=1)
+
+    assert result['dialect'] == 'sqlite'
+    assert {query['query'] for query in result['queries']} == set(_hot_queries(1))
+    failures = [
+        (query['query'], query.get('error') or query['full_scans'], query.get('plan'))
+        for query in result['queries'] if not query['ok']
+    ]
+    assert not failures
+    assert result['ok']
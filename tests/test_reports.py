@@ -0,0 +1,34 @@
+# tests/test_reports.py
+"""Report manifests of deleted and archived jobs"""
+
+from datetime import datetime, timedelta, timezone
+
+from extensions import db
+from models import User, ReportManifest
+from app.history.archive import archive_jobs
+from app.history.reports import index_job_reports
+
+
+def test_manifests_are_deleted_with_their_jobs(app, make_job, tmp_path):
+    (tmp_path / 'reports').mkdir()
+    (tmp_path / 'reports' / 'summary.html').write_text('<html></html>')
+
+    with app.app_context():
+        db.session.add(User(id=2, username='gone', password_hash='x', role_id=2))
+        db.session.commit()
+        kept = make_job(input_path=str(tmp_path))
+        deleted = make_job(user_id=2, input_path=str(tmp_path))
+        old = make_job(input_path=str(tmp_path), created_at=datetime.now(timezone.utc) - timedelta(days=400))
+        kept_id, deleted_id, old_id = kept.id, deleted.id, old.id
+        for job in (kept, deleted, old):
+            index_job_reports(job)
+        db.session.commit()
+
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+        assert archive_jobs(retention_days=365) == 1
+
+        manifests = {manifest.job_id: manifest for manifest in db.session.query(ReportManifest)}
+        assert set(manifests) == {kept_id, old_id}
+        assert [report['name'] for report in manifests[old_id].reports] == ['summary.html']
+        assert deleted_id not in manifests
@@ -0,0 +1,67 @@
+# tests/test_scan_scheduler.py
+"""Scan limits shared between worker processes through slot leases"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from extensions import db
+from models import ScanSlot
+from app.analysis.scan_scheduler import ScanScheduler, ScanSlotLeases, ScanRejected
+
+
+def _scheduler(max_concurrent=1, max_per_user=1):
+    # One scheduler with its own slot leases per simulated worker process
+    return ScanScheduler(max_concurrent=max_concurrent, max_per_user=max_per_user, queue_timeout=0.3,
+                         slots=ScanSlotLeases(max_concurrent, max_per_user), poll_interval=0.05)
+
+
+def _hold_scan(app, scheduler, user_id, started, release):
+    def run():
+        with app.app_context():
+            scheduler.run('a', user_id, lambda progress: started.set() or release.wait(5))
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert started.wait(5)
+    return thread
+
+
+def test_global_limit_holds_across_processes(app):
+    worker, other = _scheduler(max_per_user=2), _scheduler(max_per_user=2)
+    started, release = threading.Event(), threading.Event()
+    thread = _hold_scan(app, worker, 1, started, release)
+
+    with app.app_context():
+        with pytest.raises(ScanRejected) as rejected:
+            other.run('b', 2, lambda progress: 'scanned')
+        assert rejected.value.status_code == 503
+
+        release.set()
+        thread.join(5)
+        assert other.run('b', 2, lambda progress: 'scanned') == 'scanned'
+
+
+def test_waiting_scan_gets_slot_freed_by_other_process(app):
+    worker, other = _scheduler(), _scheduler()
+    other.queue_timeout = 5
+    started, release = threading.Event(), threading.Event()
+    thread = _hold_scan(app, worker, 1, started, release)
+
+    threading.Timer(0.2, release.set).start()
+    with app.app_context():
+        assert other.run('b', 1, lambda progress: 'scanned') == 'scanned'
+    thread.join(5)
+
+
+def test_expired_lease_of_crashed_process_is_reclaimed(app):
+    worker, other = _scheduler(), _scheduler()
+    with app.app_context():
+        assert worker.slots.acquire(1) is not None
+        assert other.slots.acquire(1) is None
+
+        expired = datetime.now(timezone.utc) - timedelta(minutes=5)
+        db.session.execute(update(ScanSlot).values(lease_until=expired))
+        db.session.commit()
+        assert other.run('b', 1, lambda progress: 'scanned') == 'scanned'
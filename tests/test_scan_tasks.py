@@ -0,0 +1,143 @@
+# tests/test_scan_tasks.py
+"""Background scan tasks shared between worker processes through the database"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from extensions import db
+from models import ScanTaskState, ScanTaskChunk
+from app.analysis.scan_scheduler import ScanScheduler
+from app.analysis.scan_tasks import ScanTaskManager, prune_scan_tasks
+
+FILES = [
+    '/data/wgs/run1/L-123_S1_L001_R1_001.fastq.gz',
+    '/data/wgs/run1/L-123_S1_L001_R2_001.fastq.gz',
+    '/data/wgs/run1/NTC_S3_L001_R1_001.fastq.gz',
+]
+
+
+def _wait(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_other_worker_sees_progress_and_reuses_task(app):
+    # Two managers stand for two worker processes
+    worker, other = ScanTaskManager(save_interval=0.05), ScanTaskManager(save_interval=0.05)
+    release = threading.Event()
+
+    def scan(task):
+        task.visit_directory('/data/wgs/run1', FILES)
+        release.wait(5)
+        return [{'probennummer': '123', 'source': 'Lebensmittel', 'files': FILES[:2]},
+                {'probennummer': 'NTC', 'source': 'Negativkontrolle', 'files': FILES[2:]}]
+
+    with app.test_request_context():
+        task = worker.submit(app, '/data/wgs', True, 1, scan)
+
+        def progress():
+            db.session.expire_all()
+            state = other.get(task['task_id'])
+            return state if state['dirs_visited'] == 1 else None
+
+        _wait(progress)
+        state = progress()
+        assert state['status'] == 'running'
+        assert [sample['probennummer'] for sample in state['samples']] == ['123', 'NTC']
+
+        assert other.submit(app, '/data/wgs', True, 2, scan)['task_id'] == task['task_id']
+
+        release.set()
+        _wait(lambda: db.session.expire_all() or other.get(task['task_id'], offset=1)['status'] == 'finished')
+        state = other.get(task['task_id'], offset=1)
+        assert state['sample_count'] == 2
+        assert [sample['probennummer'] for sample in state['samples']] == ['NTC']
+        assert 'files' not in state['samples'][0]
+
+
+def test_saves_append_only_new_samples(app):
+    # Saved by hand; the save thread does not wake up during the test
+    worker, other = ScanTaskManager(save_interval=3600), ScanTaskManager()
+    release, visited = threading.Event(), threading.Event()
+    batches = [FILES[:2], FILES[2:]]
+
+    def scan(task):
+        for batch in batches:
+            task.visit_directory('/data/wgs/run1', batch)
+            visited.set()
+            release.wait(5)
+            release.clear()
+        return [{'probennummer': '123', 'source': 'Lebensmittel'}, {'probennummer': 'NTC', 'source': 'Negativkontrolle'}]
+
+    with app.test_request_context():
+        task = worker.submit(app, '/data/wgs', True, 1, scan)
+        for _ in batches:
+            _wait(visited.is_set)
+            visited.clear()
+            worker.save()
+            release.set()
+
+        chunks = db.session.scalars(select(ScanTaskChunk).order_by(ScanTaskChunk.start)).all()
+        assert [(chunk.start, [sample['probennummer'] for sample in chunk.samples]) for chunk in chunks] == \
+            [(0, ['123']), (1, ['NTC'])]
+        state = other.get(task['task_id'], offset=1)
+        assert state['sample_count'] == 2
+        assert [sample['probennummer'] for sample in state['samples']] == ['NTC']
+
+        _wait(lambda: worker._tasks[task['task_id']].is_done)
+        worker.save()
+        db.session.expire_all()
+        assert db.session.scalars(select(ScanTaskChunk)).all() == []
+        state = other.get(task['task_id'])
+        assert state['status'] == 'finished'
+        assert [sample['source'] for sample in state['samples']] == ['Lebensmittel', 'Negativkontrolle']
+
+
+def test_task_of_dead_worker_is_failed_and_not_reused(app):
+    manager = ScanTaskManager()
+    old = datetime.now(timezone.utc) - timedelta(minutes=10)
+    with app.app_context():
+        db.session.add(ScanTaskState(id='dead', folder_path='/data/wgs', recursive=True, status='running',
+                                     created_at=old, updated_at=old, samples=[]))
+        db.session.commit()
+
+        state = manager.get('dead')
+        assert state['status'] == 'failed'
+        assert manager._find_reusable('/data/wgs', True) is None
+
+        assert prune_scan_tasks(300) == 1
+        assert manager.get('dead') is None
+
+
+def test_joined_scan_reports_progress_to_follower():
+    scheduler = ScanScheduler()
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def scan(progress):
+        progress('/data/a', ['a'])
+        started.set()
+        release.wait(5)
+        progress('/data/b', ['b'])
+        return ['result']
+
+    leader = threading.Thread(target=lambda: scheduler.run(('/data', True), 1, scan))
+    leader.start()
+    started.wait(5)
+
+    follower = threading.Thread(target=lambda: seen.append(
+        scheduler.run(('/data', True), 2, scan, on_progress=lambda d, files: seen.append(d))
+    ))
+    follower.start()
+    _wait(lambda: seen)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    # Earlier progress is replayed to the joining caller
+    assert seen == ['/data/a', '/data/b', ['result']]
@@ -0,0 +1,60 @@
+# tests/test_scheduler.py
+"""Per-process start of the maintenance scheduler"""
+
+import os
+
+from flask import Flask
+
+from app.core.scheduler import MaintenanceScheduler
+
+
+def test_scheduler_starts_with_first_request_of_each_process():
+    app = Flask(__name__)
+    app.add_url_rule('/', 'index', lambda: 'ok')
+    scheduler = MaintenanceScheduler(tick=3600)
+    scheduler.init_app(app)
+    try:
+        # Creating the app (e.g. in a preloading master or a script) starts nothing
+        assert scheduler._thread is None
+
+        app.test_client().get('/')
+        first = scheduler._thread
+        assert first.is_alive() and scheduler._pid == os.getpid()
+        assert scheduler.owner.endswith(f":{os.getpid()}")
+
+        app.test_client().get('/')
+        assert scheduler._thread is first
+
+        # A forked worker inherits the state but not the thread
+        scheduler._pid = -1
+        app.test_client().get('/')
+        assert scheduler._thread is not first and scheduler._thread.is_alive()
+        assert scheduler._pid == os.getpid()
+    finally:
+        scheduler.stop()
+
+
+def test_job_counts_run_in_one_worker_and_are_exported_by_all(app, make_job):
+    from app.analysis.maintenance import register_maintenance_tasks
+    from app.core.metrics import metrics
+
+    worker, other = MaintenanceScheduler(), MaintenanceScheduler()
+    worker.owner, other.owner = 'host:1', 'host:2'
+    for scheduler in (worker, other):
+        register_maintenance_tasks(scheduler, app.config)
+
+    with app.app_context():
+        for status in ('finished', 'finished', 'failed'):
+            make_job(status=status)
+        assert worker.run_task('refresh_job_stats')
+        # Counted by the first worker within the interval
+        assert not other.run_task('refresh_job_stats')
+
+        metrics.reset()
+        assert other.run_task('export_job_stats')
+        gauges = {
+            tuple(sorted(entry['labels'].items())): entry['value']
+            for entry in metrics.snapshot()['gauges']['analysis_jobs']
+        }
+    assert gauges[(('status', 'finished'),)] == 2
+    assert gauges[(('status', 'failed'),)] == 1
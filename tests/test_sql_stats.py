@@ -0,0 +1,67 @@
+# tests/test_sql_stats.py
+"""Statement counts per request (X-SQL-Stats), so N+1 regressions fail"""
+
+import pytest
+from sqlalchemy import insert, select
+
+from extensions import db
+from models import Role, User, AnalysisJob
+from app.analysis import services
+
+# Statement budgets including the session user check of flask-login;
+# a query per listed row exceeds them long before the N+1 threshold
+QUERIES_USERS = 3
+QUERIES_PROGRESS = 3
+
+
+def _sql_stats(response):
+    """Fields of the X-SQL-Stats header"""
+    return dict(item.split('=') for item in response.headers['X-SQL-Stats'].split('; '))
+
+
+@pytest.fixture
+def mirrored(app):
+    """Copy rows to the replica, so read_only endpoints see them whichever bind they use"""
+    def mirror(*models):
+        with app.app_context():
+            with db.engines['replica'].begin() as replica:
+                for model in models:
+                    rows = db.session.execute(select(model.__table__)).mappings().all()
+                    replica.execute(model.__table__.delete())
+                    if rows:
+                        replica.execute(insert(model.__table__), [dict(row) for row in rows])
+    return mirror
+
+
+def test_user_list_does_not_query_per_user(app, client, mirrored):
+    with app.app_context():
+        db.session.add_all([
+            User(username=f"user{n:02d}", email=f"user{n}@example.org", password_hash='x', role_id=1 + n % 2)
+            for n in range(30)
+        ])
+        db.session.commit()
+    mirrored(Role, User)
+
+    response = client.get('/api/users?limit=31')
+    assert response.status_code == 200
+    assert len(response.get_json()['users']) == 31
+
+    stats = _sql_stats(response)
+    assert stats['n_plus_one'] == 'no'
+    assert int(stats['queries']) <= QUERIES_USERS
+
+
+def test_progress_polling_runs_constant_queries(app, client, mirrored, make_job, monkeypatch):
+    monkeypatch.setattr(services, 'ssh_get_log', lambda input_path, job_type: 'still running')
+    with app.app_context():
+        job_id = make_job(status='running').id
+    mirrored(Role, User, AnalysisJob)
+
+    for _ in range(3):
+        response = client.get(f'/api/progress/{job_id}')
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'running'
+
+        stats = _sql_stats(response)
+        assert stats['n_plus_one'] == 'no'
+        assert int(stats['queries']) <= QUERIES_PROGRESS
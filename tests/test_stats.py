@@ -0,0 +1,49 @@
+# tests/test_stats.py
+"""Job statistics rollups"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func
+
+from extensions import db
+from models import User, JobStatsDaily
+from app.history.stats import refresh_job_rollups
+
+
+def _counts():
+    return {
+        (row.day, row.status): row.job_count
+        for row in db.session.scalars(select(JobStatsDaily))
+    }
+
+
+def test_refresh_recomputes_changed_days(app, make_job):
+    with app.app_context():
+        day = datetime(2026, 3, 2, 8, tzinfo=timezone.utc)
+        make_job(created_at=day)
+        assert refresh_job_rollups() == {'days': 1, 'rows': 1}
+
+        make_job(status='failed', created_at=day + timedelta(hours=1))
+        assert refresh_job_rollups()['days'] == 1
+        assert _counts() == {(day.date(), 'finished'): 1, (day.date(), 'failed'): 1}
+
+
+def test_deleting_jobs_recomputes_their_days(app, make_job):
+    with app.app_context():
+        db.session.add(User(id=2, username='gone', password_hash='x', role_id=2))
+        db.session.commit()
+
+        first = datetime(2026, 3, 2, 8, tzinfo=timezone.utc)
+        second = first + timedelta(days=1)
+        make_job(created_at=first)
+        make_job(user_id=2, created_at=first + timedelta(hours=1))
+        make_job(user_id=2, status='failed', created_at=second)
+        refresh_job_rollups()
+        watermark = db.session.scalar(select(func.max(JobStatsDaily.refreshed_at)))
+
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+
+        assert _counts() == {(first.date(), 'finished'): 1}
+        # Recomputed rows keep the watermark, so the next refresh misses no other changes
+        assert db.session.scalar(select(func.max(JobStatsDaily.refreshed_at))) == watermark
@@ -0,0 +1,50 @@
+# tests/test_user_cache.py
+"""Cached identities follow changes made by other worker processes"""
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+
+
+@pytest.fixture
+def thor(app):
+    """Client of a second admin; changes below skip user_cache.invalidate like another worker would"""
+    with app.app_context():
+        db.session.add(User(id=2, username='thor', email='thor@example.org',
+                            password_hash=generate_password_hash('pw'), role_id=1))
+        db.session.commit()
+    client = app.test_client()
+    assert client.post('/login', data={'username': 'thor', 'password': 'pw'}).status_code == 302
+    assert client.get('/api/metrics').status_code == 200
+    return client
+
+
+def test_demotion_applies_with_the_next_request(app, thor):
+    with app.app_context():
+        user = db.session.get(User, 2)
+        version = user.auth_version
+        user.role_id = 2
+        db.session.commit()
+        assert user.auth_version == version + 1
+
+    assert thor.get('/api/metrics').status_code == 403
+
+
+def test_deleted_user_is_logged_out(app, thor):
+    with app.app_context():
+        db.session.delete(db.session.get(User, 2))
+        db.session.commit()
+
+    assert thor.get('/api/metrics').status_code in (302, 401)
+
+
+def test_unchanged_user_keeps_version(app, thor):
+    with app.app_context():
+        user = db.session.get(User, 2)
+        user.email = user.email
+        db.session.commit()
+        assert user.auth_version == 0
+
+    assert thor.get('/api/metrics').status_code == 200